@@ -9,4 +9,15 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "CHANGE_ME"
     JWT_ALGORITHM: str = "HS256"
 
+    # Write-behind autosave (app.services.autosave_buffer); off by default
+    AUTOSAVE_WRITE_BEHIND: bool = False
+    AUTOSAVE_FLUSH_INTERVAL: float = 2.0  # seconds
+    AUTOSAVE_BATCH_SIZE: int = 500  # scenes per bulk_write; a full buffer flushes early
+    AUTOSAVE_JOURNAL_PATH: str = "autosave.journal"
+
+    # Scene word/character counts cached by content hash (entries)
+    SCENE_COUNT_CACHE_SIZE: int = 4096
+    # Scene page layouts for the stats page estimate, by content hash (entries)
+    SCENE_LAYOUT_CACHE_SIZE: int = 4096
+
 settings = Settings()
\ No newline at end of file
@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
 from app.config import settings
 import logging
 
@@ -14,17 +15,63 @@ users_collection = db["users"]
 projects_collection = db["projects"]
 documents_collection = db["documents"]
 chapters_collection = db["chapters"]
+scenes_collection = db["scenes"]
 reset_codes_collection = db["reset_codes"]
 
+# users.email is unique case-insensitively; queries on email must pass the
+# same collation or Mongo cannot use the index.
+EMAIL_COLLATION = {"locale": "en", "strength": 2}
+
+# Every index the routes rely on, per collection.
+# tests/test_query_plans.py checks the route queries against this set.
+INDEXES = {
+    "users": [
+        IndexModel([("email", 1)], unique=True, collation=EMAIL_COLLATION),
+    ],
+    "projects": [
+        # list a user's projects; (_id, user_id) lookups are served by _id
+        IndexModel([("user_id", 1)]),
+        # case-insensitive unique project names per user
+        IndexModel(
+            [("user_id", 1), ("name_key", 1)],
+            unique=True,
+            partialFilterExpression={"name_key": {"$type": "string"}},
+        ),
+    ],
+    "documents": [
+        # folder listing: project + parent, keyset-paginated on (title, _id)
+        IndexModel([("project_id", 1), ("parent_id", 1), ("title", 1), ("_id", 1)]),
+        # whole-tree reads and subtree deletes/moves: anchored prefix match on the ancestor path
+        IndexModel([("project_id", 1), ("path", 1)]),
+        # single-query ownership check + fetch (user_id is denormalized from the project)
+        IndexModel([("user_id", 1), ("project_id", 1), ("_id", 1)]),
+        # case-insensitive unique titles per folder
+        IndexModel(
+            [("project_id", 1), ("parent_id", 1), ("title_key", 1)],
+            unique=True,
+            partialFilterExpression={"title_key": {"$type": "string"}},
+        ),
+    ],
+    "scenes": [
+        # scene content lives outside the document, one record per scene
+        IndexModel(
+            [("document_id", 1), ("chapter_id", 1), ("scene_id", 1)],
+            unique=True,
+        ),
+    ],
+    "reset_codes": [
+        IndexModel([("user_id", 1)], unique=True),
+        # expired codes are removed by Mongo's TTL monitor
+        IndexModel([("expires_at", 1)], expireAfterSeconds=0),
+    ],
+}
+
+
 async def create_indexes():
     """Create necessary indexes on startup"""
-    try:
-        # Unique index on email (case-insensitive via collation)
-        await users_collection.create_index(
-            [("email", 1)],
-            unique=True,
-            collation={"locale": "en", "strength": 2}  # case-insensitive
-        )
-        logger.info("Unique index on users.email created successfully")
-    except Exception as e:
-        logger.warning(f"Could not create index on users.email: {e}")
\ No newline at end of file
+    for collection_name, indexes in INDEXES.items():
+        try:
+            names = await db[collection_name].create_indexes(indexes)
+            logger.info(f"Indexes on {collection_name} created successfully: {', '.join(names)}")
+        except Exception as e:
+            logger.warning(f"Could not create indexes on {collection_name}: {e}")
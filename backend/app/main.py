@@ -7,6 +7,8 @@ import os
 import logging
 from app.routes import auth, projects, documents, users
 from app import database
+from app.services.autosave_buffer import autosave_buffer
+from app.services.scene_service import scene_counts_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,7 +42,7 @@ app.include_router(users.router, prefix="/api")
 # Health check - simple and always works
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "scene_counts_cache": scene_counts_cache.stats()}
 
 # Validation exception handlers
 @app.exception_handler(RequestValidationError)
@@ -84,6 +86,12 @@ async def verify_db_connection():
         logger.error(f"MongoDB connection failed during startup: {exc}")
         # Do NOT raise here in production - let the app start and show error on /health
         # raise   # Comment this out for now
+    # replays the journal; failed flushes are retried on the next interval
+    await autosave_buffer.start()
+
+@app.on_event("shutdown")
+async def flush_autosave_buffer():
+    await autosave_buffer.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,57 @@
+"""
+Move embedded scene content into the `scenes` collection.
+
+Before: documents.chapters[].scenes[].content held the full HTML of every scene.
+After:  the document keeps only the chapter/scene skeleton and each scene's
+        content + counts live in `scenes`, keyed by (document_id, chapter_id, scene_id).
+
+Safe to run more than once. Scenes that already have a record in `scenes`
+(e.g. autosaved after the new code was deployed) keep the newer content.
+
+Usage: python -m app.migrations.m001_split_scene_content
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.database import documents_collection, scenes_collection
+from app.services.scene_service import scene_counts
+from app.utils.content_codec import encode_content
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate():
+    query = {"chapters.scenes.content": {"$exists": True}}
+    migrated_docs = 0
+    migrated_scenes = 0
+
+    async for document in documents_collection.find(query, {"chapters": 1}):
+        ops = []
+        for chapter in document.get("chapters") or []:
+            for scene in chapter.get("scenes", []):
+                content = scene.get("content") or ""
+                ops.append(UpdateOne(
+                    {"document_id": document["_id"], "chapter_id": chapter["id"], "scene_id": scene["id"]},
+                    {"$setOnInsert": {"content": encode_content(content), **scene_counts(content), "updated_at": datetime.utcnow()}},
+                    upsert=True
+                ))
+
+        if ops:
+            await scenes_collection.bulk_write(ops, ordered=False)
+            migrated_scenes += len(ops)
+
+        await documents_collection.update_one(
+            {"_id": document["_id"]},
+            {"$unset": {"chapters.$[].scenes.$[].content": ""}}
+        )
+        migrated_docs += 1
+
+    logger.info(f"Moved {migrated_scenes} scenes out of {migrated_docs} documents")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
@@ -0,0 +1,28 @@
+"""
+Give every document a `settings` object.
+
+get_owned_document used to write `settings: {}` on the read path whenever it
+was missing. The loader now only defaults it in memory, so this backfills the
+field once for older documents.
+
+Usage: python -m app.migrations.m002_backfill_document_settings
+"""
+import asyncio
+import logging
+
+from app.database import documents_collection
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate():
+    result = await documents_collection.update_many(
+        {"$or": [{"settings": {"$exists": False}}, {"settings": None}]},
+        {"$set": {"settings": {}}}
+    )
+    logger.info(f"Backfilled settings on {result.modified_count} documents")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
@@ -0,0 +1,44 @@
+"""
+Backfill documents.title_key and projects.name_key.
+
+Name collisions are now detected by unique indexes on the normalized key
+(see app.utils.validation.title_key). The indexes are partial, so rows
+without a key are ignored until this runs. Rows that would collide with an
+existing key (duplicates created before the indexes existed) are left
+without a key and logged so they can be renamed by hand.
+
+Usage: python -m app.migrations.m003_backfill_title_keys
+"""
+import asyncio
+import logging
+
+from pymongo.errors import DuplicateKeyError
+
+from app.database import documents_collection, projects_collection
+from app.utils.validation import title_key
+
+logger = logging.getLogger(__name__)
+
+
+async def _backfill(collection, field: str, key_field: str):
+    updated = 0
+    async for row in collection.find({key_field: {"$exists": False}}, {field: 1}):
+        try:
+            await collection.update_one(
+                {"_id": row["_id"]},
+                {"$set": {key_field: title_key(row.get(field, ""))}}
+            )
+            updated += 1
+        except DuplicateKeyError:
+            logger.warning(f"{collection.name} {row['_id']}: '{row.get(field)}' duplicates an existing name, skipped")
+    logger.info(f"Backfilled {key_field} on {updated} {collection.name}")
+
+
+async def migrate():
+    await _backfill(documents_collection, "title", "title_key")
+    await _backfill(projects_collection, "name", "name_key")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
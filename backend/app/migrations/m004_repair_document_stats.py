@@ -0,0 +1,34 @@
+"""
+Recompute document statistics from stored scene content.
+
+Rebuilds per-scene word/character counts, chapter and document wordcounts
+and the `stats` subdocument that the routes otherwise maintain
+incrementally. Run once to backfill `stats` on existing documents, and
+again any time the incremental counters are suspected to have drifted.
+
+Usage:
+    python -m app.migrations.m004_repair_document_stats              # every document
+    python -m app.migrations.m004_repair_document_stats <document_id>  # one document
+"""
+import asyncio
+import logging
+import sys
+
+from app.database import documents_collection
+from app.services.stats_service import repair_document_stats
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate(document_ids: list = None):
+    if not document_ids:
+        document_ids = await documents_collection.distinct("_id", {"type": {"$ne": "folder"}})
+
+    for document_id in document_ids:
+        await repair_document_stats(document_id)
+    logger.info(f"Recomputed stats for {len(document_ids)} documents")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate(sys.argv[1:]))
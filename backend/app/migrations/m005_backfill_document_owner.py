@@ -0,0 +1,33 @@
+"""
+Denormalize the owning user onto every document.
+
+documents.user_id lets get_owned_document check ownership and fetch in a
+single indexed query. This copies projects.user_id onto the documents of
+each project, one project at a time, and only touches documents that
+don't have it yet, so it can run while the app is serving traffic: the
+loader falls back to the project check for documents it hasn't reached.
+
+Usage: python -m app.migrations.m005_backfill_document_owner
+"""
+import asyncio
+import logging
+
+from app.database import documents_collection, projects_collection
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate():
+    updated = 0
+    async for project in projects_collection.find({}, {"user_id": 1}):
+        result = await documents_collection.update_many(
+            {"project_id": project["_id"], "user_id": {"$exists": False}},
+            {"$set": {"user_id": project["user_id"]}}
+        )
+        updated += result.modified_count
+    logger.info(f"Backfilled user_id on {updated} documents")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
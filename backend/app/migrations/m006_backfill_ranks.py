@@ -0,0 +1,43 @@
+"""
+Give every chapter and scene a fractional order key ("rank").
+
+Chapters and scenes saved before ranks existed are ordered by their
+integer `order`. Structural routes backfill a document's ranks the first
+time they key against it, so this only saves that extra write on first
+edit. Each document is re-keyed conditionally on the version it was read
+at, so the migration can run while the app is serving traffic; documents
+changed meanwhile are skipped and picked up on their next edit.
+
+Usage: python -m app.migrations.m006_backfill_ranks
+"""
+import asyncio
+import logging
+
+from app.database import documents_collection
+from app.services.ordering_service import RANK_SKELETON_PROJECTION, rebalance_ranks
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate():
+    updated = skipped = 0
+    query = {
+        "type": {"$ne": "folder"},
+        "$or": [
+            {"chapters": {"$elemMatch": {"rank": {"$exists": False}}}},
+            {"chapters.scenes": {"$elemMatch": {"rank": {"$exists": False}}}},
+        ],
+    }
+    async for document in documents_collection.find(query, RANK_SKELETON_PROJECTION):
+        version = document.get("version", 0)
+        result = await rebalance_ranks(document["_id"], document.get("chapters") or [], version)
+        if result is None:
+            skipped += 1
+        elif result != version:
+            updated += 1
+    logger.info(f"Backfilled ranks on {updated} documents, {skipped} changed meanwhile")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
@@ -0,0 +1,71 @@
+"""
+Backfill documents.path, the materialized ancestor path.
+
+Folder deletes and moves, and the project tree, now work on path
+prefixes (see app.services.tree_service), so items without a path are
+invisible to them. Paths are computed per project from the parent_id
+links in memory and written in one bulk_write per project. Items whose
+parent no longer exists (orphans of folder deletes made before subtree
+deletes existed) are logged and left alone.
+
+Usage: python -m app.migrations.m007_backfill_paths
+"""
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from app.database import documents_collection, projects_collection
+from app.services.tree_service import ROOT_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def _paths(items: list) -> dict:
+    """Path per item id (as str); orphans and parent cycles map to None."""
+    parents = {str(item["_id"]): str(item["parent_id"]) if item.get("parent_id") else None for item in items}
+    paths = {}
+
+    def path_of(item_id, seen):
+        if item_id in paths:
+            return paths[item_id]
+        parent_id = parents[item_id]
+        if parent_id is None:
+            path = ROOT_PATH
+        elif parent_id not in parents or parent_id in seen:
+            path = None
+        else:
+            parent_path = path_of(parent_id, seen | {item_id})
+            path = f"{parent_path}{parent_id}," if parent_path else None
+        paths[item_id] = path
+        return path
+
+    for item_id in parents:
+        path_of(item_id, frozenset())
+    return paths
+
+
+async def migrate():
+    updated = orphaned = 0
+    async for project in projects_collection.find({}, {"_id": 1}):
+        items = await documents_collection.find(
+            {"project_id": project["_id"]}, {"parent_id": 1, "path": 1}
+        ).to_list(None)
+        paths = _paths(items)
+        requests = []
+        for item in items:
+            path = paths[str(item["_id"])]
+            if path is None:
+                orphaned += 1
+                logger.warning(f"document {item['_id']}: parent {item.get('parent_id')} not found, skipped")
+            elif item.get("path") != path:
+                requests.append(UpdateOne({"_id": item["_id"]}, {"$set": {"path": path}}))
+        if requests:
+            result = await documents_collection.bulk_write(requests, ordered=False)
+            updated += result.modified_count
+    logger.info(f"Backfilled path on {updated} documents, {orphaned} orphans skipped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, Query, Body, Depends
 import pymongo
 from pymongo.errors import DuplicateKeyError
-from app.database import users_collection, reset_codes_collection, projects_collection, documents_collection
+from app.database import users_collection, reset_codes_collection, projects_collection, documents_collection, EMAIL_COLLATION
 from app.utils.security import hash_password, verify_password
 from app.utils.auth import get_current_user
 from app.services.auth_service import create_access_token
 from app.services.email_service import send_email
+from app.services.scene_service import delete_documents_content
 from app.schemas.auth import AuthRequest, RegisterRequest, ResetPasswordRequest, ForgotPasswordRequest, VerifyCodeRequest, UserSettings
 from datetime import datetime, timedelta
 from bson import ObjectId
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 @router.post("/register")
 async def register(data: RegisterRequest):
     try:
-        if await users_collection.find_one({"email": data.email.lower()}):
+        if await users_collection.find_one({"email": data.email.lower()}, collation=EMAIL_COLLATION):
             raise HTTPException(400, "Email already registered. Please log in.")
         
         hashed_pw = hash_password(data.password)
@@ -47,7 +48,7 @@ async def register(data: RegisterRequest):
 
 @router.post("/login")
 async def login(data: AuthRequest):
-    user = await users_collection.find_one({"email": data.email.lower()})
+    user = await users_collection.find_one({"email": data.email.lower()}, collation=EMAIL_COLLATION)
 
     if not user or not verify_password(data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -64,7 +65,7 @@ async def forgot_password(email: str = Body(..., embed=True)):
     import asyncio
     from app.services.email_service import send_email
 
-    user = await users_collection.find_one({"email": email.lower()})
+    user = await users_collection.find_one({"email": email.lower()}, collation=EMAIL_COLLATION)
     if not user:
         return {"message": "If an account exists, a reset code has been sent."}
 
@@ -99,7 +100,7 @@ async def forgot_password(email: str = Body(..., embed=True)):
 
 @router.post("/verify-code")
 async def verify_code(data: VerifyCodeRequest):
-    user = await users_collection.find_one({"email": data.email.lower()})
+    user = await users_collection.find_one({"email": data.email.lower()}, collation=EMAIL_COLLATION)
     if not user:
         raise HTTPException(400, "Invalid or expired code")
 
@@ -126,7 +127,7 @@ async def reset_password(data: dict = Body(...)):
     if not all([email, code, new_password]):
         raise HTTPException(400, "Missing required fields")
 
-    user = await users_collection.find_one({"email": email.lower()})
+    user = await users_collection.find_one({"email": email.lower()}, collation=EMAIL_COLLATION)
     if not user:
         raise HTTPException(404, "User not found")
 
@@ -163,7 +164,7 @@ async def reset_password(data: dict = Body(...)):
 async def delete_account(user_id=Depends(get_current_user)):
     """
     Delete authenticated user's account and all associated data.
-    Cascades delete: user -> projects -> documents (with embedded chapters/scenes)
+    Cascades delete: user -> projects -> documents -> scenes
     Returns 204 No Content on success.
     """
     try:
@@ -180,9 +181,12 @@ async def delete_account(user_id=Depends(get_current_user)):
     projects = await projects_collection.find({"user_id": user_oid}).to_list(None)
     project_ids = [p["_id"] for p in projects]
     
-    # delete all documents that belong to these projects
-    if project_ids:
-        await documents_collection.delete_many({"project_id": {"$in": project_ids}})
+    # delete all documents (and their scene content) owned by the user; the
+    # project_id branch covers documents not yet backfilled with user_id
+    owned_documents = {"$or": [{"user_id": user_oid}, {"project_id": {"$in": project_ids}}]}
+    document_ids = await documents_collection.distinct("_id", owned_documents)
+    await delete_documents_content(document_ids)
+    await documents_collection.delete_many(owned_documents)
     
     # delete all projects owned by this user
     await projects_collection.delete_many({"user_id": user_oid})
@@ -1,7 +1,11 @@
+import functools
 import re
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 from typing import Optional, List
 
@@ -11,24 +15,80 @@ from app.database import (
     chapters_collection
 )
 from app.utils.auth import get_current_user
-from app.services.wordcount_service import count_words, sum_scene_wordcounts, count_characters, estimate_pages
+from app.services.wordcount_service import sum_scene_wordcounts
+from app.services.autosave_buffer import autosave_buffer
+from app.services.stats_service import (
+    STATS_COUNTERS_PROJECTION,
+    empty_stats,
+    outline_stats_update,
+    character_delta_update,
+    scene_counts_update,
+    moved_wordcounts,
+    refresh_outline_extremes,
+    recompute_outline_stats,
+    rename_in_stats,
+)
+from app.services.scene_service import (
+    save_scene_content,
+    overwrite_scene_content,
+    write_scene_batch,
+    get_scene_content,
+    stored_scene_counts,
+    content_hash,
+    stored_content_hash,
+    apply_splices,
+    scene_counts,
+    scene_counts_many,
+    attach_scene_content,
+    iter_scene_contents,
+    replace_scene_contents,
+    move_scene_content,
+    sum_scene_counts,
+    delete_scene_content,
+    delete_documents_content,
+    sum_counts_of_scenes,
+    apply_outline_changes,
+)
+from app.services.outline_ops import apply_outline_ops, OutlineOpError
+from app.services.manuscript_service import stream_manuscript
+from app.services.layout_service import document_page_estimate
+from app.services.ordering_service import rebalance_ranks, schedule_rebalance
+from app.services.tree_service import (
+    TREE_PROJECTION,
+    build_tree,
+    child_path,
+    copy_subtree,
+    listing_pipeline,
+    move_subtree,
+    path_for_parent,
+    resolve_path,
+    subtree_filter,
+)
 from app.schemas.requests import (
     CreateDocumentRequest,
+    CopyMoveRequest,
     CreateChapterRequest,
     CreateSceneRequest,
     ReorderRequest,
-    SceneAutosaveRequest
+    SceneAutosaveRequest,
+    SceneDeltaRequest,
+    SceneBatchRequest,
+    OutlineBatchRequest,
 )
 from app.schemas.document import (
     SceneResponse,
     DocumentOutlineResponse,
     DocumentResponse,
+    ChapterContentResponse,
     ChapterResponse,
-    ItemListResponse,
+    ItemPageResponse,
+    DocumentTreeResponse,
     DocumentStatsResponse,
 )
 from app.schemas.document_settings import DocumentSettings
-from app.utils.mongo import serialize_mongo
+from app.utils.mongo import serialize_mongo, encode_cursor, decode_cursor, version_filter, skeleton_filter
+from app.utils.validation import title_key
+from app.utils.ordering import MAX_RANK_LENGTH, key_at, key_between, ordered, rank_of, spread_keys, with_order
 
 router = APIRouter(
     prefix="/projects/{project_id}/documents",
@@ -40,37 +100,227 @@ def ensure_objectid(val):
     return val if isinstance(val, ObjectId) else ObjectId(val)
 
 
+# Loader modes for get_owned_document:
+#   meta     - top-level fields only (no chapters, no settings)
+#   settings - top-level fields + settings
+#   skeleton - everything except scene content (chapters/scenes ids, titles, order, counts)
+#   full     - skeleton + scene content pulled from the scenes collection
+#   outline  - only what the sidebar renders: chapter/scene ids, titles, order, counts
+DOCUMENT_PROJECTIONS = {
+    "meta": {"chapters": 0, "settings": 0},
+    "settings": {"chapters": 0},
+    "skeleton": {"chapters.scenes.content": 0},
+    "full": {"chapters.scenes.content": 0},
+    "outline": {
+        "title": 1,
+        "type": 1,
+        "total_wordcount": 1,
+        "version": 1,
+        "chapters.id": 1,
+        "chapters.title": 1,
+        "chapters.rank": 1,
+        "chapters.order": 1,
+        "chapters.wordcount": 1,
+        "chapters.scenes.id": 1,
+        "chapters.scenes.title": 1,
+        "chapters.scenes.rank": 1,
+        "chapters.scenes.order": 1,
+        "chapters.scenes.wordcount": 1,
+    },
+}
+
+
+async def find_owned_document(user_id: str, project_id: str, query: dict, projection: Optional[dict] = None):
+    """
+    Ownership check and fetch in one indexed query on the denormalized
+    documents.user_id. Documents not yet backfilled by
+    m005_backfill_document_owner fall back to checking the project.
+    """
+    query = {**query, "project_id": ensure_objectid(project_id)}
+    document = await documents_collection.find_one(
+        {**query, "user_id": ensure_objectid(user_id)},
+        projection
+    )
+    if document is not None:
+        return document
+
+    legacy = await documents_collection.find_one({**query, "user_id": {"$exists": False}}, projection)
+    if legacy is None:
+        return None
+    project = await projects_collection.find_one(
+        {"_id": ensure_objectid(project_id), "user_id": ensure_objectid(user_id)},
+        {"_id": 1}
+    )
+    return legacy if project else None
+
+
 async def get_owned_document(
     user_id: str,
     project_id: str,
-    document_id: str
+    document_id: str,
+    mode: str = "full"
 ):
-    project = await projects_collection.find_one({
-        "_id": ensure_objectid(project_id),
-        "user_id": ensure_objectid(user_id)
-    })
-
-    if not project:
-        return None
-
-    document = await documents_collection.find_one({
-        "_id": ensure_objectid(document_id),
-        "project_id": ensure_objectid(project_id)
-    })
+    document = await find_owned_document(
+        user_id, project_id, {"_id": ensure_objectid(document_id)}, DOCUMENT_PROJECTIONS[mode]
+    )
 
     if not document:
         return None
 
-    if "settings" not in document:
-        await documents_collection.update_one(
-            {"_id": ensure_objectid(document_id)},
-            {"$set": {"settings": {}}}
-        )
+    if mode not in ("meta", "outline") and document.get("settings") is None:
+        # m002_backfill_document_settings fills this in the database
         document["settings"] = {}
 
+    if mode == "full" and document.get("chapters"):
+        await attach_scene_content(document_id, document["chapters"])
+        autosave_buffer.overlay(document_id, document["chapters"])
+
     return serialize_mongo(document)
 
 
+# Optimistic concurrency: every write to the outline or scene content $incs
+# `version`. Clients may send back the version they last saw; a write made
+# against a stale version is rejected with 409 and the current version.
+def version_conflict(current: int) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Document was changed by another request", "version": current},
+    )
+
+
+def read_version(document: dict, expected: Optional[int]) -> int:
+    """Version of a document loaded for read-modify-write; 409 if the client is already behind."""
+    current = document.get("version", 0)
+    if expected is not None and expected != current:
+        raise version_conflict(current)
+    return current
+
+
+class SkeletonChanged(Exception):
+    """A read-modify-write lost the race: the document was written after it was read."""
+
+    def __init__(self, version: int):
+        super().__init__(version)
+        self.version = version
+
+
+RMW_ATTEMPTS = 5
+
+
+def read_modify_write(route):
+    """
+    Re-run a route that loads the skeleton and writes conditionally on it
+    (skeleton_update) when something else was written in between. Whether
+    that is a conflict is decided by read_version on the fresh read: a
+    client that sent its version gets the 409 there, one that sent none
+    just gets the retry.
+    """
+    @functools.wraps(route)
+    async def wrapper(*args, **kwargs):
+        for _ in range(RMW_ATTEMPTS - 1):
+            try:
+                return await route(*args, **kwargs)
+            except SkeletonChanged:
+                pass
+        try:
+            return await route(*args, **kwargs)
+        except SkeletonChanged as e:
+            raise version_conflict(e.version)
+    return wrapper
+
+
+async def _bumping_update(document_id: str, condition: dict, query: dict, update: dict,
+                          projection: Optional[dict], **kwargs):
+    """
+    find_one_and_update that bumps `version`, applied only when `condition`
+    holds too. Returns (AFTER image, None), or (None, current version) when
+    only `condition` failed; the version is only read on that path.
+    """
+    document_oid = ensure_objectid(document_id)
+    updated = await documents_collection.find_one_and_update(
+        {"_id": document_oid, **query, **condition},
+        {**update, "$inc": {**update.get("$inc", {}), "version": 1}},
+        projection={**(projection or {}), "version": 1},
+        return_document=ReturnDocument.AFTER,
+        **kwargs
+    )
+    if updated is None and condition:
+        current = await documents_collection.find_one({"_id": document_oid, **query}, {"version": 1})
+        if current is not None:
+            return None, current.get("version", 0)
+    return updated, None
+
+
+async def versioned_update(
+    document_id: str,
+    expected_version: Optional[int],
+    query: dict,
+    update: dict,
+    projection: Optional[dict] = None,
+    **kwargs
+):
+    """
+    find_one_and_update that bumps `version` and, when `expected_version`
+    is given, only applies if nothing else was written since. Returns the
+    AFTER image, or None when `query` does not match.
+    """
+    updated, current = await _bumping_update(
+        document_id, version_filter(expected_version), query, update, projection, **kwargs
+    )
+    if current is not None:
+        raise version_conflict(current)
+    return updated
+
+
+async def skeleton_update(
+    document_id: str,
+    document: dict,
+    query: dict,
+    update: dict,
+    projection: Optional[dict] = None,
+    **kwargs
+):
+    """
+    The write of a @read_modify_write route: bumps `version` and applies
+    only while the document is as `document` was read, whether or not the
+    client sent a version. Raises SkeletonChanged otherwise; returns None
+    when `query` does not match.
+    """
+    updated, current = await _bumping_update(
+        document_id, skeleton_filter(document), query, update, projection, **kwargs
+    )
+    if current is not None:
+        raise SkeletonChanged(current)
+    return updated
+
+
+async def ensure_ranks(document_id: str, document: dict):
+    """
+    Give every chapter and scene of a loaded skeleton a usable rank before
+    a new one is keyed against them; `document["version"]` follows.
+    """
+    version = await rebalance_ranks(document_id, document["chapters"], document.get("version", 0))
+    if version is None:
+        current = await documents_collection.find_one({"_id": ensure_objectid(document_id)}, {"version": 1})
+        raise SkeletonChanged((current or {}).get("version", 0))
+    document["version"] = version
+
+
+def check_rank(document_id: str, rank: str):
+    if len(rank) > MAX_RANK_LENGTH:
+        schedule_rebalance(document_id)
+
+
+async def flush_autosaves():
+    """
+    Write buffered autosaves through before a route reads or rewrites scene
+    records directly, so it works on the latest content and a later flush
+    cannot overwrite its result.
+    """
+    if autosave_buffer.enabled:
+        await autosave_buffer.flush()
+
+
 # ────────────────────────────────────────────────
 # CREATE DOCUMENT or FOLDER
 # ────────────────────────────────────────────────
@@ -90,30 +340,33 @@ async def create_document(
 
     title = data.title.strip()
     parent = ensure_objectid(data.parent_id) if data.parent_id else None
-
-    # check for duplicates in same folder (case-insensitive)
-    escaped = re.escape(title)
-    conflict = await documents_collection.find_one({
-        "project_id": ObjectId(project_id),
-        "parent_id": parent,
-        "title": {"$regex": f"^{escaped}$", "$options": "i"}
-    })
-    if conflict:
-        raise HTTPException(status_code=409, detail="An item with that name already exists in this folder")
+    path = await path_for_parent(project_id, parent)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Parent folder not found")
 
     document = {
         "project_id": ObjectId(project_id),
+        "user_id": ObjectId(user_id),
         "title": title,
+        "title_key": title_key(title),
         "type": data.type if hasattr(data, "type") and data.type in ["document", "folder"] else "document",
         "parent_id": parent,
+        "path": path,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
         "total_wordcount": 0,
         "chapters": [] if data.type != "folder" else None,
         "settings": {},  # FIX: Initialize empty settings object for new documents
+        "stats": empty_stats() if data.type != "folder" else None,
+        "version": 0,
     }
 
-    result = await documents_collection.insert_one(document)
+    # duplicates in the same folder (case-insensitive) are rejected by the
+    # unique (project_id, parent_id, title_key) index
+    try:
+        result = await documents_collection.insert_one(document)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="An item with that name already exists in this folder")
     document["_id"] = result.inserted_id
 
     return serialize_mongo(document)
@@ -123,6 +376,7 @@ async def create_document(
 # CREATE SCENE (only for documents)
 # ────────────────────────────────────────────────
 @router.post("/{document_id}/chapters/{chapter_id}/scenes", response_model=SceneResponse)
+@read_modify_write
 async def create_scene(
     project_id: str,
     document_id: str,
@@ -130,7 +384,7 @@ async def create_scene(
     data: CreateSceneRequest,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
@@ -138,25 +392,43 @@ async def create_scene(
     if not chapter:
         raise HTTPException(status_code=404, detail="Chapter not found")
 
+    read_version(document, data.version)
+    await ensure_ranks(document_id, document)
     content = getattr(data, "content", "") or ""
 
+    siblings = ordered(chapter["scenes"])
     scene = {
         "id": str(uuid.uuid4()),
         "title": data.title.strip(),
-        "order": len(chapter["scenes"]),
-        "wordcount": count_words(content),
-        "content": content
+        "rank": key_between(rank_of(siblings[-1]) if siblings else None, None),
     }
+    counts = scene_counts(content)
+    scene["wordcount"] = counts["wordcount"]
 
-    # Update the document
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id), "chapters.id": chapter_id},
-        {"$push": {"chapters.$.scenes": scene}, "$set": {"updated_at": datetime.utcnow()}}
+    chapter["scenes"].append(scene)
+    chapter["wordcount"] = sum_scene_wordcounts(chapter["scenes"])
+    chapter_wordcount = chapter["wordcount"]
+    document_wordcount = sum(c["wordcount"] for c in document["chapters"])
+
+    # Update the document (skeleton only, content lives in the scenes collection)
+    updated = await skeleton_update(
+        document_id,
+        document,
+        {"chapters.id": chapter_id},
+        {
+            "$push": {"chapters.$.scenes": scene},
+            "$inc": {
+                "chapters.$.wordcount": scene["wordcount"],
+                "total_wordcount": scene["wordcount"],
+                **character_delta_update(None, counts),
+            },
+            "$set": {"updated_at": datetime.utcnow(), **outline_stats_update(document["chapters"])},
+        }
     )
-
-    # Recalculate wordcounts (to return accurate values)
-    chapter_wordcount = sum(s["wordcount"] for s in chapter["scenes"]) + scene["wordcount"]
-    document_wordcount = sum(c["wordcount"] for c in document["chapters"]) + chapter_wordcount
+    if not updated:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    await save_scene_content(document_id, chapter_id, scene["id"], content)
+    check_rank(document_id, scene["rank"])
 
     # Return full shape expected by SceneResponse
     return {
@@ -166,24 +438,27 @@ async def create_scene(
         "chapter_wordcount": chapter_wordcount,
         "document_wordcount": document_wordcount,
         "title": scene["title"],
-        "order": scene["order"],
-        "content": scene["content"]
+        "order": len(siblings),
+        "content": content,
+        "version": updated["version"],
     }
 
 
 # ────────────────────────────────────────────────
 # LIST DOCUMENTS / FOLDERS (root or nested)
 # ────────────────────────────────────────────────
-@router.get("", response_model=List[ItemListResponse])
+@router.get("", response_model=ItemPageResponse)
 async def get_documents(
     project_id: str,
     parent_id: Optional[str] = Query(None, description="Filter by parent folder ID (null for root)"),
+    limit: int = Query(100, ge=1, le=500, description="Page size"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
     user_id=Depends(get_current_user)
 ):
-    project = await projects_collection.find_one({
-        "_id": ObjectId(project_id),
-        "user_id": ObjectId(user_id)
-    })
+    project = await projects_collection.find_one(
+        {"_id": ObjectId(project_id), "user_id": ObjectId(user_id)},
+        {"_id": 1}
+    )
     if not project:
         raise HTTPException(status_code=403, detail="Project not found or not owned")
 
@@ -204,7 +479,23 @@ async def get_documents(
         # Default to root when no parent_id provided
         query["parent_id"] = None
 
-    items = await documents_collection.find(query).sort("title", 1).to_list(100)
+    # keyset pagination on (title, _id), served by the listing index
+    if after:
+        try:
+            after_title, after_id = decode_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["$or"] = [
+            {"title": {"$gt": after_title}},
+            {"title": after_title, "_id": {"$gt": after_id}},
+        ]
+
+    items = await documents_collection.aggregate(listing_pipeline(query, limit)).to_list(limit + 1)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]["title"], items[-1]["_id"])
 
     result = []
     for item in items:
@@ -213,45 +504,43 @@ async def get_documents(
         item_dict["type"] = item_type
 
         if item_type == "document":
-            chapters = item_dict.get("chapters", [])
-            item_dict["chapter_count"] = len(chapters)
-            item_dict["word_count"] = sum(ch.get("wordcount", 0) for ch in chapters)
-
-            # Flatten all scenes with their parent chapter title
-            all_scenes = [
-                (sc.get("title", ""), sc.get("wordcount", 0), ch.get("title", ""))
-                for ch in chapters
-                for sc in ch.get("scenes", [])
-            ]
-            item_dict["scene_count"] = len(all_scenes)
-
-            if chapters:
-                sorted_ch = sorted(chapters, key=lambda c: c.get("wordcount", 0))
-                item_dict["shortest_chapter"] = {
-                    "title": sorted_ch[0].get("title", ""),
-                    "word_count": sorted_ch[0].get("wordcount", 0),
-                }
-                item_dict["longest_chapter"] = {
-                    "title": sorted_ch[-1].get("title", ""),
-                    "word_count": sorted_ch[-1].get("wordcount", 0),
-                }
-
-            if all_scenes:
-                sorted_sc = sorted(all_scenes, key=lambda s: s[1])
-                item_dict["shortest_scene"] = {
-                    "title": sorted_sc[0][0],
-                    "word_count": sorted_sc[0][1],
-                    "chapter_title": sorted_sc[0][2],
-                }
-                item_dict["longest_scene"] = {
-                    "title": sorted_sc[-1][0],
-                    "word_count": sorted_sc[-1][1],
-                    "chapter_title": sorted_sc[-1][2],
-                }
+            item_dict.update(_stats_fields(item_dict))
 
         result.append(item_dict)
 
-    return result
+    return {"items": result, "next_cursor": next_cursor}
+
+
+# ────────────────────────────────────────────────
+# WHOLE PROJECT TREE (skeletons only)
+# ────────────────────────────────────────────────
+@router.get("/tree", response_model=DocumentTreeResponse)
+async def get_document_tree(
+    project_id: str,
+    user_id=Depends(get_current_user)
+):
+    """
+    Every folder and document of the project, nested, in one query. Documents
+    carry their chapter/scene skeleton; scene content is never included.
+    """
+    project = await projects_collection.find_one(
+        {"_id": ObjectId(project_id), "user_id": ObjectId(user_id)},
+        {"_id": 1}
+    )
+    if not project:
+        raise HTTPException(status_code=403, detail="Project not found or not owned")
+
+    items = []
+    async for item in documents_collection.find({"project_id": ObjectId(project_id)}, TREE_PROJECTION):
+        item = serialize_mongo(item)
+        item["type"] = item.get("type", "document")
+        if item["type"] == "document":
+            item["chapters"] = with_order(item.get("chapters") or [])
+            for ch in item["chapters"]:
+                ch["scenes"] = with_order(ch.get("scenes") or [])
+        items.append(item)
+
+    return {"project_id": project_id, "items": build_tree(items)}
 
 
 # ────────────────────────────────────────────────
@@ -263,7 +552,7 @@ async def get_document(
     document_id: str,
     user_id=Depends(get_current_user)
 ):
-    doc = await get_owned_document(user_id, project_id, document_id)
+    doc = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not doc:
         raise HTTPException(status_code=404, detail="Document or folder not found")
 
@@ -287,58 +576,40 @@ DEFAULT_DOC_SETTINGS = {
     "defaultFontSize": 12, "defaultLineHeight": 1.5,
 }
 
+def _stats_fields(document: dict) -> dict:
+    """Listing/stats fields read straight from the maintained `stats` subdocument."""
+    stats = document.get("stats") or {}
+    return {
+        "chapter_count": stats.get("chapter_count", 0),
+        "scene_count": stats.get("scene_count", 0),
+        "word_count": document.get("total_wordcount", 0),
+        "character_count_with_spaces": stats.get("character_count_with_spaces", 0),
+        "character_count_without_spaces": stats.get("character_count_without_spaces", 0),
+        "longest_chapter": stats.get("longest_chapter"),
+        "shortest_chapter": stats.get("shortest_chapter"),
+        "longest_scene": stats.get("longest_scene"),
+        "shortest_scene": stats.get("shortest_scene"),
+    }
+
+
 @router.get("/{document_id}/stats", response_model=DocumentStatsResponse)
 async def get_document_stats(
     project_id: str,
     document_id: str,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document or document.get("type") == "folder":
         raise HTTPException(status_code=404, detail="Document not found")
 
-    chapters = document.get("chapters", [])
-    word_count = sum(ch.get("wordcount", 0) for ch in chapters)
-
-    all_scenes = []
-    total_chars_with = 0
-    total_chars_without = 0
-
-    for ch in chapters:
-        for sc in ch.get("scenes", []):
-            cw, cwo = count_characters(sc.get("content", ""))
-            total_chars_with += cw
-            total_chars_without += cwo
-            all_scenes.append((sc.get("title", ""), sc.get("wordcount", 0), ch.get("title", "")))
-
-    longest_chapter = None
-    shortest_chapter = None
-    if chapters:
-        sorted_ch = sorted(chapters, key=lambda c: c.get("wordcount", 0))
-        shortest_chapter = {"title": sorted_ch[0].get("title", ""), "word_count": sorted_ch[0].get("wordcount", 0)}
-        longest_chapter  = {"title": sorted_ch[-1].get("title", ""), "word_count": sorted_ch[-1].get("wordcount", 0)}
-
-    longest_scene = None
-    shortest_scene = None
-    if all_scenes:
-        sorted_sc = sorted(all_scenes, key=lambda s: s[1])
-        shortest_scene = {"title": sorted_sc[0][0],  "word_count": sorted_sc[0][1],  "chapter_title": sorted_sc[0][2]}
-        longest_scene  = {"title": sorted_sc[-1][0], "word_count": sorted_sc[-1][1], "chapter_title": sorted_sc[-1][2]}
-
+    stats = _stats_fields(document)
     settings = document.get("settings") or DEFAULT_DOC_SETTINGS
-    pages = estimate_pages(settings, word_count, len(chapters))
+    # laid out with the PDF export's font metrics; scene layouts are cached by content hash
+    pages = await document_page_estimate(document, settings) if stats["word_count"] else 0.0
 
     return {
         "document_id": str(document["_id"]),
-        "chapter_count": len(chapters),
-        "scene_count": len(all_scenes),
-        "word_count": word_count,
-        "character_count_with_spaces": total_chars_with,
-        "character_count_without_spaces": total_chars_without,
-        "longest_chapter": longest_chapter,
-        "shortest_chapter": shortest_chapter,
-        "longest_scene": longest_scene,
-        "shortest_scene": shortest_scene,
+        **stats,
         "estimated_pages": pages,
     }
 
@@ -347,38 +618,46 @@ async def get_document_stats(
 # REORDER CHAPTERS
 # ────────────────────────────────────────────────
 @router.put("/{document_id}/chapters/reorder")
+@read_modify_write
 async def reorder_chapters(
     project_id: str,
     document_id: str,
     payload: ReorderRequest,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
     chapter_map = {c["id"]: c for c in document["chapters"]}
 
-    if set(payload.ordered_ids) != set(chapter_map.keys()):
+    if sorted(payload.ordered_ids) != sorted(chapter_map):
         raise HTTPException(status_code=400, detail="Invalid chapter IDs")
-
-    reordered = []
-    for index, cid in enumerate(payload.ordered_ids):
-        chapter_map[cid]["order"] = index
-        reordered.append(chapter_map[cid])
-
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$set": {"chapters": reordered, "updated_at": datetime.utcnow()}}
+    read_version(document, payload.version)
+
+    # fresh, evenly spaced ranks; only the rank fields are written
+    keys = spread_keys(len(payload.ordered_ids))
+    updated = await skeleton_update(
+        document_id,
+        document,
+        {},
+        {"$set": {
+            **{f"chapters.$[c{i}].rank": key for i, key in enumerate(keys)},
+            "updated_at": datetime.utcnow(),
+        }},
+        array_filters=[{f"c{i}.id": cid} for i, cid in enumerate(payload.ordered_ids)],
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Document not found")
 
-    return {"status": "Chapters reordered"}
+    return {"status": "Chapters reordered", "version": updated["version"]}
 
 
 # ────────────────────────────────────────────────
 # REORDER SCENES IN CHAPTER
 # ────────────────────────────────────────────────
 @router.put("/{document_id}/chapters/{chapter_id}/scenes/reorder")
+@read_modify_write
 async def reorder_scenes(
     project_id: str,
     document_id: str,
@@ -386,7 +665,7 @@ async def reorder_scenes(
     payload: ReorderRequest,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
@@ -396,27 +675,161 @@ async def reorder_scenes(
 
     scene_map = {s["id"]: s for s in chapter["scenes"]}
 
-    if set(payload.ordered_ids) != set(scene_map.keys()):
+    if sorted(payload.ordered_ids) != sorted(scene_map):
         raise HTTPException(status_code=400, detail="Invalid scene IDs")
+    read_version(document, payload.version)
 
-    reordered = []
-    for index, sid in enumerate(payload.ordered_ids):
-        scene_map[sid]["order"] = index
-        reordered.append(scene_map[sid])
-
-    chapter["scenes"] = reordered
-
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$set": {"chapters": document["chapters"], "updated_at": datetime.utcnow()}}
+    keys = spread_keys(len(payload.ordered_ids))
+    updated = await skeleton_update(
+        document_id,
+        document,
+        {},
+        {"$set": {
+            **{f"chapters.$[c].scenes.$[s{i}].rank": key for i, key in enumerate(keys)},
+            "updated_at": datetime.utcnow(),
+        }},
+        array_filters=[{"c.id": chapter_id}] + [{f"s{i}.id": sid} for i, sid in enumerate(payload.ordered_ids)],
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Document not found")
 
-    return {"status": "Scenes reordered"}
+    return {"status": "Scenes reordered", "version": updated["version"]}
 
 
 # ────────────────────────────────────────────────
 # AUTOSAVE SCENE CONTENT
 # ────────────────────────────────────────────────
+def _scene_query(project_id: str, chapter_id: str, scene_id: str) -> dict:
+    return {
+        "project_id": ensure_objectid(project_id),
+        "type": {"$ne": "folder"},
+        "chapters": {"$elemMatch": {"id": chapter_id, "scenes.id": scene_id}},
+    }
+
+
+async def _claim_scene(user_id: str, project_id: str, document_id: str, scene_query: dict,
+                       version: Optional[int]) -> dict:
+    """
+    Claim the next document version for a content write, before the scenes
+    collection is touched. This one write is the ownership, existence
+    (`scene_query`) and optimistic-concurrency check; the counters follow
+    without a bump (_count_scenes, or the write-behind flush).
+    """
+    touch = {"$set": {"updated_at": datetime.utcnow()}}
+    claimed = await versioned_update(
+        document_id, version, {**scene_query, "user_id": ensure_objectid(user_id)}, touch
+    )
+    if claimed is None:
+        # not yet backfilled by m005_backfill_document_owner
+        scene_filter = {"_id": ensure_objectid(document_id), **scene_query}
+        if await find_owned_document(user_id, project_id, scene_filter, {"_id": 1}):
+            claimed = await versioned_update(document_id, version, scene_query, touch)
+    if claimed is None:
+        raise HTTPException(status_code=404, detail="Scene not found")
+    return claimed
+
+
+async def _count_scenes(document_id: str, scenes: list) -> dict:
+    """
+    Move the chapter/document counters for scene content just written
+    (scene_counts_update). The save already claimed its version, so like
+    the flush this bumps `counts_version` only. Returns the AFTER image
+    with STATS_COUNTERS_PROJECTION.
+    """
+    update, array_filters = scene_counts_update(scenes)
+    update["$inc"]["counts_version"] = 1
+    updated = await documents_collection.find_one_and_update(
+        {"_id": ensure_objectid(document_id)},
+        update,
+        projection=STATS_COUNTERS_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+        array_filters=array_filters,
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Scene not found")
+
+    # longest/shortest only need a second write when they may have moved
+    await refresh_outline_extremes(updated, *moved_wordcounts(scenes))
+    return updated
+
+
+async def _store_scene_content(document_id: str, chapter_id: str, scene_id: str, content: str, version: int,
+                               base_hash: Optional[str] = None, paragraphs: Optional[list] = None) -> dict:
+    """
+    Write one scene's content under the `version` claimed for it and $inc
+    the chapter/document totals by the wordcount delta, without loading
+    the chapters array. Only paragraphs missing from the stored
+    `paragraphs` table are recounted.
+    """
+    previous, counts = await overwrite_scene_content(
+        document_id, chapter_id, scene_id, content, base_hash, paragraphs
+    )
+    if base_hash is not None and previous is None:
+        raise HTTPException(status_code=412, detail="Scene content changed, send the full content")
+
+    updated = await _count_scenes(document_id, [(chapter_id, scene_id, previous or {}, counts)])
+    chapter = next(c for c in updated["chapters"] if c["id"] == chapter_id)
+
+    return {
+        "scene_id": scene_id,
+        "scene_wordcount": counts["wordcount"],
+        "chapter_wordcount": chapter["wordcount"],
+        "document_wordcount": updated["total_wordcount"],
+        "content_hash": counts["content_hash"],
+        "version": version,
+    }
+
+
+def _buffer_scene_content(document_id: str, scene_id: str, content: str) -> dict:
+    """
+    Write-behind path: acknowledge once the content is journaled. Chapter
+    and document totals catch up when the buffer flushes.
+    """
+    autosave_buffer.put(document_id, scene_id, content)
+    digest = content_hash(content)
+    return {
+        "scene_id": scene_id,
+        # cached, so the flush does not count it again
+        "scene_wordcount": scene_counts(content, digest)["wordcount"],
+        "content_hash": digest,
+        "buffered": True,
+    }
+
+
+async def _unchanged_scene(user_id: str, project_id: str, document_id: str, chapter_id: str, scene_id: str,
+                           scene_query: dict, stored: Optional[dict], content: str,
+                           version: Optional[int]) -> Optional[dict]:
+    """
+    Autosave of exactly the content already saved (`stored`: the scene
+    record's hash and counts) or pending in the buffer: answer without
+    claiming a version, writing or recounting. None when the content changed.
+    """
+    pending = autosave_buffer.pending_content(document_id, scene_id)
+    if pending is not None:
+        if pending != content:
+            return None
+        stored = {**scene_counts(content), "content_hash": content_hash(content)}
+    elif not stored or stored.get("content_hash") != content_hash(content):
+        return None
+
+    document = await find_owned_document(
+        user_id, project_id, {"_id": ensure_objectid(document_id), **scene_query},
+        {"version": 1, "total_wordcount": 1, "chapters": {"$elemMatch": {"id": chapter_id}}}
+    )
+    if not document:
+        raise HTTPException(status_code=404, detail="Scene not found")
+    current = read_version(document, version)
+    return {
+        "version": current,
+        "scene_id": scene_id,
+        "scene_wordcount": stored.get("wordcount", 0),
+        "chapter_wordcount": document["chapters"][0].get("wordcount", 0),
+        "document_wordcount": document.get("total_wordcount", 0),
+        "content_hash": stored["content_hash"],
+        "unchanged": True,
+    }
+
+
 @router.put("/{document_id}/chapters/{chapter_id}/scenes/{scene_id}")
 async def autosave_scene(
     project_id: str,
@@ -426,41 +839,181 @@ async def autosave_scene(
     payload: SceneAutosaveRequest,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
-    if not document or document["type"] == "folder":
-        raise HTTPException(status_code=404, detail="Document not found or is a folder")
+    scene_query = _scene_query(project_id, chapter_id, scene_id)
+    # hash, counts and paragraph table; the content itself is not read
+    stored = await stored_scene_counts(document_id, chapter_id, scene_id)
+    unchanged = await _unchanged_scene(
+        user_id, project_id, document_id, chapter_id, scene_id, scene_query, stored, payload.content, payload.version
+    )
+    if unchanged is not None:
+        return unchanged
 
-    chapter = next((c for c in document["chapters"] if c["id"] == chapter_id), None)
-    if not chapter:
-        raise HTTPException(status_code=404, detail="Chapter not found")
+    claimed = await _claim_scene(user_id, project_id, document_id, scene_query, payload.version)
+    if autosave_buffer.enabled:
+        return {"version": claimed["version"], **_buffer_scene_content(document_id, scene_id, payload.content)}
 
-    scene = next((s for s in chapter["scenes"] if s["id"] == scene_id), None)
-    if not scene:
+    return await _store_scene_content(
+        document_id, chapter_id, scene_id, payload.content, claimed["version"],
+        paragraphs=(stored or {}).get("paragraphs")
+    )
+
+
+# ────────────────────────────────────────────────
+# AUTOSAVE SCENE DELTA
+# ────────────────────────────────────────────────
+@router.put("/{document_id}/chapters/{chapter_id}/scenes/{scene_id}/delta")
+async def autosave_scene_delta(
+    project_id: str,
+    document_id: str,
+    chapter_id: str,
+    scene_id: str,
+    payload: SceneDeltaRequest,
+    user_id=Depends(get_current_user)
+):
+    """
+    Autosave only the edit: splice ops against the content whose hash is
+    `base_hash`. 412 means the stored content is not that base any more;
+    the client then falls back to the full-content PUT.
+    """
+    scene_query = _scene_query(project_id, chapter_id, scene_id)
+    scene_filter = {"_id": ensure_objectid(document_id), **scene_query}
+    if not await find_owned_document(user_id, project_id, scene_filter, {"_id": 1}):
         raise HTTPException(status_code=404, detail="Scene not found")
 
-    content = payload.content
-    scene_wordcount = count_words(content)
-    scene["content"] = content
-    scene["wordcount"] = scene_wordcount
+    stored = None
+    base = autosave_buffer.pending_content(document_id, scene_id)
+    if base is not None:
+        base_hash = content_hash(base)
+    else:
+        stored = await get_scene_content(document_id, chapter_id, scene_id)
+        base, base_hash = (stored["content"], stored_content_hash(stored)) if stored else ("", None)
+    if base_hash != payload.base_hash:
+        raise HTTPException(status_code=412, detail="Scene content changed, send the full content")
+    try:
+        content = apply_splices(base, [(op.start, op.delete, op.insert) for op in payload.ops])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if content == base:
+        unchanged = await _unchanged_scene(
+            user_id, project_id, document_id, chapter_id, scene_id, scene_query, stored, content, payload.version
+        )
+        if unchanged is not None:
+            return unchanged
 
-    chapter["wordcount"] = sum_scene_wordcounts(chapter["scenes"])
+    claimed = await _claim_scene(user_id, project_id, document_id, scene_query, payload.version)
+    if autosave_buffer.enabled:
+        return {"version": claimed["version"], **_buffer_scene_content(document_id, scene_id, content)}
 
-    total_wordcount = sum(c["wordcount"] for c in document["chapters"])
+    # only lands if nothing else was saved since the base was read
+    return await _store_scene_content(
+        document_id, chapter_id, scene_id, content, claimed["version"], payload.base_hash,
+        paragraphs=(stored or {}).get("paragraphs")
+    )
 
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$set": {
-            "chapters": document["chapters"],
-            "total_wordcount": total_wordcount,
-            "updated_at": datetime.utcnow()
-        }}
+
+# ────────────────────────────────────────────────
+# BATCH AUTOSAVE
+# ────────────────────────────────────────────────
+@router.put("/{document_id}/scenes:batch")
+async def autosave_scenes_batch(
+    project_id: str,
+    document_id: str,
+    payload: SceneBatchRequest,
+    user_id=Depends(get_current_user)
+):
+    """
+    Save many scenes of one document at once: one write claiming the
+    version (ownership, every scene exists, version check), one bulk_write
+    for the scene records and one update for every chapter and document
+    counter.
+    """
+    contents = {}  # scene_id -> (chapter_id, content); the last entry for a scene wins
+    for entry in payload.scenes:
+        contents[entry.scene_id] = (entry.chapter_id, entry.content)
+    if not contents:
+        raise HTTPException(status_code=400, detail="No scenes to save")
+
+    batch_query = {
+        "project_id": ensure_objectid(project_id),
+        "type": {"$ne": "folder"},
+        "$and": [
+            {"chapters": {"$elemMatch": {"id": chapter_id, "scenes.id": scene_id}}}
+            for scene_id, (chapter_id, _) in contents.items()
+        ],
+    }
+    claimed = await _claim_scene(user_id, project_id, document_id, batch_query, payload.version)
+    if autosave_buffer.enabled:
+        return {
+            "scenes": [
+                {**_buffer_scene_content(document_id, scene_id, content), "chapter_id": chapter_id}
+                for scene_id, (chapter_id, content) in contents.items()
+            ],
+            "version": claimed["version"],
+        }
+
+    # every scene is in the outline (batch_query), so a missing record is created
+    written = await write_scene_batch([(document_id, c, s, content) for s, (c, content) in contents.items()])
+    scenes = [(chapter_id, scene_id, previous, counts) for _, chapter_id, scene_id, previous, counts in written]
+    updated = await _count_scenes(document_id, scenes)
+
+    touched = {chapter_id for chapter_id, *_ in scenes}
+    return {
+        "scenes": [
+            {
+                "scene_id": scene_id,
+                "chapter_id": chapter_id,
+                "scene_wordcount": counts["wordcount"],
+                "content_hash": counts["content_hash"],
+            }
+            for chapter_id, scene_id, _, counts in scenes
+        ],
+        "chapters": [
+            {"chapter_id": c["id"], "wordcount": c["wordcount"]}
+            for c in updated["chapters"] if c["id"] in touched
+        ],
+        "document_wordcount": updated["total_wordcount"],
+        "version": claimed["version"],
+    }
+
+
+# ────────────────────────────────────────────────
+# GET ONE CHAPTER WITH CONTENT
+# ────────────────────────────────────────────────
+@router.get("/{document_id}/chapters/{chapter_id}/content", response_model=ChapterContentResponse)
+async def get_chapter_content(
+    project_id: str,
+    document_id: str,
+    chapter_id: str,
+    user_id=Depends(get_current_user)
+):
+    """
+    One chapter's scenes in order, with content. Only that chapter of the
+    skeleton is projected ($elemMatch) and only its scene records are read.
+    """
+    document = await find_owned_document(
+        user_id,
+        project_id,
+        {"_id": ensure_objectid(document_id), "type": {"$ne": "folder"}},
+        {"version": 1, "chapters": {"$elemMatch": {"id": chapter_id}}},
     )
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found or is a folder")
+    if not document.get("chapters"):
+        raise HTTPException(status_code=404, detail="Chapter not found")
+
+    chapter = document["chapters"][0]
+    chapter["scenes"] = with_order(chapter.get("scenes", []))
+    await attach_scene_content(document_id, [chapter], chapter_id)
+    autosave_buffer.overlay(document_id, [chapter])
 
     return {
-        "scene_id": scene_id,
-        "scene_wordcount": scene_wordcount,
-        "chapter_wordcount": chapter["wordcount"],
-        "document_wordcount": total_wordcount
+        "document_id": document_id,
+        "chapter_id": chapter_id,
+        "title": chapter.get("title", ""),
+        "wordcount": chapter.get("wordcount", 0),
+        "version": document.get("version", 0),
+        "scenes": chapter["scenes"],
     }
 
 
@@ -475,7 +1028,7 @@ async def get_scene(
     scene_id: str,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
@@ -487,13 +1040,20 @@ async def get_scene(
     if not scene:
         raise HTTPException(status_code=404, detail="Scene not found")
 
+    stored = await get_scene_content(document_id, chapter_id, scene_id)
+    pending = autosave_buffer.pending_content(document_id, scene_id)
+    if pending is not None:
+        stored = {"content": pending, "content_hash": content_hash(pending)}
+
     return {
         "scene_id": scene_id,
         "chapter_id": chapter["id"],
-        "content": scene.get("content", ""),
+        "content": (stored or {}).get("content", ""),
+        "content_hash": stored_content_hash(stored or {}),
         "scene_wordcount": scene["wordcount"],
         "chapter_wordcount": chapter["wordcount"],
-        "document_wordcount": document["total_wordcount"]
+        "document_wordcount": document["total_wordcount"],
+        "version": document.get("version", 0),
     }
 
 
@@ -504,9 +1064,10 @@ async def get_scene(
 async def get_document_outline(
     project_id: str,
     document_id: str,
+    content: bool = Query(True, description="Include scene content; false returns only ids, titles, order and word counts"),
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "full" if content else "outline")
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -514,18 +1075,129 @@ async def get_document_outline(
     if doc_type == "folder":
         raise HTTPException(status_code=400, detail="Outline is only available for documents, not folders")
 
-    chapters = sorted(document["chapters"], key=lambda c: c["order"])
+    chapters = with_order(document["chapters"])
     for ch in chapters:
-        ch["scenes"] = sorted(ch["scenes"], key=lambda s: s["order"])
+        ch["scenes"] = with_order(ch["scenes"])
 
     return {
         "document_id": str(document["_id"]),
         "title": document["title"],
         "total_wordcount": document.get("total_wordcount", 0),
+        "version": document.get("version", 0),
         "chapters": chapters
     }
 
 
+# ────────────────────────────────────────────────
+# STREAM THE WHOLE MANUSCRIPT (NDJSON)
+# ────────────────────────────────────────────────
+@router.get("/{document_id}/manuscript")
+async def stream_document_manuscript(
+    project_id: str,
+    document_id: str,
+    user_id=Depends(get_current_user)
+):
+    """
+    Every chapter and scene with content, in reading order, one JSON object
+    per line: a "document" header, then each "chapter" followed by its
+    "scene" lines. Streamed straight from an aggregation cursor.
+    """
+    document = await get_owned_document(user_id, project_id, document_id, "meta")
+    if not document or document.get("type") == "folder":
+        raise HTTPException(status_code=404, detail="Document not found or is a folder")
+
+    return StreamingResponse(stream_manuscript(document), media_type="application/x-ndjson")
+
+
+# ────────────────────────────────────────────────
+# BATCH STRUCTURAL OPERATIONS
+# ────────────────────────────────────────────────
+@router.post("/{document_id}/outline:batch", response_model=DocumentOutlineResponse)
+@read_modify_write
+async def batch_outline_operations(
+    project_id: str,
+    document_id: str,
+    payload: OutlineBatchRequest,
+    user_id=Depends(get_current_user)
+):
+    """
+    Apply an ordered list of structural ops to one loaded skeleton and
+    commit once, conditional on the skeleton being unchanged. An invalid op
+    rejects the whole batch with 400 before anything is written. Returns
+    the new outline without scene content.
+    """
+    # moved and removed scene records must not have content still buffered
+    await flush_autosaves()
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
+    if not document or document["type"] == "folder":
+        raise HTTPException(status_code=404, detail="Document not found or is a folder")
+    read_version(document, payload.version)
+
+    before = {s["id"]: c["id"] for c in document["chapters"] for s in c["scenes"]}
+    try:
+        chapters, inserted = apply_outline_ops(
+            document["chapters"], [op.model_dump(exclude_none=True) for op in payload.ops], scene_counts_many
+        )
+    except OutlineOpError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    after = {s["id"]: c["id"] for c in chapters for s in c["scenes"]}
+
+    removed = [scene_id for scene_id in before if scene_id not in after]
+    moved = {
+        scene_id: after[scene_id]
+        for scene_id in before
+        if scene_id in after and after[scene_id] != before[scene_id]
+    }
+    removed_counts = await sum_counts_of_scenes(document_id, removed)
+    added_counts = {k: 0 for k in removed_counts}
+    for _, counts in inserted.values():
+        for k, v in counts.items():
+            added_counts[k] += v
+
+    # new and moved scene records go in before the skeleton that points at
+    # them is committed, and are put back if it is not; removed records are
+    # only deleted once it is
+    total_wordcount = sum(c["wordcount"] for c in chapters)
+    updated = None
+    try:
+        await apply_outline_changes(
+            document_id,
+            {scene_id: (after[scene_id], content, counts) for scene_id, (content, counts) in inserted.items()},
+            moved,
+            [],
+        )
+        updated = await skeleton_update(
+            document_id,
+            document,
+            {},
+            {
+                "$set": {
+                    "chapters": chapters,
+                    "total_wordcount": total_wordcount,
+                    "updated_at": datetime.utcnow(),
+                    **outline_stats_update(chapters),
+                },
+                "$inc": character_delta_update(removed_counts, added_counts),
+            }
+        )
+    finally:
+        if not updated:
+            await apply_outline_changes(
+                document_id, {}, {scene_id: before[scene_id] for scene_id in moved}, list(inserted)
+            )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Document not found")
+    await apply_outline_changes(document_id, {}, {}, removed)
+
+    return {
+        "document_id": str(document["_id"]),
+        "title": document["title"],
+        "total_wordcount": total_wordcount,
+        "version": updated["version"],
+        "chapters": chapters,
+    }
+
+
 # ────────────────────────────────────────────────
 # RENAME DOCUMENT / FOLDER
 # ────────────────────────────────────────────────
@@ -536,44 +1208,152 @@ async def update_document(
     data: dict = Body(...),
     user_id=Depends(get_current_user)
 ):
-    doc = await get_owned_document(user_id, project_id, document_id)
+    doc = await get_owned_document(user_id, project_id, document_id, "meta")
     if not doc:
         raise HTTPException(404, "Document or folder not found or not owned")
 
-    update_data = {k: v for k, v in data.items() if v is not None}
+    update_data = {k: v for k, v in data.items() if v is not None and k not in ("title_key", "user_id", "path")}
 
-    # if title or parent_id change, ensure no duplicates
+    # moving to another project: it must belong to the same user, and the
+    # denormalized owner moves with the document
+    if "project_id" in update_data:
+        target_project = await projects_collection.find_one(
+            {"_id": ensure_objectid(update_data["project_id"]), "user_id": ObjectId(user_id)},
+            {"_id": 1}
+        )
+        if not target_project:
+            raise HTTPException(404, "Target project not found or not owned")
+        update_data["project_id"] = target_project["_id"]
+        update_data["user_id"] = ObjectId(user_id)
+        update_data.setdefault("parent_id", None)  # lands in the target project's root
+
+    # if title or parent_id change, keep title_key in sync; the unique index
+    # rejects duplicates in the target folder
     if "title" in update_data or "parent_id" in update_data:
         new_title = update_data.get("title", doc.get("title", "")).strip()
-        new_parent = update_data.get("parent_id", doc.get("parent_id"))
-        new_parent = ensure_objectid(new_parent) if new_parent else None
-
-        # escape title before regex
-        escaped_title = re.escape(new_title)
-        conflict = await documents_collection.find_one({
-            "project_id": ObjectId(project_id),
-            "parent_id": new_parent,
-            "title": {"$regex": f"^{escaped_title}$", "$options": "i"},
-            "_id": {"$ne": ObjectId(document_id)}
-        })
-        if conflict:
-            raise HTTPException(status_code=409, detail="An item with that name already exists in this folder")
-
         update_data["title"] = new_title
+        update_data["title_key"] = title_key(new_title)
         if "parent_id" in update_data:
-            update_data["parent_id"] = new_parent
-
-    if update_data:
-        update_data["updated_at"] = datetime.utcnow()
-        await documents_collection.update_one(
+            new_parent = update_data["parent_id"]
+            update_data["parent_id"] = ensure_objectid(new_parent) if new_parent else None
+
+    # moving: the item and, for a folder, its whole subtree get new paths
+    moved = "parent_id" in update_data
+    if moved:
+        old_path = await resolve_path(doc)
+        new_path = await path_for_parent(update_data.get("project_id", doc["project_id"]), update_data["parent_id"])
+        if new_path is None:
+            raise HTTPException(404, "Target folder not found")
+        if doc.get("type") == "folder" and new_path.startswith(child_path(doc)):
+            raise HTTPException(400, "Cannot move a folder into itself")
+        update_data["path"] = new_path
+
+    if not update_data:
+        return doc
+
+    update_data["updated_at"] = datetime.utcnow()
+    try:
+        updated = await documents_collection.find_one_and_update(
             {"_id": ObjectId(document_id), "project_id": ObjectId(project_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection=DOCUMENT_PROJECTIONS["meta"],
+            return_document=ReturnDocument.AFTER
         )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="An item with that name already exists in this folder")
 
-    updated = await documents_collection.find_one({"_id": ObjectId(document_id)})
+    if moved and doc.get("type") == "folder":
+        # descendants keep their parent_id; only the path prefix (and the
+        # project, when it changed) is rewritten, in one update_many
+        subtree_fields = {k: update_data[k] for k in ("project_id", "user_id") if k in update_data}
+        if update_data["path"] != old_path or subtree_fields:
+            await move_subtree(doc, child_path(updated), subtree_fields)
     return serialize_mongo(updated)
 
 
+# ────────────────────────────────────────────────
+# COPY / MOVE DOCUMENT OR FOLDER (server-side)
+# ────────────────────────────────────────────────
+@router.post("/{document_id}/copy", response_model=DocumentResponse)
+async def copy_document(
+    project_id: str,
+    document_id: str,
+    payload: CopyMoveRequest,
+    user_id=Depends(get_current_user)
+):
+    """
+    Duplicate a document, or a folder with its whole subtree, into another
+    folder or project. Items and scene content are copied inside Mongo. A
+    name already taken in the target folder is a 409, as on create.
+    """
+    # buffered autosaves are written first so the copied skeleton and scenes include them
+    await flush_autosaves()
+    doc = await get_owned_document(user_id, project_id, document_id, "skeleton")
+    if not doc:
+        raise HTTPException(404, "Document or folder not found or not owned")
+
+    target_project_id = ObjectId(project_id)
+    if payload.target_project_id and payload.target_project_id != project_id:
+        target_project = await projects_collection.find_one(
+            {"_id": ensure_objectid(payload.target_project_id), "user_id": ObjectId(user_id)},
+            {"_id": 1}
+        )
+        if not target_project:
+            raise HTTPException(404, "Target project not found or not owned")
+        target_project_id = target_project["_id"]
+
+    title = (payload.title or doc.get("title", "")).strip()
+    if not title:
+        raise HTTPException(400, "Title cannot be empty")
+
+    await resolve_path(doc)
+    parent = ensure_objectid(payload.target_parent_id) if payload.target_parent_id else None
+    path = await path_for_parent(target_project_id, parent)
+    if path is None:
+        raise HTTPException(404, "Target folder not found")
+    if doc.get("type") == "folder" and path.startswith(child_path(doc)):
+        raise HTTPException(400, "Cannot copy a folder into itself")
+
+    now = datetime.utcnow()
+    copy = {
+        **doc,
+        "_id": ObjectId(),
+        "project_id": target_project_id,
+        "user_id": ObjectId(user_id),
+        "parent_id": parent,
+        "path": path,
+        "title": title,
+        "title_key": title_key(title),
+        "created_at": now,
+        "updated_at": now,
+        "version": 0,
+    }
+    try:
+        await documents_collection.insert_one(copy)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="An item with that name already exists in this folder")
+
+    await copy_subtree(doc, copy)
+
+    return serialize_mongo(copy)
+
+
+@router.post("/{document_id}/move")
+async def move_document(
+    project_id: str,
+    document_id: str,
+    payload: CopyMoveRequest,
+    user_id=Depends(get_current_user)
+):
+    """Relocate a document or folder subtree; same checks and 409 as a PATCH of parent_id."""
+    data = {"parent_id": payload.target_parent_id or ""}  # "" is the project root
+    if payload.target_project_id and payload.target_project_id != project_id:
+        data["project_id"] = payload.target_project_id
+    if payload.title:
+        data["title"] = payload.title
+    return await update_document(project_id, document_id, data, user_id)
+
+
 # ────────────────────────────────────────────────
 # UPDATE DOCUMENT SETTINGS
 # ────────────────────────────────────────────────
@@ -584,7 +1364,7 @@ async def update_document_settings(
     settings: DocumentSettings,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "meta")
     if not document:
         raise HTTPException(404, "Document not found or not owned")
 
@@ -607,7 +1387,7 @@ async def get_document_settings(
     document_id: str,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "settings")
     if not document:
         raise HTTPException(404, "Document not found or not owned")
 
@@ -647,7 +1427,7 @@ async def apply_document_settings_to_content(
     document_id: str,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "settings")
     if not document:
         raise HTTPException(404, "Document not found or not owned")
 
@@ -655,43 +1435,46 @@ async def apply_document_settings_to_content(
     if not settings:
         raise HTTPException(400, "No document settings found")
 
+    await flush_autosaves()
     updated_scenes = 0
-    for chapter in document.get("chapters", []):
-        for scene in chapter.get("scenes", []):
-            content = scene.get("content", "")
-            if content:
-                content = re.sub(
-                    r'font-family:[^;"]*;?',
-                    f'font-family:{settings.get("defaultFont", "Arial, sans-serif")};',
-                    content
-                )
-                content = re.sub(
-                    r'font-size:[^;"]*;?',
-                    f'font-size:{settings.get("defaultFontSize", 12)}pt;',
-                    content
-                )
-                content = re.sub(
-                    r'text-align:[^;"]*;?',
-                    f'text-align:{settings.get("defaultAlignment", "left")};',
-                    content
-                )
-                content = re.sub(
-                    r'text-indent:[^;"]*px[^;"]*;?',
-                    '',
-                    content
-                )
-                content = re.sub(
-                    r'text-indent:\s*var\(--default-first-line-indent,\s*0\)[^;"]*;?',
-                    'text-indent: var(--default-first-line-indent, 0);',
-                    content
-                )
-
-                scene["content"] = content
-                updated_scenes += 1
-
+    new_contents = {}
+    async for scene in iter_scene_contents(document_id):
+        content = scene.get("content", "")
+        if content:
+            content = re.sub(
+                r'font-family:[^;"]*;?',
+                f'font-family:{settings.get("defaultFont", "Arial, sans-serif")};',
+                content
+            )
+            content = re.sub(
+                r'font-size:[^;"]*;?',
+                f'font-size:{settings.get("defaultFontSize", 12)}pt;',
+                content
+            )
+            content = re.sub(
+                r'text-align:[^;"]*;?',
+                f'text-align:{settings.get("defaultAlignment", "left")};',
+                content
+            )
+            content = re.sub(
+                r'text-indent:[^;"]*px[^;"]*;?',
+                '',
+                content
+            )
+            content = re.sub(
+                r'text-indent:\s*var\(--default-first-line-indent,\s*0\)[^;"]*;?',
+                'text-indent: var(--default-first-line-indent, 0);',
+                content
+            )
+
+            new_contents[scene["scene_id"]] = content
+            updated_scenes += 1
+
+    await replace_scene_contents(document_id, new_contents)
+    # rewrote scene content: editors holding the old version must reload
     await documents_collection.update_one(
         {"_id": ObjectId(document_id), "project_id": ObjectId(project_id)},
-        {"$set": {"chapters": document.get("chapters", []), "updated_at": datetime.utcnow()}}
+        {"$set": {"updated_at": datetime.utcnow()}, "$inc": {"version": 1}}
     )
 
     return {"message": f"Applied settings to {updated_scenes} scenes"}
@@ -706,17 +1489,27 @@ async def delete_document(
     document_id: str,
     user_id=Depends(get_current_user)
 ):
-    doc = await get_owned_document(user_id, project_id, document_id)
+    doc = await get_owned_document(user_id, project_id, document_id, "meta")
     if not doc:
         raise HTTPException(404, "Document or folder not found or not owned")
 
-    result = await documents_collection.delete_one({
-        "_id": ObjectId(document_id),
-        "project_id": ObjectId(project_id),
-    })
+    # a folder takes its whole subtree with it
+    query = {"_id": ObjectId(document_id), "project_id": ObjectId(project_id)}
+    document_ids = [document_id]
+    if doc.get("type") == "folder":
+        await resolve_path(doc)
+        subtree = subtree_filter(doc)
+        document_ids = [
+            d["_id"] async for d in documents_collection.find({**subtree, "type": {"$ne": "folder"}}, {"_id": 1})
+        ]
+        query = {"$or": [query, subtree]}
+
+    result = await documents_collection.delete_many(query)
     if result.deleted_count == 0:
         raise HTTPException(404, "Document or folder not found")
 
+    await delete_documents_content(document_ids)
+
     return {"message": "Deleted successfully"}
 
 
@@ -724,30 +1517,42 @@ async def delete_document(
 # CREATE CHAPTER (only for documents)
 # ────────────────────────────────────────────────
 @router.post("/{document_id}/chapters")
+@read_modify_write
 async def create_chapter(
     project_id: str,
     document_id: str,
     data: CreateChapterRequest,
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document or document.get("type", "document") == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
+    read_version(document, data.version)
+    await ensure_ranks(document_id, document)
+    siblings = ordered(document["chapters"])
     chapter = {
         "id": str(uuid.uuid4()),
         "title": data.title.strip(),
-        "order": len(document["chapters"]),
+        "rank": key_between(rank_of(siblings[-1]) if siblings else None, None),
         "wordcount": 0,
         "scenes": []
     }
 
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$push": {"chapters": chapter}, "$set": {"updated_at": datetime.utcnow()}}
+    updated = await skeleton_update(
+        document_id,
+        document,
+        {},
+        {
+            "$push": {"chapters": chapter},
+            "$set": {"updated_at": datetime.utcnow(), **outline_stats_update(document["chapters"] + [chapter])},
+        }
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Document not found")
+    check_rank(document_id, chapter["rank"])
 
-    return chapter
+    return {**chapter, "order": len(siblings), "version": updated["version"]}
 
 # ────────────────────────────────────────────────
 # RENAME CHAPTER
@@ -760,30 +1565,32 @@ async def rename_chapter(
     data: dict = Body(...),
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "meta")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
-    chapter = next((c for c in document["chapters"] if c["id"] == chapter_id), None)
-    if not chapter:
-        raise HTTPException(status_code=404, detail="Chapter not found")
-
-    new_title = data.get("title", chapter["title"]).strip()
+    new_title = (data.get("title") or "").strip()
     if not new_title:
         raise HTTPException(status_code=400, detail="Title cannot be empty")
 
     # Allow duplicates (as requested)
     # No uniqueness check here
 
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id), "chapters.id": chapter_id},
+    updated = await versioned_update(
+        document_id,
+        data.get("version"),
+        {"chapters.id": chapter_id},
         {"$set": {
             "chapters.$.title": new_title,
             "updated_at": datetime.utcnow()
-        }}
+        }},
+        projection={"stats": 1}
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    await rename_in_stats(document_id, updated.get("stats"), chapter_id, new_title=new_title)
 
-    return {"message": "Chapter renamed", "new_title": new_title}
+    return {"message": "Chapter renamed", "new_title": new_title, "version": updated["version"]}
 
 
 # ────────────────────────────────────────────────
@@ -794,22 +1601,34 @@ async def delete_chapter(
     project_id: str,
     document_id: str,
     chapter_id: str,
+    version: Optional[int] = Query(None),
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "meta")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
-    chapter_exists = any(c["id"] == chapter_id for c in document["chapters"])
-    if not chapter_exists:
-        raise HTTPException(status_code=404, detail="Chapter not found")
-
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$pull": {"chapters": {"id": chapter_id}}, "$set": {"updated_at": datetime.utcnow()}}
+    # content is only deleted once the (possibly version-conditional) pull went through
+    await flush_autosaves()
+    removed = await sum_scene_counts(document_id, chapter_id)
+    updated = await versioned_update(
+        document_id,
+        version,
+        {"chapters.id": chapter_id},
+        {
+            "$pull": {"chapters": {"id": chapter_id}},
+            "$inc": {"total_wordcount": -removed["wordcount"], **character_delta_update(removed, None)},
+            "$set": {"updated_at": datetime.utcnow()},
+        }
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    await delete_scene_content(document_id, chapter_id)
+    # the chapter takes any number of scenes with it, so scene_count and
+    # the extremes are recomputed inside Mongo rather than patched
+    await recompute_outline_stats(document_id)
 
-    return {"message": "Chapter deleted"}
+    return {"message": "Chapter deleted", "version": updated["version"]}
 
 
 # ────────────────────────────────────────────────
@@ -824,32 +1643,30 @@ async def rename_scene(
     data: dict = Body(...),
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "meta")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
-    chapter = next((c for c in document["chapters"] if c["id"] == chapter_id), None)
-    if not chapter:
-        raise HTTPException(status_code=404, detail="Chapter not found")
-
-    scene = next((s for s in chapter["scenes"] if s["id"] == scene_id), None)
-    if not scene:
-        raise HTTPException(status_code=404, detail="Scene not found")
-
-    new_title = data.get("title", scene["title"]).strip()
+    new_title = (data.get("title") or "").strip()
     if not new_title:
         raise HTTPException(status_code=400, detail="Title cannot be empty")
 
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id), "chapters.id": chapter_id, "chapters.scenes.id": scene_id},
+    updated = await versioned_update(
+        document_id,
+        data.get("version"),
+        {"chapters": {"$elemMatch": {"id": chapter_id, "scenes.id": scene_id}}},
         {"$set": {
             "chapters.$[chapter].scenes.$[scene].title": new_title,
             "updated_at": datetime.utcnow()
         }},
-        array_filters=[{"chapter.id": chapter_id}, {"scene.id": scene_id}]
+        array_filters=[{"chapter.id": chapter_id}, {"scene.id": scene_id}],
+        projection={"stats": 1}
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Scene not found")
+    await rename_in_stats(document_id, updated.get("stats"), chapter_id, scene_id, new_title)
 
-    return {"message": "Scene renamed", "new_title": new_title}
+    return {"message": "Scene renamed", "new_title": new_title, "version": updated["version"]}
 
 
 # ────────────────────────────────────────────────
@@ -861,29 +1678,43 @@ async def delete_scene(
     document_id: str,
     chapter_id: str,
     scene_id: str,
+    version: Optional[int] = Query(None),
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "meta")
     if not document or document["type"] == "folder":
         raise HTTPException(status_code=404, detail="Document not found or is a folder")
 
-    chapter = next((c for c in document["chapters"] if c["id"] == chapter_id), None)
-    if not chapter:
-        raise HTTPException(status_code=404, detail="Chapter not found")
-
-    scene_exists = any(s["id"] == scene_id for s in chapter["scenes"])
-    if not scene_exists:
+    await flush_autosaves()
+    removed = await sum_scene_counts(document_id, chapter_id, scene_id)
+    updated = await versioned_update(
+        document_id,
+        version,
+        {"chapters": {"$elemMatch": {"id": chapter_id, "scenes.id": scene_id}}},
+        {
+            "$pull": {"chapters.$.scenes": {"id": scene_id}},
+            "$inc": {
+                "chapters.$.wordcount": -removed["wordcount"],
+                "total_wordcount": -removed["wordcount"],
+                "stats.scene_count": -1,
+                **character_delta_update(removed, None),
+            },
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        projection=STATS_COUNTERS_PROJECTION
+    )
+    if not updated:
         raise HTTPException(status_code=404, detail="Scene not found")
-
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id), "chapters.id": chapter_id},
-        {"$pull": {"chapters.$.scenes": {"id": scene_id}}, "$set": {"updated_at": datetime.utcnow()}}
+    await delete_scene_content(document_id, chapter_id, scene_id)
+    await refresh_outline_extremes(
+        updated, [chapter_id] if removed["wordcount"] else [], removed=[scene_id]
     )
 
-    return {"message": "Scene deleted"}
+    return {"message": "Scene deleted", "version": updated["version"]}
 
 
 @router.post("/{document_id}/chapters/{chapter_id}/scenes/insert")
+@read_modify_write
 async def insert_scene(
     project_id: str,
     document_id: str,
@@ -891,7 +1722,7 @@ async def insert_scene(
     data: dict = Body(...),
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document:
         raise HTTPException(404, "Document not found")
 
@@ -899,31 +1730,45 @@ async def insert_scene(
     if not chapter:
         raise HTTPException(404, "Chapter not found")
 
-    insert_index = data.get("index", len(chapter["scenes"]))
+    read_version(document, data.get("version"))
+    await ensure_ranks(document_id, document)
+    siblings = ordered(chapter["scenes"])
+    insert_index = max(0, min(data.get("index", len(siblings)), len(siblings)))
 
     content = data.get("content", "")
+    counts = scene_counts(content)
     new_scene = {
         "id": str(uuid.uuid4()),
         "title": data.get("title", "New Scene"),
-        "order": insert_index,
-        "wordcount": count_words(content),
-        "content": content
+        "rank": key_at(siblings, insert_index),
+        "wordcount": counts["wordcount"],
     }
-
-    scenes = chapter["scenes"]
-    scenes.insert(insert_index, new_scene)
-
-    for i, s in enumerate(scenes):
-        s["order"] = i
-
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$set": {"chapters": document["chapters"]}}
+    chapter["scenes"].append(new_scene)
+
+    # only the new scene is written; its siblings keep their ranks
+    updated = await skeleton_update(
+        document_id,
+        document,
+        {"chapters.id": chapter_id},
+        {
+            "$push": {"chapters.$.scenes": new_scene},
+            "$inc": {
+                "chapters.$.wordcount": new_scene["wordcount"],
+                "total_wordcount": new_scene["wordcount"],
+                **character_delta_update(None, counts),
+            },
+            "$set": {"updated_at": datetime.utcnow(), **outline_stats_update(document["chapters"])},
+        }
     )
+    if not updated:
+        raise HTTPException(404, "Chapter not found")
+    await save_scene_content(document_id, chapter_id, new_scene["id"], content)
+    check_rank(document_id, new_scene["rank"])
 
-    return new_scene
+    return {**new_scene, "order": insert_index, "content": content, "version": updated["version"]}
 
 @router.put("/{document_id}/chapters/{chapter_id}/scenes/{scene_id}/move")
+@read_modify_write
 async def move_scene(
     project_id: str,
     document_id: str,
@@ -932,7 +1777,9 @@ async def move_scene(
     data: dict = Body(...),  # { target_chapter_id, target_index }
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    # the flush counts buffered content into the chapter its record is in
+    await flush_autosaves()
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document:
         raise HTTPException(404, "Document not found")
     if document["type"] == "folder":
@@ -946,39 +1793,48 @@ async def move_scene(
     if not scene:
         raise HTTPException(404, "Scene not found")
 
+    read_version(document, data.get("version"))
+    await ensure_ranks(document_id, document)
     target_chapter_id = data.get("target_chapter_id", chapter_id)
-    target_index = data.get("target_index", 0)
 
     target_chapter = next((c for c in document["chapters"] if c["id"] == target_chapter_id), None)
     if not target_chapter:
         raise HTTPException(404, "Target chapter not found")
 
-    # REMOVE from old chapter
-    source_chapter["scenes"] = [s for s in source_chapter["scenes"] if s["id"] != scene_id]
-
-    # INSERT into new chapter
-    target_chapter["scenes"].insert(target_index, scene)
-
-    # REORDER both chapters
-    for i, s in enumerate(source_chapter["scenes"]):
-        s["order"] = i
+    siblings = [s for s in ordered(target_chapter["scenes"]) if s["id"] != scene_id]
+    target_index = max(0, min(data.get("target_index", 0), len(siblings)))
+    rank = key_at(siblings, target_index)
 
-    for i, s in enumerate(target_chapter["scenes"]):
-        s["order"] = i
-
-
-    # Recalculate chapter wordcounts before update (mirror autosave_scene logic)
-    for chapter in document["chapters"]:
-        chapter["wordcount"] = sum_scene_wordcounts(chapter["scenes"])
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$set": {"chapters": document["chapters"], "updated_at": datetime.utcnow()}}
-    )
+    if target_chapter_id == chapter_id:
+        # only the moved scene's rank changes
+        update = {"$set": {"chapters.$[c].scenes.$[s].rank": rank, "updated_at": datetime.utcnow()}}
+        array_filters = [{"c.id": chapter_id}, {"s.id": scene_id}]
+    else:
+        source_chapter["scenes"].remove(scene)
+        target_chapter["scenes"].append({**scene, "rank": rank})
+        update = {
+            "$pull": {"chapters.$[src].scenes": {"id": scene_id}},
+            "$push": {"chapters.$[dst].scenes": {**scene, "rank": rank}},
+            "$inc": {
+                "chapters.$[src].wordcount": -scene.get("wordcount", 0),
+                "chapters.$[dst].wordcount": scene.get("wordcount", 0),
+            },
+            "$set": {"updated_at": datetime.utcnow(), **outline_stats_update(document["chapters"])},
+        }
+        array_filters = [{"src.id": chapter_id}, {"dst.id": target_chapter_id}]
+
+    updated = await skeleton_update(document_id, document, {}, update, array_filters=array_filters)
+    if not updated:
+        raise HTTPException(404, "Document not found")
+    if target_chapter_id != chapter_id:
+        await move_scene_content(document_id, scene_id, target_chapter_id)
+    check_rank(document_id, rank)
 
-    return {"message": "Scene moved"}
+    return {"message": "Scene moved", "version": updated["version"]}
 
 
 @router.put("/{document_id}/chapters/{chapter_id}/move")
+@read_modify_write
 async def move_chapter(
     project_id: str,
     document_id: str,
@@ -986,7 +1842,7 @@ async def move_chapter(
     data: dict = Body(...),  # { target_index }
     user_id=Depends(get_current_user)
 ):
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "skeleton")
     if not document:
         raise HTTPException(404, "Document not found")
     if document["type"] == "folder":
@@ -998,28 +1854,23 @@ async def move_chapter(
     if not chapter:
         raise HTTPException(404, "Chapter not found")
 
-    target_index = data.get("target_index", 0)
-
-    # REMOVE
-    chapters = [c for c in chapters if c["id"] != chapter_id]
-
-    # INSERT
-    chapters.insert(target_index, chapter)
-
-    # REORDER
-    for i, c in enumerate(chapters):
-        c["order"] = i
-
-
-    # Recalculate chapter wordcounts before update (mirror autosave_scene logic)
-    for chapter in chapters:
-        chapter["wordcount"] = sum_scene_wordcounts(chapter["scenes"])
-    await documents_collection.update_one(
-        {"_id": ObjectId(document_id)},
-        {"$set": {"chapters": chapters, "updated_at": datetime.utcnow()}}
+    read_version(document, data.get("version"))
+    await ensure_ranks(document_id, document)
+    siblings = [c for c in ordered(chapters) if c["id"] != chapter_id]
+    target_index = max(0, min(data.get("target_index", 0), len(siblings)))
+    rank = key_at(siblings, target_index)
+
+    updated = await skeleton_update(
+        document_id,
+        document,
+        {"chapters.id": chapter_id},
+        {"$set": {"chapters.$.rank": rank, "updated_at": datetime.utcnow()}}
     )
+    if not updated:
+        raise HTTPException(404, "Chapter not found")
+    check_rank(document_id, rank)
 
-    return {"message": "Chapter moved"}
+    return {"message": "Chapter moved", "version": updated["version"]}
 
 
 # ────────────────────────────────────────────────
@@ -1038,14 +1889,14 @@ async def export_document(
     if fmt not in ("pdf", "docx"):
         raise HTTPException(400, "Format must be 'pdf' or 'docx'")
 
-    document = await get_owned_document(user_id, project_id, document_id)
+    document = await get_owned_document(user_id, project_id, document_id, "full")
     if not document:
         raise HTTPException(404, "Document not found")
 
     settings = document.get("settings") or {}
-    chapters = sorted(document.get("chapters", []), key=lambda c: c.get("order", 0))
+    chapters = with_order(document.get("chapters", []))
     for ch in chapters:
-        ch["scenes"] = sorted(ch.get("scenes", []), key=lambda s: s.get("order", 0))
+        ch["scenes"] = with_order(ch.get("scenes", []))
 
     doc_title = document.get("title", "document")
 
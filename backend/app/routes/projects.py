@@ -1,12 +1,14 @@
 # app/routers/projects.py
-import re
 from fastapi import APIRouter, Depends, Form, HTTPException
 from app.database import projects_collection
 from app.utils.auth import get_current_user
 from datetime import datetime
 from app.utils.mongo import serialize_mongo
+from app.utils.validation import title_key
 from bson import ObjectId
 from bson import errors as bson_errors
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from pydantic import BaseModel
 from typing import Optional
 
@@ -43,24 +45,20 @@ async def create_project(
         raise HTTPException(status_code=422, detail="Project name is required")
 
     name = request.name.strip()
-    # ensure unique per user (case-insensitive)
-    escaped = re.escape(name)
-    existing = await projects_collection.find_one({
-        "user_id": ObjectId(user_id),
-        "name": {"$regex": f"^{escaped}$", "$options": "i"}
-    })
-    if existing:
-        raise HTTPException(status_code=409, detail="A project with that name already exists")
-
     project = {
         "user_id": ObjectId(user_id),
         "name": name,
+        "name_key": title_key(name),
         "cover_image_url": request.cover_image_url,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
     }
 
-    result = await projects_collection.insert_one(project)
+    # unique per user (case-insensitive) via the (user_id, name_key) index
+    try:
+        result = await projects_collection.insert_one(project)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A project with that name already exists")
     project["_id"] = result.inserted_id
     return serialize_mongo(project)
 
@@ -87,24 +85,21 @@ async def update_project(
         name_val = update_data["name"].strip()
         if not name_val:
             raise HTTPException(status_code=400, detail="Project name is required")
-        escaped = re.escape(name_val)
-        conflict = await projects_collection.find_one({
-            "user_id": ObjectId(user_id),
-            "name": {"$regex": f"^{escaped}$", "$options": "i"},
-            "_id": {"$ne": ObjectId(project_id)}
-        })
-        if conflict:
-            raise HTTPException(status_code=409, detail="A project with that name already exists")
         update_data["name"] = name_val
+        update_data["name_key"] = title_key(name_val)
+
+    if not update_data:
+        return serialize_mongo(project)
 
-    if update_data:
-        update_data["updated_at"] = datetime.utcnow()
-        await projects_collection.update_one(
+    update_data["updated_at"] = datetime.utcnow()
+    try:
+        updated = await projects_collection.find_one_and_update(
             {"_id": ObjectId(project_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-
-    updated = await projects_collection.find_one({"_id": ObjectId(project_id)})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A project with that name already exists")
     return serialize_mongo(updated)
 
 @router.delete("/{project_id}")
@@ -11,6 +11,8 @@ class SceneResponse(BaseModel):
     scene_wordcount: int
     chapter_wordcount: int
     document_wordcount: int
+    version: int = 0
+    content_hash: Optional[str] = None
 
 
 class ChapterResponse(BaseModel):
@@ -21,10 +23,20 @@ class ChapterResponse(BaseModel):
     scenes: List[dict]
 
 
+class ChapterContentResponse(BaseModel):
+    document_id: str
+    chapter_id: str
+    title: str
+    wordcount: int
+    version: int = 0
+    scenes: List[dict]
+
+
 class DocumentOutlineResponse(BaseModel):
     document_id: str
     title: str
     total_wordcount: int
+    version: int = 0
     chapters: List[ChapterResponse]
 
 
@@ -37,6 +49,7 @@ class DocumentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     total_wordcount: int
+    version: int = 0
     chapter_count: Optional[int] = None
     word_count: Optional[int] = None
 
@@ -68,6 +81,16 @@ class ItemListResponse(BaseModel):
     shortest_scene: Optional[SceneStat] = None
 
 
+class ItemPageResponse(BaseModel):
+    items: List[ItemListResponse]
+    next_cursor: Optional[str] = None
+
+
+class DocumentTreeResponse(BaseModel):
+    project_id: str
+    items: List[dict]
+
+
 class DocumentStatsResponse(BaseModel):
     document_id: str
     chapter_count: int
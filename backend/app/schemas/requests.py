@@ -6,17 +6,64 @@ class CreateDocumentRequest(BaseModel):
     type: Optional[str] = "document"  # "document" or "folder"
     parent_id: Optional[str] = None
 
+class CopyMoveRequest(BaseModel):
+    target_project_id: Optional[str] = None  # defaults to the current project
+    target_parent_id: Optional[str] = None  # None = project root
+    title: Optional[str] = None  # defaults to the current title
+
 class CreateChapterRequest(BaseModel):
     title: str
+    version: Optional[int] = None
 
 class CreateSceneRequest(BaseModel):
     title: str
+    version: Optional[int] = None
 
 class RenameRequest(BaseModel):
     title: str
 
 class ReorderRequest(BaseModel):
     ordered_ids: List[str]
+    version: Optional[int] = None
 
 class SceneAutosaveRequest(BaseModel):
-    content: str
\ No newline at end of file
+    content: str
+    version: Optional[int] = None  # last version the client saw; omitted = unconditional
+
+class SpliceOp(BaseModel):
+    start: int  # UTF-16 code units, like JavaScript string indices
+    delete: int = 0
+    insert: str = ""
+
+class SceneDeltaRequest(BaseModel):
+    base_hash: str  # content_hash of the content the ops apply to
+    ops: List[SpliceOp]
+    version: Optional[int] = None
+
+class SceneBatchEntry(BaseModel):
+    chapter_id: str
+    scene_id: str
+    content: str
+
+class SceneBatchRequest(BaseModel):
+    scenes: List[SceneBatchEntry]
+    version: Optional[int] = None
+
+class OutlineOp(BaseModel):
+    # one of insert_chapter, rename_chapter, move_chapter, reorder_chapters,
+    # delete_chapter, insert_scene, rename_scene, move_scene, reorder_scenes,
+    # delete_scene; other fields as in the matching single-operation route
+    op: str
+    id: Optional[str] = None  # for inserts, so later ops can refer to the new item
+    chapter_id: Optional[str] = None
+    scene_id: Optional[str] = None
+    target_chapter_id: Optional[str] = None
+    target_index: Optional[int] = None
+    index: Optional[int] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    ordered_ids: Optional[List[str]] = None
+
+class OutlineBatchRequest(BaseModel):
+    ops: List[OutlineOp]
+    version: Optional[int] = None
@@ -0,0 +1,209 @@
+"""
+Write-behind buffer for scene autosaves.
+
+When AUTOSAVE_WRITE_BEHIND is on, autosave_scene acknowledges as soon as
+the new content is journaled and kept in memory; only the latest content
+per scene is kept, so saves superseded before the next flush never reach
+Mongo. Pending scenes are flushed every AUTOSAVE_FLUSH_INTERVAL seconds,
+or early once AUTOSAVE_BATCH_SIZE scenes are waiting, with one bulk_write
+for the scene records and one for the document counters.
+
+Every acknowledged save is first appended (and fsynced) to an append-only
+journal. A flush rotates the journal to `<path>.flushing` and deletes it
+once the batch is written; startup replays both files, so a crash at any
+point loses nothing that was acknowledged. Assumes one worker process.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import documents_collection
+from app.services.scene_service import write_scene_batch
+from app.services.stats_service import (
+    STATS_COUNTERS_PROJECTION,
+    scene_counts_update,
+    moved_wordcounts,
+    refresh_outline_extremes,
+    repair_document_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _oid(val):
+    return val if isinstance(val, ObjectId) else ObjectId(val)
+
+
+class AutosaveBuffer:
+    def __init__(self, journal_path: str, flush_interval: float, batch_size: int, enabled: bool = True):
+        self.enabled = enabled
+        self.journal_path = Path(journal_path)
+        self.flushing_path = Path(f"{journal_path}.flushing")
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # (document_id, scene_id) -> content, oldest first
+        self._pending = {}
+        self._journal = None
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._early_flush = None
+
+    # ── journal ──────────────────────────────────────
+    def _append(self, document_id: str, scene_id: str, content: str):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        line = json.dumps({"document_id": document_id, "scene_id": scene_id, "content": content})
+        self._journal.write(line + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _replay(self):
+        # .flushing holds the older batch; later lines override earlier ones
+        for path in (self.flushing_path, self.journal_path):
+            if not path.exists():
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # torn last line from a crash mid-write; it was never acknowledged
+                        continue
+                    key = (entry["document_id"], entry["scene_id"])
+                    self._pending.pop(key, None)
+                    self._pending[key] = entry["content"]
+        if self._pending:
+            logger.info(f"Replayed {len(self._pending)} pending autosaves from {self.journal_path}")
+
+    # ── buffer ───────────────────────────────────────
+    def put(self, document_id: str, scene_id: str, content: str):
+        """Journal and buffer one autosave; it is durable once this returns."""
+        self._append(document_id, scene_id, content)
+        key = (document_id, scene_id)
+        self._pending.pop(key, None)
+        self._pending[key] = content
+        if len(self._pending) >= self.batch_size and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.create_task(self.flush())
+
+    def pending_content(self, document_id: str, scene_id: str) -> Optional[str]:
+        """Buffered content not yet flushed, so reads see the latest save."""
+        return self._pending.get((str(document_id), scene_id))
+
+    def overlay(self, document_id: str, chapters: list) -> list:
+        """Replace `content` in a chapter skeleton with any buffered content."""
+        if self._pending:
+            for chapter in chapters:
+                for scene in chapter.get("scenes", []):
+                    pending = self.pending_content(document_id, scene["id"])
+                    if pending is not None:
+                        scene["content"] = pending
+        return chapters
+
+    async def _write(self, entries: list):
+        written = await write_scene_batch(entries)
+
+        per_document = defaultdict(list)
+        for document_id, chapter_id, scene_id, previous, counts in written:
+            per_document[document_id].append((chapter_id, scene_id, previous, counts))
+        if not per_document:
+            return
+
+        ops = []
+        for document_id, scenes in per_document.items():
+            update, array_filters = scene_counts_update(scenes)
+            # each save claimed its version when it was acknowledged, so
+            # `version` stays put; counts_version tells read-modify-write
+            # routes the counters they loaded are stale
+            update["$inc"]["counts_version"] = 1
+            ops.append(UpdateOne({"_id": _oid(document_id)}, update, array_filters=array_filters))
+        try:
+            await documents_collection.bulk_write(ops, ordered=False)
+        except Exception as e:
+            # the scene records are written, so a retry would see no delta;
+            # recount these documents from their content instead
+            logger.error(f"Autosave counter update failed, recounting {len(per_document)} documents: {e}")
+            for document_id in per_document:
+                await repair_document_stats(document_id)
+            return
+
+        cursor = documents_collection.find(
+            {"_id": {"$in": [_oid(d) for d in per_document]}},
+            STATS_COUNTERS_PROJECTION
+        )
+        async for document in cursor:
+            await refresh_outline_extremes(document, *moved_wordcounts(per_document[str(document["_id"])]))
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._close_journal()
+            if self.journal_path.exists():
+                if self.flushing_path.exists():
+                    # left over from a crash and replayed at start-up: both belong to this batch
+                    with open(self.flushing_path, "a", encoding="utf-8") as dst, \
+                            open(self.journal_path, encoding="utf-8") as src:
+                        dst.write(src.read())
+                    self.journal_path.unlink()
+                else:
+                    self.journal_path.rename(self.flushing_path)
+
+            # no chapter: a scene deleted since it was buffered is skipped, not recreated
+            entries = [(d, None, s, content) for (d, s), content in batch.items()]
+            try:
+                for start in range(0, len(entries), self.batch_size):
+                    await self._write(entries[start:start + self.batch_size])
+            except Exception as e:
+                # rewriting is idempotent (deltas come from the stored counts),
+                # so re-queue everything not superseded meanwhile
+                logger.error(f"Autosave flush failed, {len(batch)} scenes re-queued: {e}")
+                for (document_id, scene_id), content in batch.items():
+                    if (document_id, scene_id) not in self._pending:
+                        self._append(document_id, scene_id, content)
+                        self._pending[(document_id, scene_id)] = content
+            self.flushing_path.unlink(missing_ok=True)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def start(self):
+        """Replay the journal, flush it and start the periodic flush."""
+        if not self.enabled:
+            return
+        self._replay()
+        await self.flush()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush whatever is pending on graceful shutdown."""
+        if not self.enabled:
+            return
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        self._close_journal()
+
+
+autosave_buffer = AutosaveBuffer(
+    settings.AUTOSAVE_JOURNAL_PATH,
+    settings.AUTOSAVE_FLUSH_INTERVAL,
+    settings.AUTOSAVE_BATCH_SIZE,
+    enabled=settings.AUTOSAVE_WRITE_BEHIND,
+)
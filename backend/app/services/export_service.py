@@ -17,7 +17,7 @@ def _to_pt(value: float, unit: str = "px") -> float:
     if unit == "em": return value * 12  # assume 12pt base
     return value
 
-def _parse_style(style_str: str) -> dict:
+def parse_style(style_str: str) -> dict:
     result = {}
     for part in (style_str or "").split(";"):
         part = part.strip()
@@ -26,7 +26,7 @@ def _parse_style(style_str: str) -> dict:
             result[k.strip().lower()] = v.strip()
     return result
 
-def _parse_pt(value_str: str) -> float:
+def parse_pt(value_str: str) -> float:
     """Parse a CSS size string and return pt value."""
     value_str = value_str.strip()
     try:
@@ -46,7 +46,7 @@ def _parse_pt(value_str: str) -> float:
     except (ValueError, AttributeError):
         return 12.0
 
-def _parse_cm(value_str: str) -> float:
+def parse_cm(value_str: str) -> float:
     """Parse a CSS size string and return cm value."""
     value_str = (value_str or "").strip()
     try:
@@ -62,8 +62,7 @@ def _parse_cm(value_str: str) -> float:
 
 # ── Chapter title helpers ──────────────────────────────────────────────────────
 
-def _format_chapter_title(order: int, title: str, settings: dict) -> str:
-    fmt = settings.get("chapterTitleFormat", "none")
+def format_chapter_title(fmt: str, title: str, order: int) -> str:
     if fmt == "none": return ""
     if fmt == "chapter-number": return f"Chapter {order}"
     if fmt == "chapter-number-title": return f"Chapter {order}: {title}"
@@ -119,7 +118,7 @@ def build_docx(document_title: str, chapters: list, settings: dict) -> bytes:
     default_font_name = settings.get("defaultFont", "Arial, sans-serif").split(",")[0].strip().strip("'\"")
     default_font_pt   = float(settings.get("defaultFontSize", 12))
     default_align     = ALIGN_MAP.get(settings.get("defaultAlignment", "left"), WD_ALIGN_PARAGRAPH.LEFT)
-    default_indent_cm = _parse_cm(
+    default_indent_cm = parse_cm(
         f"{settings.get('defaultFirstLineIndent', 0)}{settings.get('defaultFirstLineIndentUnit', 'cm')}"
     )
 
@@ -135,7 +134,7 @@ def build_docx(document_title: str, chapters: list, settings: dict) -> bytes:
         """Apply inline CSS styles to a docx Run."""
         fs_str = styles.get("font-size", "")
         if fs_str:
-            run.font.size = Pt(_parse_pt(fs_str))
+            run.font.size = Pt(parse_pt(fs_str))
         elif heading_pt:
             run.font.size = Pt(heading_pt)
         else:
@@ -167,7 +166,7 @@ def build_docx(document_title: str, chapters: list, settings: dict) -> bytes:
 
         tag = element.name or ""
         el_styles = dict(inherited_styles)
-        el_styles.update(_parse_style(element.get("style", "")))
+        el_styles.update(parse_style(element.get("style", "")))
 
         # Handle bold/italic tags
         if tag in ("strong", "b"): el_styles["font-weight"] = "bold"
@@ -186,7 +185,7 @@ def build_docx(document_title: str, chapters: list, settings: dict) -> bytes:
     def _add_block(soup_el, first_block: bool = False):
         """Convert a block-level BeautifulSoup element to a docx paragraph."""
         tag = soup_el.name or "p"
-        block_styles = _parse_style(soup_el.get("style", ""))
+        block_styles = parse_style(soup_el.get("style", ""))
 
         # Heading detection
         heading_pt_map = {"h1": 28.0, "h2": 22.0, "h3": 18.0, "h4": 16.0}
@@ -202,7 +201,7 @@ def build_docx(document_title: str, chapters: list, settings: dict) -> bytes:
         # First-line indent
         ti_str = block_styles.get("text-indent", "")
         if ti_str and "var(--default-first-line-indent" not in ti_str:
-            ti_cm = _parse_cm(ti_str)
+            ti_cm = parse_cm(ti_str)
             if ti_cm:
                 para.paragraph_format.first_line_indent = Cm(ti_cm)
         elif default_indent_cm and not first_block:
@@ -233,10 +232,10 @@ def build_docx(document_title: str, chapters: list, settings: dict) -> bytes:
 
     # ── Chapters ────────────────────────────────────────────────────
     for ch_idx, chapter in enumerate(chapters):
-        ch_title_text = _format_chapter_title(
-            chapter.get("order", ch_idx) + 1,
+        ch_title_text = format_chapter_title(
+            settings.get("chapterTitleFormat", "none"),
             chapter.get("title", ""),
-            settings
+            chapter.get("order", ch_idx) + 1,
         )
 
         if ch_title_text:
@@ -289,22 +288,14 @@ def build_docx(document_title: str, chapters: list, settings: dict) -> bytes:
 
 
 # ── PDF export ─────────────────────────────────────────────────────────────────
-def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
+PDF_HEADING_SIZES = {"h1": 28, "h2": 22, "h3": 18, "h4": 16}
+
+
+def pdf_page_geometry(settings: dict) -> tuple:
+    """(pagesize, (top, bottom, left, right) margins) in points, as the PDF export lays out pages."""
     from reportlab.lib.pagesizes import A4, LETTER, A5, LEGAL
     from reportlab.lib.units import cm, inch, mm
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, PageBreak
-    )
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from io import BytesIO
-    import html as html_lib
-
-    buf = BytesIO()
 
-    # ── Page size ──────────────────────────────────────────────────
     paper = settings.get("paperFormat", "A4")
     if paper == "Letter":
         pagesize = LETTER
@@ -319,17 +310,45 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
     else:
         pagesize = A4
 
-    # ── Margins ────────────────────────────────────────────────────
     unit_str = settings.get("marginUnit", "cm")
     def to_points(val: float) -> float:
         if unit_str == "mm": return val * mm
         if unit_str == "in": return val * inch
         return val * cm
 
-    margin_top    = to_points(settings.get("marginTop",    2.5))
-    margin_bottom = to_points(settings.get("marginBottom", 2.5))
-    margin_left   = to_points(settings.get("marginLeft",   2.5))
-    margin_right  = to_points(settings.get("marginRight",  2.5))
+    margins = tuple(
+        to_points(settings.get(key, 2.5))
+        for key in ("marginTop", "marginBottom", "marginLeft", "marginRight")
+    )
+    return pagesize, margins
+
+
+def pdf_fonts(settings: dict) -> tuple:
+    """(regular, bold, italic, bold italic) standard PDF fonts for the document font."""
+    raw_font = settings.get("defaultFont", "Arial, sans-serif").split(",")[0].strip().strip("'\"").lower()
+    if "times" in raw_font or "georgia" in raw_font or "serif" in raw_font:
+        return "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic"
+    if "courier" in raw_font or "mono" in raw_font:
+        return "Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique"
+    return "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique"
+
+
+def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
+    from reportlab.lib.units import cm
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+    from reportlab.platypus import (
+        SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    )
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from io import BytesIO
+    import html as html_lib
+
+    buf = BytesIO()
+
+    # ── Page size and margins ──────────────────────────────────────
+    pagesize, (margin_top, margin_bottom, margin_left, margin_right) = pdf_page_geometry(settings)
 
     doc = SimpleDocTemplate(
         buf,
@@ -350,28 +369,13 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
     default_align    = ALIGN_MAP.get(settings.get("defaultAlignment", "left"), TA_LEFT)
     default_font_pt  = float(settings.get("defaultFontSize", 12))
     default_lh       = float(settings.get("defaultLineHeight", 1.15))
-    default_indent   = _parse_cm(
+    default_indent   = parse_cm(
         f"{settings.get('defaultFirstLineIndent', 0)}"
         f"{settings.get('defaultFirstLineIndentUnit', 'cm')}"
     ) * cm
 
     # ── Font name (reportlab uses Helvetica/Times-Roman/Courier) ──
-    raw_font = settings.get("defaultFont", "Arial, sans-serif").split(",")[0].strip().strip("'\"").lower()
-    if "times" in raw_font or "georgia" in raw_font or "serif" in raw_font:
-        rl_font      = "Times-Roman"
-        rl_font_bold = "Times-Bold"
-        rl_font_it   = "Times-Italic"
-        rl_font_bi   = "Times-BoldItalic"
-    elif "courier" in raw_font or "mono" in raw_font:
-        rl_font      = "Courier"
-        rl_font_bold = "Courier-Bold"
-        rl_font_it   = "Courier-Oblique"
-        rl_font_bi   = "Courier-BoldOblique"
-    else:
-        rl_font      = "Helvetica"
-        rl_font_bold = "Helvetica-Bold"
-        rl_font_it   = "Helvetica-Oblique"
-        rl_font_bi   = "Helvetica-BoldOblique"
+    rl_font, rl_font_bold, rl_font_it, rl_font_bi = pdf_fonts(settings)
 
     # ── Base paragraph style ───────────────────────────────────────
     base_style = ParagraphStyle(
@@ -409,7 +413,7 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
         soup = BeautifulSoup(html_content, "html.parser")
         flowables = []
 
-        heading_sizes = {"h1": 28, "h2": 22, "h3": 18, "h4": 16}
+        heading_sizes = PDF_HEADING_SIZES
 
         def _node_to_rl_xml(node) -> str:
             """Convert a soup node to ReportLab-compatible XML string."""
@@ -430,7 +434,7 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
             if tag == "br":
                 return "<br/>"
             if tag == "span":
-                st = _parse_style(node.get("style", ""))
+                st = parse_style(node.get("style", ""))
                 parts = []
                 fs = st.get("font-size", "")
                 ff = st.get("font-family", "")
@@ -439,7 +443,7 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
 
                 if fs:
                     try:
-                        parts.append(f'size="{int(_parse_pt(fs))}"')
+                        parts.append(f'size="{int(parse_pt(fs))}"')
                     except Exception:
                         pass
                 if ff:
@@ -497,11 +501,11 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
 
             if tag in block_tags or tag == "div":
                 # Parse per-block styles
-                st = _parse_style(el.get("style", ""))
+                st = parse_style(el.get("style", ""))
                 bl_align = ALIGN_MAP.get(st.get("text-align", ""), default_align)
                 ti_str = st.get("text-indent", "")
                 if ti_str and "var(" not in ti_str:
-                    bl_indent = _parse_cm(ti_str) * cm
+                    bl_indent = parse_cm(ti_str) * cm
                 else:
                     bl_indent = default_indent
 
@@ -512,7 +516,7 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
                     bl_lh = default_lh
 
                 fs_str = st.get("font-size", "")
-                bl_pt = _parse_pt(fs_str) if fs_str else default_font_pt
+                bl_pt = parse_pt(fs_str) if fs_str else default_font_pt
 
                 p_style = _make_style(
                     f"p_{id(el)}",
@@ -566,10 +570,10 @@ def build_pdf(document_title: str, chapters: list, settings: dict) -> bytes:
     )
 
     for ch_idx, chapter in enumerate(chapters):
-        ch_title_text = _format_chapter_title(
-            chapter.get("order", ch_idx) + 1,
+        ch_title_text = format_chapter_title(
+            settings.get("chapterTitleFormat", "none"),
             chapter.get("title", ""),
-            settings
+            chapter.get("order", ch_idx) + 1,
         )
 
         if ch_title_text:
@@ -0,0 +1,360 @@
+"""
+Page count estimate from font metrics, laid out the way build_pdf() does.
+
+Every paragraph's plain text is wrapped greedily, word by word, with
+ReportLab's own glyph widths for the standard font the export would use,
+under the document's page size, margins, font size, line height and
+first-line indent. Lines are then stacked into page frames: paragraphs
+split between lines, spacers move whole to the next page, space before a
+paragraph is dropped at the top of a page, and chapters start on a new
+page when the export does that.
+
+A scene's layout (line heights and counts, not positions) only depends on
+its content and the text settings, so it is cached by content hash; the
+stats endpoint reads scene hashes and lays out only scenes it has not
+seen with these settings.
+"""
+import re
+from html import unescape
+from typing import NamedTuple, Optional
+
+from bson import ObjectId
+
+from app.config import settings as app_settings
+from app.database import scenes_collection
+from app.services.autosave_buffer import autosave_buffer
+from app.services.export_service import (
+    PDF_HEADING_SIZES,
+    parse_cm,
+    parse_pt,
+    parse_style,
+    format_chapter_title,
+    pdf_fonts,
+    pdf_page_geometry,
+)
+from app.services.scene_service import content_hash, stored_content_hash
+from app.services.wordcount_service import split_paragraphs
+from app.utils.content_codec import decode_content
+from app.utils.lru_cache import LRUCache
+from app.utils.ordering import ordered
+
+# SimpleDocTemplate's frame pads every side by 6 pt
+FRAME_PADDING = 6.0
+CM = 28.346456692913385  # reportlab.lib.units.cm
+
+# scene layouts by (content hash, text setup)
+scene_layout_cache = LRUCache(app_settings.SCENE_LAYOUT_CACHE_SIZE)
+
+
+class PageSetup(NamedTuple):
+    frame_width: float
+    frame_height: float
+    font: str
+    bold_font: str
+    font_size: float
+    line_height: float
+    indent: float
+    chapter_font: str
+    chapter_size: float
+    chapter_format: str
+    blank_lines: int
+    page_break: bool
+
+
+def page_setup(settings: dict) -> PageSetup:
+    """Everything from the document settings that the PDF layout depends on."""
+    (page_width, page_height), (top, bottom, left, right) = pdf_page_geometry(settings)
+    font, bold, italic, bold_italic = pdf_fonts(settings)
+
+    title_style = settings.get("chapterTitleStyle", "bold")
+    chapter_font = bold if "bold" in title_style else font
+    if "italic" in title_style:
+        chapter_font = bold_italic if "bold" in title_style else italic
+
+    return PageSetup(
+        frame_width=page_width - left - right - 2 * FRAME_PADDING,
+        frame_height=page_height - top - bottom - 2 * FRAME_PADDING,
+        font=font,
+        bold_font=bold,
+        font_size=float(settings.get("defaultFontSize", 12)),
+        line_height=float(settings.get("defaultLineHeight", 1.15)),
+        indent=parse_cm(
+            f"{settings.get('defaultFirstLineIndent', 0)}"
+            f"{settings.get('defaultFirstLineIndentUnit', 'cm')}"
+        ) * CM,
+        chapter_font=chapter_font,
+        chapter_size=float(settings.get("chapterTitleSize", 16)),
+        chapter_format=settings.get("chapterTitleFormat", "none"),
+        blank_lines=int(settings.get("blankLinesAfterChapter", 2)),
+        page_break=bool(settings.get("pageBreakAfterChapter", True)),
+    )
+
+
+# ────────────────────────────────────────────────
+# TEXT WIDTHS AND LINE WRAPPING
+# ────────────────────────────────────────────────
+# Glyph widths per font at 1 pt; standard PDF fonts are not kerned, so a
+# word's width is the sum of its glyphs and scales linearly with the size.
+_glyph_widths = {}
+_word_widths = {}
+WORD_CACHE_SIZE = 50_000  # words per font
+
+_BREAK = "\x00"  # stands for <br>; never part of stored text
+_SPACE_RE = re.compile(r"[^\S\xa0]+")  # ReportLab does not break at no-break spaces
+
+
+def _word_width(word: str, font: str) -> float:
+    words = _word_widths.setdefault(font, {})
+    width = words.get(word)
+    if width is None:
+        glyphs = _glyph_widths.setdefault(font, {})
+        width = 0.0
+        for char in word:
+            glyph = glyphs.get(char)
+            if glyph is None:
+                from reportlab.pdfbase.pdfmetrics import stringWidth
+                glyph = glyphs[char] = stringWidth(char, font, 1.0)
+            width += glyph
+        if len(words) >= WORD_CACHE_SIZE:
+            words.clear()
+        words[word] = width
+    return width
+
+
+def line_count(text: str, font: str, size: float, width: float, first_line_indent: float = 0.0) -> int:
+    """
+    Lines ReportLab's Paragraph breaks `text` into: words are added while
+    they fit, the first line is shortened by the indent, _BREAK forces a
+    new line and a word wider than a line is split across lines.
+    """
+    space = _word_width(" ", font) * size
+    available = width - first_line_indent
+    lines = 0
+    for segment in text.split(_BREAK):
+        lines += 1
+        used = None
+        for word in _SPACE_RE.split(segment):
+            if not word:
+                continue
+            word_width = _word_width(word, font) * size
+            if used is None:
+                used = word_width
+            elif used + space + word_width <= available + 1e-6:
+                used += space + word_width
+                continue
+            else:
+                lines += 1
+                available = width
+                used = word_width
+            if used > available > 0:
+                extra = int((used - available) // width) + 1
+                lines += extra
+                used -= available + (extra - 1) * width
+                available = width
+        available = width
+    return lines
+
+
+# ────────────────────────────────────────────────
+# SCENE LAYOUT
+# ────────────────────────────────────────────────
+# A layout is a list of (leading, line counts, space_before, space_after):
+# consecutive paragraphs with the same leading and no spacing share one
+# entry, one line count per paragraph. A spacer is a one-line paragraph.
+_OPEN_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)([^>]*)>")
+_STYLE_ATTR_RE = re.compile(r"""style\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_PAGE_BREAK_SPACER_RE = re.compile(r'<div[^>]*data-type="page-break-spacer"[^>]*>.*?</div>', re.DOTALL)
+_SKIPPED_CONTAINERS = ("ul", "ol", "table", "pre")
+_CONTAINER_OPEN_RE = re.compile(r"<(?:ul|ol|table|pre)(?=[\s/>])", re.IGNORECASE)
+_CONTAINER_CLOSE_RE = re.compile(r"</(?:ul|ol|table|pre)\s*>", re.IGNORECASE)
+_PARAGRAPH_TAGS = ("p", "h5", "h6", "blockquote", "div")
+
+
+def _append(layout: list, leading: float, lines: int, before: float = 0, after: float = 0):
+    if layout and before == 0 and layout[-1][3] == 0 and layout[-1][0] == leading:
+        layout[-1][1].append(lines)
+        layout[-1][3] = after
+    else:
+        layout.append([leading, [lines], before, after])
+
+
+def scene_layout(content: str, setup: PageSetup) -> list:
+    """Layout of one scene's HTML, block by block as build_pdf() renders it."""
+    layout = []
+    skipping = 0
+    for piece in split_paragraphs(_PAGE_BREAK_SPACER_RE.sub("", content or "")):
+        opening = _OPEN_TAG_RE.match(piece)
+        tag = opening.group(1).lower() if opening else ""
+
+        # lists, tables and preformatted blocks are not exported
+        if skipping or tag in _SKIPPED_CONTAINERS:
+            skipping += len(_CONTAINER_OPEN_RE.findall(piece)) - len(_CONTAINER_CLOSE_RE.findall(piece))
+            skipping = max(skipping, 0)
+            continue
+        if opening and tag not in PDF_HEADING_SIZES and tag not in _PARAGRAPH_TAGS:
+            continue
+
+        body = piece[opening.end():] if opening else piece
+        text = unescape(_TAG_RE.sub("", _BR_RE.sub(_BREAK, body)))
+
+        if tag in PDF_HEADING_SIZES:
+            size = PDF_HEADING_SIZES[tag]
+            lines = line_count(text, setup.bold_font, size, setup.frame_width)
+            _append(layout, size * 1.3, lines, size * 0.5, size * 0.3)
+            continue
+
+        if not text.replace(_BREAK, "").strip():
+            if not opening or f"</{tag}" not in piece.lower():
+                # a container whose paragraphs follow, or stray text between blocks
+                continue
+            if _BREAK not in text:
+                _append(layout, setup.font_size, 1)
+                continue
+
+        style = {}
+        if opening:
+            attr = _STYLE_ATTR_RE.search(opening.group(2))
+            style = parse_style((attr.group(1) or attr.group(2)) if attr else "")
+        indent_str = style.get("text-indent", "")
+        indent = parse_cm(indent_str) * CM if indent_str and "var(" not in indent_str else setup.indent
+        line_height_str = style.get("line-height", "")
+        try:
+            line_height = float(line_height_str) if line_height_str else setup.line_height
+        except ValueError:
+            line_height = setup.line_height
+        size_str = style.get("font-size", "")
+        size = parse_pt(size_str) if size_str else setup.font_size
+
+        lines = line_count(text.strip(), setup.font, size, setup.frame_width, indent)
+        _append(layout, size * line_height * 1.2, lines)
+    return [(leading, tuple(lines), before, after) for leading, lines, before, after in layout]
+
+
+def cached_scene_layout(digest: str, content: Optional[str], setup: PageSetup) -> Optional[list]:
+    """
+    Layout for the scene content with hash `digest`; laid out from
+    `content` and cached on a miss. None on a miss without content.
+    """
+    key = (digest, setup._replace(frame_height=0.0))
+    layout = scene_layout_cache.get(key)
+    if layout is None and content is not None:
+        layout = scene_layout(content, setup)
+        scene_layout_cache.put(key, layout)
+    return layout
+
+
+# ────────────────────────────────────────────────
+# PAGINATION
+# ────────────────────────────────────────────────
+PAGE_BREAK = None
+
+
+def paginate(items: list, frame_height: float) -> float:
+    """
+    Pages filled by layout items (PAGE_BREAK starts a new page unless the
+    current one is empty). Like ReportLab, a paragraph is split between
+    lines but never leaves just its first line at the bottom of a page.
+    The last page counts by the fraction used.
+    """
+    pages, used = 0, 0.0
+    for item in items:
+        if item is PAGE_BREAK:
+            if used > 0:
+                pages, used = pages + 1, 0.0
+            continue
+        leading, paragraphs, before, after = item
+        if used > 0:
+            used += before
+        for lines in paragraphs:
+            while lines:
+                fit = int((frame_height - used) / leading + 1e-9)
+                if fit >= lines:
+                    used += lines * leading
+                    break
+                if fit <= 1 and used > 0:
+                    pages, used = pages + 1, 0.0
+                    continue
+                # taller than a page: at least one line per page
+                lines -= max(fit, 1)
+                pages, used = pages + 1, 0.0
+        used += after
+    return round(pages + min(used / frame_height, 1.0), 1)
+
+
+def document_layout(title: str, chapters: list, setup: PageSetup) -> list:
+    """
+    Layout items for a whole document, in export order. `chapters` are
+    ordered, each scene carrying its `layout` (scenes without content have
+    none).
+    """
+    title_lines = line_count(title, setup.bold_font, 24, setup.frame_width)
+    items = [(30.0, (title_lines,), 0, 24.0), (12.0, (1,), 0, 0)]
+
+    chapter_leading = setup.chapter_size * 1.4
+    blank_line = setup.font_size * setup.line_height
+    for index, chapter in enumerate(chapters):
+        chapter_title = format_chapter_title(setup.chapter_format, chapter.get("title", ""), index + 1)
+        if chapter_title:
+            lines = line_count(chapter_title, setup.chapter_font, setup.chapter_size, setup.frame_width)
+            items.append((chapter_leading, (lines,), setup.chapter_size, setup.chapter_size * 0.5))
+            items.append((blank_line, (1,) * setup.blank_lines, 0, 0))
+        for scene in chapter.get("scenes", []):
+            items.extend(scene.get("layout") or ())
+        if setup.page_break and index < len(chapters) - 1:
+            items.append(PAGE_BREAK)
+    return items
+
+
+def _oid(val):
+    return val if isinstance(val, ObjectId) else ObjectId(val)
+
+
+async def document_page_estimate(document: dict, settings: dict) -> float:
+    """
+    Estimated PDF page count for a document skeleton (chapters without
+    content). Stored scenes are matched by content hash; only scenes not
+    laid out with these settings before have their content read.
+    """
+    setup = page_setup(settings)
+    document_id = str(document["_id"])
+
+    scene_ids = {scene["id"] for chapter in document.get("chapters") or [] for scene in chapter.get("scenes", [])}
+    layouts, missing = {}, []
+    cursor = scenes_collection.find(
+        {"document_id": _oid(document_id)},
+        {"_id": 0, "scene_id": 1, "content_hash": 1}
+    )
+    async for row in cursor:
+        scene_id = row["scene_id"]
+        if scene_id not in scene_ids or autosave_buffer.pending_content(document_id, scene_id) is not None:
+            continue
+        layout = cached_scene_layout(row["content_hash"], None, setup) if row.get("content_hash") else None
+        if layout is None:
+            missing.append(scene_id)
+        else:
+            layouts[scene_id] = layout
+
+    if missing:
+        cursor = scenes_collection.find(
+            {"document_id": _oid(document_id), "scene_id": {"$in": missing}},
+            {"_id": 0, "scene_id": 1, "content": 1, "content_hash": 1}
+        )
+        async for row in cursor:
+            row["content"] = decode_content(row.get("content"))
+            if row["content"]:
+                layouts[row["scene_id"]] = cached_scene_layout(stored_content_hash(row), row["content"], setup)
+
+    for scene_id in scene_ids:
+        pending = autosave_buffer.pending_content(document_id, scene_id)
+        if pending:
+            layouts[scene_id] = cached_scene_layout(content_hash(pending), pending, setup)
+
+    if not layouts:
+        return 0.0
+    chapters = [
+        {**chapter, "scenes": [{"layout": layouts.get(scene["id"])} for scene in ordered(chapter.get("scenes", []))]}
+        for chapter in ordered(document.get("chapters") or [])
+    ]
+    return paginate(document_layout(document.get("title", ""), chapters, setup), setup.frame_height)
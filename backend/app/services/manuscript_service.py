@@ -0,0 +1,109 @@
+"""
+Streams a whole manuscript as NDJSON, in reading order.
+
+One aggregation unwinds the chapter skeleton to one row per scene,
+sorts the rows by rank and looks up each scene's content from the
+scenes collection. Rows are turned into lines as the cursor yields them,
+so the client can render the first chapter while later ones are still
+being read, and server memory stays at one cursor batch.
+"""
+import json
+from typing import AsyncIterator
+
+from bson import ObjectId
+
+from app.database import documents_collection, scenes_collection
+from app.services.autosave_buffer import autosave_buffer
+from app.utils.content_codec import decode_content
+
+# scenes per cursor batch: large enough to keep round trips down, small
+# enough that a batch of long scenes stays a few MB
+STREAM_BATCH_SIZE = 16
+
+
+def _oid(val):
+    return val if isinstance(val, ObjectId) else ObjectId(val)
+
+
+def manuscript_pipeline(document_id) -> list:
+    document_oid = _oid(document_id)
+    return [
+        {"$match": {"_id": document_oid}},
+        {"$project": {"chapters": 1}},
+        {"$unwind": "$chapters"},
+        {"$unwind": {"path": "$chapters.scenes", "preserveNullAndEmptyArrays": True}},
+        # same order as app.utils.ordering.ordered(): rank, then legacy order
+        {"$sort": {
+            "chapters.rank": 1,
+            "chapters.order": 1,
+            "chapters.id": 1,
+            "chapters.scenes.rank": 1,
+            "chapters.scenes.order": 1,
+        }},
+        {"$lookup": {
+            "from": scenes_collection.name,
+            "let": {"chapter_id": "$chapters.id", "scene_id": "$chapters.scenes.id"},
+            "pipeline": [
+                {"$match": {
+                    "document_id": document_oid,
+                    "$expr": {"$and": [
+                        {"$eq": ["$chapter_id", "$$chapter_id"]},
+                        {"$eq": ["$scene_id", "$$scene_id"]},
+                    ]},
+                }},
+                {"$project": {"_id": 0, "content": 1}},
+            ],
+            "as": "stored",
+        }},
+    ]
+
+
+def _line(record: dict) -> str:
+    return json.dumps(record, default=str) + "\n"
+
+
+async def stream_manuscript(document: dict) -> AsyncIterator[str]:
+    """
+    NDJSON lines for `document` (already loaded and ownership-checked):
+    one "document" header, then per chapter a "chapter" line followed by
+    its "scene" lines with content.
+    """
+    document_id = str(document["_id"])
+    yield _line({
+        "type": "document",
+        "document_id": document_id,
+        "title": document.get("title", ""),
+        "total_wordcount": document.get("total_wordcount", 0),
+        "version": document.get("version", 0),
+    })
+
+    cursor = documents_collection.aggregate(manuscript_pipeline(document_id), batchSize=STREAM_BATCH_SIZE)
+    chapter_id, chapter_order, scene_order = None, -1, 0
+    async for row in cursor:
+        chapter = row["chapters"]
+        if chapter["id"] != chapter_id:
+            chapter_id, chapter_order, scene_order = chapter["id"], chapter_order + 1, 0
+            yield _line({
+                "type": "chapter",
+                "id": chapter_id,
+                "title": chapter.get("title", ""),
+                "order": chapter_order,
+                "wordcount": chapter.get("wordcount", 0),
+            })
+
+        scene = chapter.get("scenes")
+        if not scene:
+            continue
+        content = autosave_buffer.pending_content(document_id, scene["id"])
+        if content is None:
+            content = decode_content(row["stored"][0].get("content")) if row["stored"] else ""
+        yield _line({
+            "type": "scene",
+            "chapter_id": chapter_id,
+            "id": scene["id"],
+            "title": scene.get("title", ""),
+            "order": scene_order,
+            "wordcount": scene.get("wordcount", 0),
+            "content": content,
+        })
+        scene_order += 1
@@ -0,0 +1,95 @@
+"""
+Rank maintenance for chapter and scene order keys (see app.utils.ordering).
+
+Inserts and moves key only the moved item, so ranks can grow long after
+many inserts at the same spot. Those sibling lists, and lists saved before
+ranks existed, are re-keyed here with evenly spaced ranks. Only the rank
+fields are written, and only while the document is still at the version
+the skeleton was read at. The visible order does not change, but the
+version is still bumped: a concurrent insert keyed against the old ranks
+must not land between the new ones.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from bson import ObjectId
+
+from app.database import documents_collection
+from app.utils.mongo import version_filter
+from app.utils.ordering import needs_rebalance, ordered, spread_keys
+
+logger = logging.getLogger(__name__)
+
+RANK_SKELETON_PROJECTION = {
+    "version": 1,
+    "chapters.id": 1,
+    "chapters.rank": 1,
+    "chapters.order": 1,
+    "chapters.scenes.id": 1,
+    "chapters.scenes.rank": 1,
+    "chapters.scenes.order": 1,
+}
+
+_background = set()
+
+
+def _oid(val):
+    return val if isinstance(val, ObjectId) else ObjectId(val)
+
+
+def _rekey(items: list, path, updates: dict):
+    for item, key in zip(ordered(items), spread_keys(len(items))):
+        item["rank"] = key
+        updates[path(item)] = key
+
+
+async def rebalance_ranks(document_id, chapters: list, version: int) -> Optional[int]:
+    """
+    Re-key every sibling list of `chapters` that needs it, in place.
+    Returns the document version afterwards, or None when the document
+    changed since `version`, in which case nothing was written.
+    """
+    updates, array_filters = {}, []
+    if needs_rebalance(chapters):
+        for i, chapter in enumerate(chapters):
+            array_filters.append({f"c{i}.id": chapter["id"]})
+        index = {c["id"]: i for i, c in enumerate(chapters)}
+        _rekey(chapters, lambda c: f"chapters.$[c{index[c['id']]}].rank", updates)
+
+    for i, chapter in enumerate(chapters):
+        scenes = chapter.get("scenes") or []
+        if not needs_rebalance(scenes):
+            continue
+        if {f"c{i}.id": chapter["id"]} not in array_filters:
+            array_filters.append({f"c{i}.id": chapter["id"]})
+        offset = len(array_filters)
+        for j, scene in enumerate(scenes):
+            array_filters.append({f"s{offset + j}.id": scene["id"]})
+        scene_index = {s["id"]: offset + j for j, s in enumerate(scenes)}
+        _rekey(scenes, lambda s, i=i: f"chapters.$[c{i}].scenes.$[s{scene_index[s['id']]}].rank", updates)
+
+    if not updates:
+        return version
+    result = await documents_collection.update_one(
+        {"_id": _oid(document_id), **version_filter(version)},
+        {"$set": updates, "$inc": {"version": 1}},
+        array_filters=array_filters,
+    )
+    return version + 1 if result.matched_count == 1 else None
+
+
+async def _rebalance_document(document_id):
+    document = await documents_collection.find_one({"_id": _oid(document_id)}, RANK_SKELETON_PROJECTION)
+    if not document:
+        return
+    if await rebalance_ranks(document_id, document.get("chapters") or [], document.get("version", 0)) is None:
+        # changed meanwhile; the next long key schedules another try
+        logger.info(f"Rank rebalance of {document_id} skipped, document changed")
+
+
+def schedule_rebalance(document_id):
+    """Re-key long ranks of one document in the background."""
+    task = asyncio.create_task(_rebalance_document(document_id))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
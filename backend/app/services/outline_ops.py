@@ -0,0 +1,144 @@
+"""
+In-memory structural edits on a chapter skeleton, for the batch outline
+endpoint. Ops use the same fields as the single-operation routes and each
+one applies to the result of the previous one. An invalid op raises
+OutlineOpError naming its position, so the caller can reject the whole
+batch before writing anything.
+"""
+import uuid
+from typing import Callable, Optional
+
+from app.services.wordcount_service import count_words, sum_scene_wordcounts
+from app.utils.ordering import ordered, spread_keys
+
+
+class OutlineOpError(ValueError):
+    pass
+
+
+def _find(items: list, item_id: Optional[str], what: str, position: int) -> dict:
+    for item in items:
+        if item["id"] == item_id:
+            return item
+    raise OutlineOpError(f"op {position}: {what} {item_id} not found")
+
+
+def _title(op: dict, position: int, default: Optional[str] = None) -> str:
+    title = (op.get("title") or default or "").strip()
+    if not title:
+        raise OutlineOpError(f"op {position}: title cannot be empty")
+    return title
+
+
+def _new_id(op: dict, taken: set, position: int) -> str:
+    # clients may pick the id so later ops in the same batch can refer to it
+    new_id = op.get("id") or str(uuid.uuid4())
+    if new_id in taken:
+        raise OutlineOpError(f"op {position}: id {new_id} already exists")
+    taken.add(new_id)
+    return new_id
+
+
+def _index(op: dict, field: str, items: list, default: int) -> int:
+    # clamped like the single-operation routes do
+    index = op.get(field)
+    return default if index is None else max(0, min(index, len(items)))
+
+
+def _word_counts(contents: list) -> list:
+    return [{"wordcount": count_words(content)} for content in contents]
+
+
+def _reordered(items: list, ordered_ids: list, what: str, position: int) -> list:
+    by_id = {item["id"]: item for item in items}
+    if sorted(ordered_ids or []) != sorted(by_id):
+        raise OutlineOpError(f"op {position}: invalid {what} IDs")
+    return [by_id[i] for i in ordered_ids]
+
+
+def apply_outline_ops(chapters: list, ops: list, counts_many: Callable[[list], list] = _word_counts) -> tuple:
+    """
+    Apply `ops` to a chapter skeleton. Returns (chapters, inserted) where
+    `inserted` maps the id of every scene created by the batch to
+    (content, counts). Chapters and scenes are taken in rank order; ranks,
+    `order` and wordcounts are reassigned and recomputed at the end, once.
+    The scenes still inserted after the last op are counted there too, in
+    one `counts_many(contents)` call (scene_counts_many in the route).
+    """
+    chapters = ordered(chapters)
+    for chapter in chapters:
+        chapter["scenes"] = ordered(chapter.get("scenes", []))
+    taken = {c["id"] for c in chapters} | {s["id"] for c in chapters for s in c.get("scenes", [])}
+    inserted = {}
+
+    for position, op in enumerate(ops):
+        kind = op.get("op")
+
+        if kind == "insert_chapter":
+            chapter = {"id": _new_id(op, taken, position), "title": _title(op, position),
+                       "wordcount": 0, "scenes": []}
+            chapters.insert(_index(op, "index", chapters, len(chapters)), chapter)
+
+        elif kind == "rename_chapter":
+            _find(chapters, op.get("chapter_id"), "chapter", position)["title"] = _title(op, position)
+
+        elif kind == "move_chapter":
+            chapter = _find(chapters, op.get("chapter_id"), "chapter", position)
+            chapters.remove(chapter)
+            chapters.insert(_index(op, "target_index", chapters, 0), chapter)
+
+        elif kind == "reorder_chapters":
+            chapters = _reordered(chapters, op.get("ordered_ids"), "chapter", position)
+
+        elif kind == "delete_chapter":
+            chapter = _find(chapters, op.get("chapter_id"), "chapter", position)
+            chapters.remove(chapter)
+            for scene in chapter["scenes"]:
+                inserted.pop(scene["id"], None)
+
+        elif kind == "insert_scene":
+            chapter = _find(chapters, op.get("chapter_id"), "chapter", position)
+            content = op.get("content") or ""
+            scene = {"id": _new_id(op, taken, position), "title": _title(op, position, "New Scene"),
+                     "wordcount": 0}
+            chapter["scenes"].insert(_index(op, "index", chapter["scenes"], len(chapter["scenes"])), scene)
+            inserted[scene["id"]] = content
+
+        elif kind == "rename_scene":
+            chapter = _find(chapters, op.get("chapter_id"), "chapter", position)
+            _find(chapter["scenes"], op.get("scene_id"), "scene", position)["title"] = _title(op, position)
+
+        elif kind == "move_scene":
+            source = _find(chapters, op.get("chapter_id"), "chapter", position)
+            scene = _find(source["scenes"], op.get("scene_id"), "scene", position)
+            target = _find(chapters, op.get("target_chapter_id", source["id"]), "target chapter", position)
+            source["scenes"].remove(scene)
+            target["scenes"].insert(_index(op, "target_index", target["scenes"], 0), scene)
+
+        elif kind == "reorder_scenes":
+            chapter = _find(chapters, op.get("chapter_id"), "chapter", position)
+            chapter["scenes"] = _reordered(chapter["scenes"], op.get("ordered_ids"), "scene", position)
+
+        elif kind == "delete_scene":
+            chapter = _find(chapters, op.get("chapter_id"), "chapter", position)
+            chapter["scenes"].remove(_find(chapter["scenes"], op.get("scene_id"), "scene", position))
+            inserted.pop(op.get("scene_id"), None)
+
+        else:
+            raise OutlineOpError(f"op {position}: unknown op {kind}")
+
+    counted = dict(zip(inserted, counts_many(list(inserted.values()))))
+    for chapter in chapters:
+        for scene in chapter["scenes"]:
+            if scene["id"] in counted:
+                scene["wordcount"] = counted[scene["id"]]["wordcount"]
+    inserted = {scene_id: (content, counted[scene_id]) for scene_id, content in inserted.items()}
+
+    # the whole skeleton is rewritten anyway, so every list gets fresh ranks
+    for i, (chapter, rank) in enumerate(zip(chapters, spread_keys(len(chapters)))):
+        chapter["rank"], chapter["order"] = rank, i
+        for j, (scene, scene_rank) in enumerate(zip(chapter["scenes"], spread_keys(len(chapter["scenes"])))):
+            scene["rank"], scene["order"] = scene_rank, j
+        chapter["wordcount"] = sum_scene_wordcounts(chapter["scenes"])
+
+    return chapters, inserted
@@ -0,0 +1,371 @@
+import hashlib
+from datetime import datetime
+from typing import Optional, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteMany, ReturnDocument, UpdateOne
+
+from app.config import settings
+from app.database import scenes_collection
+from app.utils.content_codec import encode_content, decode_content
+from app.utils.lru_cache import LRUCache
+from app.services.wordcount_service import paragraph_table, table_counts, text_counts
+
+COUNT_FIELDS = {"wordcount": 1, "char_count_with_spaces": 1, "char_count_without_spaces": 1}
+
+# Counts by content hash. The write-behind flush recounts what the autosave
+# just counted, and undo, copies and re-pastes bring back text that was
+# counted before; a hit costs a hash instead of a tokenizer pass.
+scene_counts_cache = LRUCache(settings.SCENE_COUNT_CACHE_SIZE)
+
+
+def _oid(val):
+    return val if isinstance(val, ObjectId) else ObjectId(val)
+
+
+def _counts_dict(counts: tuple) -> dict:
+    words, chars_with, chars_without = counts
+    return {
+        "wordcount": words,
+        "char_count_with_spaces": chars_with,
+        "char_count_without_spaces": chars_without,
+    }
+
+
+def scene_counts(content: str, digest: Optional[str] = None) -> dict:
+    """
+    Word and character counts stored next to a scene's content. Pass
+    `digest` when content_hash(content) is already known.
+    """
+    digest = digest or content_hash(content)
+    counts = scene_counts_cache.get(digest)
+    if counts is None:
+        counts = _counts_dict(text_counts(content))
+        scene_counts_cache.put(digest, counts)
+    return dict(counts)
+
+
+def scene_counts_many(contents: list, digests: Optional[list] = None) -> list:
+    """scene_counts() for several scenes in one call; only cache misses are tokenized."""
+    if digests is None:
+        digests = [content_hash(content) for content in contents]
+    results = [scene_counts_cache.get(digest) for digest in digests]
+    missing = [i for i, counts in enumerate(results) if counts is None]
+    for i in missing:
+        results[i] = _counts_dict(text_counts(contents[i]))
+        scene_counts_cache.put(digests[i], results[i])
+    return [dict(counts) for counts in results]
+
+
+def saved_scene_counts(content: str, digest: str, paragraphs: Optional[list] = None) -> Tuple[dict, Optional[list]]:
+    """
+    scene_counts() for an autosave. On a cache miss only the paragraphs
+    not in `paragraphs` (the table stored with the scene) are tokenized,
+    and the new table is returned for storing. On a hit the table is None:
+    the stored one stays, its rows are keyed by paragraph hash and so never
+    go stale.
+    """
+    counts = scene_counts_cache.get(digest)
+    if counts is not None:
+        return dict(counts), None
+    table = paragraph_table(content, paragraphs)
+    counts = _counts_dict(table_counts(table))
+    scene_counts_cache.put(digest, counts)
+    return dict(counts), table
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of the scene HTML (UTF-8); browsers can compute it with SubtleCrypto."""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+def stored_content_hash(scene: dict) -> str:
+    """Hash of a stored scene record (decoded); rows saved before hashes existed are hashed on read."""
+    return scene.get("content_hash") or content_hash(scene.get("content", ""))
+
+
+def apply_splices(content: str, ops: list) -> str:
+    """
+    Apply (start, delete, insert) splices in order, each against the result
+    of the previous one. Offsets count UTF-16 code units, like JavaScript
+    string indices. Raises ValueError on an out-of-range op.
+    """
+    buf = content.encode("utf-16-le")
+    for start, delete, insert in ops:
+        begin, end = start * 2, (start + delete) * 2
+        if start < 0 or delete < 0 or end > len(buf):
+            raise ValueError(f"Splice out of range: start={start} delete={delete}")
+        buf = buf[:begin] + insert.encode("utf-16-le") + buf[end:]
+    try:
+        return buf.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise ValueError("Splice splits a surrogate pair")
+
+
+async def save_scene_content(document_id, chapter_id: str, scene_id: str, content: str) -> dict:
+    """Upsert the content of one scene and return its counts."""
+    digest = content_hash(content)
+    counts = scene_counts(content, digest)
+    await scenes_collection.update_one(
+        {"document_id": _oid(document_id), "chapter_id": chapter_id, "scene_id": scene_id},
+        {"$set": {
+            "content": encode_content(content),
+            "content_hash": digest,
+            **counts,
+            "updated_at": datetime.utcnow(),
+        }},
+        upsert=True
+    )
+    return counts
+
+
+async def overwrite_scene_content(document_id, chapter_id: str, scene_id: str, content: str,
+                                  base_hash: Optional[str] = None, paragraphs: Optional[list] = None):
+    """
+    Overwrite the content of one scene in a single round trip.
+    Returns (previous_counts, new_counts + content_hash); previous_counts is
+    None when the scene had no stored record yet. With `base_hash` the write
+    only applies while the stored content still has that hash (no upsert),
+    and previous_counts is None when it did not. `paragraphs` is the
+    paragraph table already read with the scene, if any.
+    """
+    new_hash = content_hash(content)
+    counts, table = saved_scene_counts(content, new_hash, paragraphs)
+    query = {"document_id": _oid(document_id), "chapter_id": chapter_id, "scene_id": scene_id}
+    if base_hash is not None:
+        # rows saved before hashes existed were verified by the caller
+        query["content_hash"] = {"$in": [base_hash, None]}
+    fields = {
+        "content": encode_content(content),
+        "content_hash": new_hash,
+        **counts,
+        "updated_at": datetime.utcnow(),
+    }
+    if table is not None:
+        fields["paragraphs"] = table
+    previous = await scenes_collection.find_one_and_update(
+        query,
+        {"$set": fields},
+        projection={"_id": 0, **COUNT_FIELDS},
+        return_document=ReturnDocument.BEFORE,
+        upsert=base_hash is None
+    )
+    return previous, {**counts, "content_hash": new_hash}
+
+
+async def get_scene_content(document_id, chapter_id: str, scene_id: str) -> Optional[dict]:
+    scene = await scenes_collection.find_one(
+        {"document_id": _oid(document_id), "chapter_id": chapter_id, "scene_id": scene_id},
+        {"_id": 0}
+    )
+    if scene is not None:
+        scene["content"] = decode_content(scene.get("content"))
+    return scene
+
+
+async def stored_scene_counts(document_id, chapter_id: str, scene_id: str) -> Optional[dict]:
+    """Counts, content_hash and paragraph table of a stored scene record, without its content."""
+    return await scenes_collection.find_one(
+        {"document_id": _oid(document_id), "chapter_id": chapter_id, "scene_id": scene_id},
+        {"_id": 0, "content_hash": 1, "paragraphs": 1, **COUNT_FIELDS}
+    )
+
+
+async def attach_scene_content(document_id, chapters: list, chapter_id: Optional[str] = None) -> list:
+    """
+    Fill `content` into every scene of a chapter skeleton (single query).
+    With `chapter_id`, only that chapter's scene records are read.
+    """
+    query = {"document_id": _oid(document_id)}
+    if chapter_id is not None:
+        query["chapter_id"] = chapter_id
+    cursor = scenes_collection.find(query, {"_id": 0, "scene_id": 1, "content": 1})
+    content_by_scene = {s["scene_id"]: decode_content(s.get("content")) async for s in cursor}
+
+    for chapter in chapters:
+        for scene in chapter.get("scenes", []):
+            scene["content"] = content_by_scene.get(scene["id"], "")
+    return chapters
+
+
+async def iter_scene_contents(document_id):
+    """Async iterator over the stored scene documents of one document, content decoded."""
+    async for scene in scenes_collection.find({"document_id": _oid(document_id)}):
+        scene["content"] = decode_content(scene.get("content"))
+        yield scene
+
+
+async def replace_scene_contents(document_id, contents: dict):
+    """Bulk-write new content for several scenes; `contents` maps scene_id -> html."""
+    if not contents:
+        return
+    now = datetime.utcnow()
+    await scenes_collection.bulk_write([
+        UpdateOne(
+            {"document_id": _oid(document_id), "scene_id": scene_id},
+            {"$set": {"content": encode_content(content), "content_hash": content_hash(content), "updated_at": now}}
+        )
+        for scene_id, content in contents.items()
+    ], ordered=False)
+
+
+async def write_scene_batch(entries: list) -> list:
+    """
+    Write the content of many scenes, across documents, with one read of
+    the previous counts and one bulk_write. `entries` are (document_id,
+    chapter_id, scene_id, content). A scene without a stored record is
+    created in `chapter_id`, as overwrite_scene_content does; with
+    chapter_id None (the caller does not know the scene still exists) it
+    is skipped. Returns (document_id, chapter_id, scene_id,
+    previous_counts, counts + content_hash) for every scene written, with
+    the chapter the scene is in now and {} as the previous counts of a new
+    record. Scenes whose stored hash already matches are neither rewritten
+    nor recounted; the others only recount paragraphs not in their stored
+    paragraph table.
+    """
+    if not entries:
+        return []
+    cursor = scenes_collection.find(
+        {"$or": [{"document_id": _oid(d), "scene_id": s} for d, _, s, _ in entries]},
+        {"_id": 0, "document_id": 1, "chapter_id": 1, "scene_id": 1, "content_hash": 1, "paragraphs": 1,
+         **COUNT_FIELDS}
+    )
+    stored = {(row["document_id"], row["scene_id"]): row async for row in cursor}
+
+    now = datetime.utcnow()
+    ops, written = [], []
+    for document_id, chapter_id, scene_id, content in entries:
+        previous = stored.get((_oid(document_id), scene_id))
+        if previous is None and chapter_id is None:
+            continue
+        new_hash = content_hash(content)
+        if previous is not None and previous.get("content_hash") == new_hash:
+            counts = {field: previous.get(field, 0) for field in COUNT_FIELDS}
+        else:
+            counts, table = saved_scene_counts(content, new_hash, (previous or {}).get("paragraphs"))
+            fields = {"content": encode_content(content), "content_hash": new_hash, **counts, "updated_at": now}
+            if table is not None:
+                fields["paragraphs"] = table
+            if previous is None:
+                ops.append(UpdateOne(
+                    {"document_id": _oid(document_id), "chapter_id": chapter_id, "scene_id": scene_id},
+                    {"$set": fields},
+                    upsert=True
+                ))
+            else:
+                ops.append(UpdateOne({"document_id": _oid(document_id), "scene_id": scene_id}, {"$set": fields}))
+        if previous is not None:
+            chapter_id = previous["chapter_id"]
+        written.append((document_id, chapter_id, scene_id, previous or {}, {**counts, "content_hash": new_hash}))
+
+    if ops:
+        await scenes_collection.bulk_write(ops, ordered=False)
+    return written
+
+
+async def move_scene_content(document_id, scene_id: str, target_chapter_id: str):
+    await scenes_collection.update_one(
+        {"document_id": _oid(document_id), "scene_id": scene_id},
+        {"$set": {"chapter_id": target_chapter_id}}
+    )
+
+
+def _chapter_query(document_id, chapter_id: str, scene_id: Optional[str]) -> dict:
+    query = {"document_id": _oid(document_id), "chapter_id": chapter_id}
+    if scene_id is not None:
+        query["scene_id"] = scene_id
+    return query
+
+
+async def sum_scene_counts(document_id, chapter_id: str, scene_id: Optional[str] = None) -> dict:
+    """
+    Summed counts of the stored scenes of one chapter, or a single scene,
+    so callers can $inc totals down before deleting them.
+    """
+    totals = {"wordcount": 0, "char_count_with_spaces": 0, "char_count_without_spaces": 0}
+    query = _chapter_query(document_id, chapter_id, scene_id)
+    async for counts in scenes_collection.find(query, {"_id": 0, **{k: 1 for k in totals}}):
+        for k in totals:
+            totals[k] += counts.get(k, 0)
+    return totals
+
+
+async def delete_scene_content(document_id, chapter_id: str, scene_id: Optional[str] = None):
+    """Delete the stored scenes of one chapter, or a single scene."""
+    await scenes_collection.delete_many(_chapter_query(document_id, chapter_id, scene_id))
+
+
+async def sum_counts_of_scenes(document_id, scene_ids: list) -> dict:
+    """Summed counts of the given stored scenes of one document."""
+    totals = {"wordcount": 0, "char_count_with_spaces": 0, "char_count_without_spaces": 0}
+    if scene_ids:
+        cursor = scenes_collection.find(
+            {"document_id": _oid(document_id), "scene_id": {"$in": scene_ids}},
+            {"_id": 0, **{k: 1 for k in totals}}
+        )
+        async for counts in cursor:
+            for k in totals:
+                totals[k] += counts.get(k, 0)
+    return totals
+
+
+async def apply_outline_changes(document_id, inserted: dict, moved: dict, removed: list):
+    """
+    Bring the scene records in line with a restructured outline in one
+    bulk_write: `inserted` maps new scene_id -> (chapter_id, content,
+    counts), `moved` maps scene_id -> new chapter_id, `removed` lists
+    scene ids. Every op is idempotent, so a partly applied call can be
+    undone by the inverse call.
+    """
+    document_oid = _oid(document_id)
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"document_id": document_oid, "chapter_id": chapter_id, "scene_id": scene_id},
+            {"$set": {
+                "content": encode_content(content),
+                "content_hash": content_hash(content),
+                **counts,
+                "updated_at": now,
+            }},
+            upsert=True
+        )
+        for scene_id, (chapter_id, content, counts) in inserted.items()
+    ]
+    ops += [
+        UpdateOne({"document_id": document_oid, "scene_id": scene_id}, {"$set": {"chapter_id": chapter_id}})
+        for scene_id, chapter_id in moved.items()
+    ]
+    if removed:
+        ops.append(DeleteMany({"document_id": document_oid, "scene_id": {"$in": removed}}))
+    if ops:
+        await scenes_collection.bulk_write(ops, ordered=False)
+
+
+async def delete_documents_content(document_ids: list):
+    if document_ids:
+        await scenes_collection.delete_many({"document_id": {"$in": [_oid(d) for d in document_ids]}})
+
+
+async def copy_documents_content(id_map: dict):
+    """
+    Copy the scene records of each document in `id_map` (old id -> new id)
+    to the new id, inside Mongo: one aggregation per call, $merge-d back
+    into the scenes collection, so no content leaves the server.
+    """
+    if not id_map:
+        return
+    old_ids = [_oid(d) for d in id_map]
+    new_ids = [_oid(d) for d in id_map.values()]
+    cursor = scenes_collection.aggregate([
+        {"$match": {"document_id": {"$in": old_ids}}},
+        {"$unset": "_id"},
+        {"$set": {"document_id": {"$arrayElemAt": [new_ids, {"$indexOfArray": [old_ids, "$document_id"]}]}}},
+        {"$merge": {
+            "into": scenes_collection.name,
+            "on": ["document_id", "chapter_id", "scene_id"],
+            "whenMatched": "fail",
+            "whenNotMatched": "insert",
+        }},
+    ])
+    await cursor.to_list(None)
@@ -0,0 +1,361 @@
+import logging
+from collections import defaultdict
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.database import documents_collection, scenes_collection
+from app.services.scene_service import COUNT_FIELDS, scene_counts
+from app.services.wordcount_service import sum_scene_wordcounts
+from app.utils.content_codec import decode_content
+from app.utils.mongo import skeleton_filter
+
+logger = logging.getLogger(__name__)
+
+# What a counter write reads back: the totals, the stats to check the
+# extremes against and the chapter wordcounts, but no scenes.
+STATS_COUNTERS_PROJECTION = {
+    "version": 1,
+    "stats": 1,
+    "total_wordcount": 1,
+    "chapters.id": 1,
+    "chapters.wordcount": 1,
+}
+
+EXTREME_KEYS = ("longest_chapter", "shortest_chapter", "longest_scene", "shortest_scene")
+
+
+# skeleton rewrites tried by repair_document_stats before giving up
+REPAIR_ATTEMPTS = 5
+
+# stats field -> per-scene count field in the scenes collection
+CHARACTER_FIELDS = {
+    "character_count_with_spaces": "char_count_with_spaces",
+    "character_count_without_spaces": "char_count_without_spaces",
+}
+
+
+def _oid(val):
+    return val if isinstance(val, ObjectId) else ObjectId(val)
+
+
+def empty_stats() -> dict:
+    return {
+        "chapter_count": 0,
+        "scene_count": 0,
+        "character_count_with_spaces": 0,
+        "character_count_without_spaces": 0,
+        "longest_chapter": None,
+        "shortest_chapter": None,
+        "longest_scene": None,
+        "shortest_scene": None,
+    }
+
+
+def _shortest(items: list, key):
+    # first of the smallest, matching sorted(...)[0]
+    return min(items, key=key)
+
+
+def _longest(items: list, key):
+    # last of the largest, matching sorted(...)[-1]
+    return max(reversed(items), key=key)
+
+
+def outline_stats(chapters: list) -> dict:
+    """
+    Counts and longest/shortest chapter and scene for a chapter skeleton.
+    Only titles and wordcounts are read, so this is cheap on any outline.
+    Extremes keep the chapter/scene id so renames can update them in place.
+    """
+    chapters = chapters or []
+    all_scenes = [(sc, ch) for ch in chapters for sc in ch.get("scenes", [])]
+
+    stats = {
+        "chapter_count": len(chapters),
+        "scene_count": len(all_scenes),
+        "longest_chapter": None,
+        "shortest_chapter": None,
+        "longest_scene": None,
+        "shortest_scene": None,
+    }
+
+    def chapter_stat(ch):
+        return {"id": ch["id"], "title": ch.get("title", ""), "word_count": ch.get("wordcount", 0)}
+
+    def scene_stat(pair):
+        sc, ch = pair
+        return {
+            "id": sc["id"],
+            "chapter_id": ch["id"],
+            "title": sc.get("title", ""),
+            "word_count": sc.get("wordcount", 0),
+            "chapter_title": ch.get("title", ""),
+        }
+
+    if chapters:
+        wc = lambda c: c.get("wordcount", 0)
+        stats["shortest_chapter"] = chapter_stat(_shortest(chapters, wc))
+        stats["longest_chapter"] = chapter_stat(_longest(chapters, wc))
+
+    if all_scenes:
+        wc = lambda p: p[0].get("wordcount", 0)
+        stats["shortest_scene"] = scene_stat(_shortest(all_scenes, wc))
+        stats["longest_scene"] = scene_stat(_longest(all_scenes, wc))
+
+    return stats
+
+
+def _extreme_expression(rows: str, replace_when: str) -> dict:
+    # one $reduce pass; the running pick is replaced when `replace_when`
+    # holds, so "$lt" keeps the first of the smallest and "$gte" the last
+    # of the largest, like _shortest/_longest
+    return {"$reduce": {
+        "input": rows,
+        "initialValue": None,
+        "in": {"$cond": [
+            {"$or": [
+                {"$eq": ["$$value", None]},
+                {replace_when: ["$$this.word_count", "$$value.word_count"]},
+            ]},
+            "$$this",
+            "$$value",
+        ]},
+    }}
+
+
+def outline_stats_expression(chapters_field: str = "$chapters") -> dict:
+    """
+    Aggregation expression computing the same fields as outline_stats()
+    server-side from the skeleton, so only the small result crosses the
+    network. Only $reduce/$map are used (MongoDB 4.2+, also inside update
+    pipelines), and ties resolve exactly as in outline_stats().
+    """
+    return {"$let": {
+        "vars": {"chapters": {"$ifNull": [chapters_field, []]}},
+        "in": {"$let": {
+            "vars": {
+                "chapter_rows": {"$map": {
+                    "input": "$$chapters",
+                    "as": "c",
+                    "in": {
+                        "id": "$$c.id",
+                        "title": {"$ifNull": ["$$c.title", ""]},
+                        "word_count": {"$ifNull": ["$$c.wordcount", 0]},
+                    },
+                }},
+                "scene_rows": {"$reduce": {
+                    "input": "$$chapters",
+                    "initialValue": [],
+                    "in": {"$concatArrays": ["$$value", {"$map": {
+                        "input": {"$ifNull": ["$$this.scenes", []]},
+                        "as": "s",
+                        "in": {
+                            "id": "$$s.id",
+                            "chapter_id": "$$this.id",
+                            "title": {"$ifNull": ["$$s.title", ""]},
+                            "word_count": {"$ifNull": ["$$s.wordcount", 0]},
+                            "chapter_title": {"$ifNull": ["$$this.title", ""]},
+                        },
+                    }}]},
+                }},
+            },
+            "in": {
+                "chapter_count": {"$size": "$$chapters"},
+                "scene_count": {"$size": "$$scene_rows"},
+                "shortest_chapter": _extreme_expression("$$chapter_rows", "$lt"),
+                "longest_chapter": _extreme_expression("$$chapter_rows", "$gte"),
+                "shortest_scene": _extreme_expression("$$scene_rows", "$lt"),
+                "longest_scene": _extreme_expression("$$scene_rows", "$gte"),
+            },
+        }},
+    }}
+
+
+def outline_stats_update(chapters: list) -> dict:
+    """`$set` fields for the outline part of `stats`; character counts are left to `$inc`."""
+    return {f"stats.{k}": v for k, v in outline_stats(chapters).items()}
+
+
+def character_delta_update(previous: Optional[dict], current: Optional[dict]) -> dict:
+    """`$inc` fields moving the document character totals from `previous` to `current` scene counts."""
+    previous = previous or {}
+    current = current or {}
+    return {
+        f"stats.{stat_field}": current.get(scene_field, 0) - previous.get(scene_field, 0)
+        for stat_field, scene_field in CHARACTER_FIELDS.items()
+    }
+
+
+def scene_counts_update(scenes: list) -> tuple:
+    """
+    (update, array_filters) moving one document's counters for several
+    rewritten scenes, given (chapter_id, scene_id, previous_counts, counts):
+    $set each scene's wordcount and $inc its chapter and the document by
+    the deltas. Each chapter gets a single array filter, since two filters
+    resolving to the same element would conflict. Which version field the
+    write bumps is left to the caller.
+    """
+    chapter_filters = {}
+    updates = {"$set": {}, "$inc": defaultdict(int)}
+    array_filters = []
+    for i, (chapter_id, scene_id, previous, counts) in enumerate(scenes):
+        if chapter_id not in chapter_filters:
+            chapter_filters[chapter_id] = f"c{len(chapter_filters)}"
+            array_filters.append({f"{chapter_filters[chapter_id]}.id": chapter_id})
+        c = chapter_filters[chapter_id]
+        array_filters.append({f"s{i}.id": scene_id})
+
+        delta = counts["wordcount"] - previous.get("wordcount", 0)
+        updates["$set"][f"chapters.$[{c}].scenes.$[s{i}].wordcount"] = counts["wordcount"]
+        updates["$inc"][f"chapters.$[{c}].wordcount"] += delta
+        updates["$inc"]["total_wordcount"] += delta
+        for field, value in character_delta_update(previous, counts).items():
+            updates["$inc"][field] += value
+
+    updates["$inc"] = dict(updates["$inc"])
+    return updates, array_filters
+
+
+def extremes_affected(stats: Optional[dict], chapters: list = (), scenes: list = (), removed: list = ()) -> bool:
+    """
+    Whether a write can have moved the longest/shortest chapter or scene
+    in `stats`. `chapters` and `scenes` are (id, word_count) pairs the
+    write changed, `removed` the ids of chapters and scenes it deleted.
+    A count that reaches an extreme counts, ties included: which of equal
+    entries is kept depends on outline order.
+    """
+    stats = stats or {}
+    if any(key not in stats for key in EXTREME_KEYS):
+        # not backfilled yet (m004_repair_document_stats)
+        return True
+    for kind, changed in (("chapter", chapters), ("scene", scenes)):
+        longest, shortest = stats.get(f"longest_{kind}"), stats.get(f"shortest_{kind}")
+        for item_id, word_count in changed:
+            if longest is None or shortest is None or item_id in (longest["id"], shortest["id"]):
+                return True
+            if word_count >= longest["word_count"] or word_count <= shortest["word_count"]:
+                return True
+    removed = set(removed)
+    return any(
+        entry["id"] in removed or entry.get("chapter_id") in removed
+        for entry in (stats.get(key) for key in EXTREME_KEYS)
+        if entry
+    )
+
+
+async def recompute_outline_stats(document_id):
+    """Recompute the outline part of `stats` inside Mongo from the stored skeleton (one pipeline update)."""
+    await documents_collection.update_one(
+        {"_id": _oid(document_id)},
+        [{"$set": {"stats": {"$mergeObjects": [{"$ifNull": ["$stats", {}]}, outline_stats_expression()]}}}]
+    )
+
+
+def moved_wordcounts(scenes: list) -> tuple:
+    """
+    (chapter_ids, [(scene_id, word_count)]) for the scene_counts_update
+    entries whose wordcount actually changed, for refresh_outline_extremes.
+    """
+    moved = [
+        (chapter_id, scene_id, counts["wordcount"])
+        for chapter_id, scene_id, previous, counts in scenes
+        if counts["wordcount"] != previous.get("wordcount", 0)
+    ]
+    return {chapter_id for chapter_id, _, _ in moved}, [(scene_id, wc) for _, scene_id, wc in moved]
+
+
+async def refresh_outline_extremes(document: dict, chapter_ids: list = (), scenes: list = (),
+                                   removed: list = ()):
+    """
+    Follow-up to a counter write whose AFTER image (STATS_COUNTERS_PROJECTION)
+    is `document`: `chapter_ids` are the chapters whose wordcount it moved,
+    `scenes` the (id, word_count) it set, `removed` the ids it deleted. The
+    outline stats are only recomputed when an extreme may have moved.
+    """
+    chapter_ids = set(chapter_ids)
+    chapters = [
+        (c["id"], c.get("wordcount", 0)) for c in document.get("chapters") or [] if c["id"] in chapter_ids
+    ]
+    if extremes_affected(document.get("stats"), chapters, scenes, removed):
+        await recompute_outline_stats(document["_id"])
+
+
+async def rename_in_stats(document_id, stats: Optional[dict], chapter_id: str, scene_id: Optional[str] = None,
+                          new_title: str = ""):
+    """Keep titles cached in the stats extremes in sync after a rename."""
+    updates = {}
+    for key in EXTREME_KEYS:
+        entry = (stats or {}).get(key) or {}
+        if scene_id is None:
+            if key.endswith("_chapter") and entry.get("id") == chapter_id:
+                updates[f"stats.{key}.title"] = new_title
+            if key.endswith("_scene") and entry.get("chapter_id") == chapter_id:
+                updates[f"stats.{key}.chapter_title"] = new_title
+        elif key.endswith("_scene") and entry.get("id") == scene_id:
+            updates[f"stats.{key}.title"] = new_title
+    if updates:
+        await documents_collection.update_one({"_id": _oid(document_id)}, {"$set": updates})
+
+
+async def repair_document_stats(document_id) -> dict:
+    """
+    Recompute every count of one document from its stored scene content:
+    per-scene counts, chapter and document wordcounts, and `stats`. Safe
+    while the document is edited: a scene record is only recounted if its
+    content is still the one that was counted, and the skeleton is only
+    rewritten while it is as read (bumping `version`), else re-read.
+    """
+    document_oid = _oid(document_id)
+    recounts = []
+    async for scene in scenes_collection.find({"document_id": document_oid}, {"content": 1, "content_hash": 1}):
+        recounts.append(UpdateOne(
+            {"_id": scene["_id"], "content_hash": scene.get("content_hash")},
+            {"$set": scene_counts(decode_content(scene.get("content")))}
+        ))
+    if recounts:
+        await scenes_collection.bulk_write(recounts, ordered=False)
+
+    for _ in range(REPAIR_ATTEMPTS):
+        document = await documents_collection.find_one(
+            {"_id": document_oid}, {"chapters": 1, "type": 1, "version": 1, "counts_version": 1}
+        )
+        if not document or document.get("type") == "folder":
+            return {}
+
+        counts_by_scene = {
+            scene["scene_id"]: scene
+            async for scene in scenes_collection.find({"document_id": document_oid}, {"scene_id": 1, **COUNT_FIELDS})
+        }
+        chapters = document.get("chapters") or []
+        chars_with = chars_without = 0
+        for chapter in chapters:
+            for scene in chapter.get("scenes", []):
+                counts = counts_by_scene.get(scene["id"], {})
+                scene["wordcount"] = counts.get("wordcount", 0)
+                chars_with += counts.get("char_count_with_spaces", 0)
+                chars_without += counts.get("char_count_without_spaces", 0)
+            chapter["wordcount"] = sum_scene_wordcounts(chapter.get("scenes", []))
+
+        stats = {
+            **outline_stats(chapters),
+            "character_count_with_spaces": chars_with,
+            "character_count_without_spaces": chars_without,
+        }
+        result = await documents_collection.update_one(
+            {"_id": document_oid, **skeleton_filter(document)},
+            {
+                "$set": {
+                    "chapters": chapters,
+                    "total_wordcount": sum(c["wordcount"] for c in chapters),
+                    "stats": stats,
+                },
+                "$inc": {"version": 1},
+            }
+        )
+        if result.matched_count:
+            return stats
+
+    logger.warning(f"Stats repair of {document_id} gave up after {REPAIR_ATTEMPTS} concurrent changes")
+    return {}
@@ -0,0 +1,207 @@
+"""
+Materialized ancestor paths for the document/folder tree.
+
+Every item stores `path`: the ids of its ancestor folders, root first, as
+",<id>,<id>," (just "," at the project root). Everything below a folder is
+then the set of items whose path starts with the folder's child path, an
+anchored prefix the (project_id, path) index serves as a range scan, so a
+subtree is read, deleted or moved with one query.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+
+from app.database import documents_collection
+from app.services.scene_service import copy_documents_content
+from app.services.stats_service import outline_stats_expression
+
+ROOT_PATH = ","
+
+# items inserted (and documents whose content is copied) per round trip
+COPY_BATCH_SIZE = 500
+
+TREE_PROJECTION = {
+    "title": 1,
+    "type": 1,
+    "parent_id": 1,
+    "path": 1,
+    "updated_at": 1,
+    "total_wordcount": 1,
+    "version": 1,
+    "chapters.id": 1,
+    "chapters.title": 1,
+    "chapters.rank": 1,
+    "chapters.order": 1,
+    "chapters.wordcount": 1,
+    "chapters.scenes.id": 1,
+    "chapters.scenes.title": 1,
+    "chapters.scenes.rank": 1,
+    "chapters.scenes.order": 1,
+    "chapters.scenes.wordcount": 1,
+}
+
+
+def _oid(val):
+    return val if isinstance(val, ObjectId) else ObjectId(val)
+
+
+def child_path(folder: dict) -> str:
+    """Path of the items directly inside `folder`."""
+    return f"{folder.get('path') or ROOT_PATH}{folder['_id']},"
+
+
+def subtree_filter(folder: dict) -> dict:
+    """Everything below `folder`, at any depth (not the folder itself)."""
+    return {
+        "project_id": _oid(folder["project_id"]),
+        "path": {"$regex": f"^{re.escape(child_path(folder))}"},
+    }
+
+
+def listing_pipeline(query: dict, limit: int) -> list:
+    """
+    One page of the items matching `query` (a folder's children, plus the
+    keyset condition after the first page), sorted by (title, _id) as the
+    listing index serves them; one extra row tells whether a next page
+    exists. Items without a maintained `stats` (not yet backfilled by
+    m004_repair_document_stats) get it computed from the skeleton inside
+    the pipeline; either way only the small listing rows are returned.
+    """
+    return [
+        {"$match": query},
+        {"$sort": {"title": 1, "_id": 1}},
+        {"$limit": limit + 1},
+        {"$project": {
+            "title": 1,
+            "type": 1,
+            "parent_id": 1,
+            "created_at": 1,
+            "updated_at": 1,
+            "total_wordcount": 1,
+            "stats": {"$cond": [
+                {"$eq": [{"$type": "$stats"}, "object"]},
+                "$stats",
+                outline_stats_expression(),
+            ]},
+        }},
+    ]
+
+
+async def path_for_parent(project_id, parent_id) -> Optional[str]:
+    """
+    Path for a new child of `parent_id` (None for the project root), or
+    None when that is not a folder of the project. Parents saved before
+    paths existed are resolved by walking up their parent_id links.
+    """
+    if not parent_id:
+        return ROOT_PATH
+    parent = await documents_collection.find_one(
+        {"_id": _oid(parent_id), "project_id": _oid(project_id), "type": "folder"},
+        {"path": 1, "parent_id": 1},
+    )
+    if not parent:
+        return None
+    if not parent.get("path"):
+        parent["path"] = await path_for_parent(project_id, parent.get("parent_id"))
+        if parent["path"] is None:
+            return None
+    return child_path(parent)
+
+
+async def resolve_path(item: dict) -> Optional[str]:
+    """Stored path of a loaded item, resolved from its parents if it predates paths."""
+    if not item.get("path"):
+        item["path"] = await path_for_parent(item["project_id"], item.get("parent_id"))
+    return item["path"]
+
+
+async def move_subtree(folder: dict, new_child_path: str, fields: Optional[dict] = None):
+    """
+    Re-root everything below `folder` (as loaded before the move) under
+    `new_child_path`, and `$set` `fields` on it too, in one update_many.
+    """
+    old_child_path = child_path(folder)
+    rest = {"$substrCP": [
+        "$path",
+        len(old_child_path),
+        {"$subtract": [{"$strLenCP": "$path"}, len(old_child_path)]},
+    ]}
+    await documents_collection.update_many(
+        subtree_filter(folder),
+        [{"$set": {"path": {"$concat": [new_child_path, rest]}, **(fields or {})}}],
+    )
+
+
+async def copy_subtree(root: dict, new_root: dict) -> int:
+    """
+    Copy everything below `root` under `new_root`, which the caller has
+    already inserted as the copy of `root`, plus the scene content of every
+    copied document, `root` included. The subtree is streamed from a server
+    cursor and inserted in batches; copies get fresh ids, parent links and
+    paths, and the new root's project and owner. Returns the number of
+    items copied below the root.
+    """
+    new_ids = defaultdict(ObjectId)
+    new_ids[str(root["_id"])] = new_root["_id"]
+    old_prefix, new_prefix = child_path(root), child_path(new_root)
+    now = datetime.utcnow()
+
+    content_ids = {str(root["_id"]): new_root["_id"]} if root.get("type") != "folder" else {}
+    batch, copied = [], 0
+    async for item in documents_collection.find(subtree_filter(root)):
+        rest = item["path"][len(old_prefix):].split(",")[:-1]
+        old_id = str(item["_id"])
+        batch.append({
+            **item,
+            "_id": new_ids[old_id],
+            "project_id": new_root["project_id"],
+            "user_id": new_root["user_id"],
+            "parent_id": new_ids[str(item["parent_id"])],
+            "path": new_prefix + "".join(f"{new_ids[a]}," for a in rest),
+            "created_at": now,
+            "updated_at": now,
+            "version": 0,
+        })
+        if item.get("type") != "folder":
+            content_ids[old_id] = new_ids[old_id]
+        if len(batch) >= COPY_BATCH_SIZE:
+            await documents_collection.insert_many(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+        if len(content_ids) >= COPY_BATCH_SIZE:
+            await copy_documents_content(content_ids)
+            content_ids = {}
+
+    if batch:
+        await documents_collection.insert_many(batch, ordered=False)
+        copied += len(batch)
+    await copy_documents_content(content_ids)
+    return copied
+
+
+def build_tree(items: list) -> list:
+    """
+    Nest serialized items under their parent folders, each level sorted
+    like the folder listing. Items whose parent is missing end up at the
+    root rather than being dropped.
+    """
+    nodes = {item["_id"]: {**item, "children": [] if item.get("type") == "folder" else None} for item in items}
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node.get("parent_id"))
+        if parent is not None and parent["children"] is not None:
+            parent["children"].append(node)
+        else:
+            roots.append(node)
+
+    def sort(level):
+        level.sort(key=lambda n: (n.get("title", ""), n["_id"]))
+        for node in level:
+            if node["children"]:
+                sort(node["children"])
+
+    sort(roots)
+    return roots
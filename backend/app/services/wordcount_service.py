@@ -1,6 +1,7 @@
+import hashlib
 import re
 from html import unescape
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 PAPER_SIZES_MM = {
     "A4":     (210.0, 297.0),
@@ -22,6 +23,93 @@ def count_words(html: str) -> int:
     return len(words)
 
 
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\b\w+\b")
+
+
+def text_counts(html: str) -> Tuple[int, int, int]:
+    """
+    (words, chars_with_spaces, chars_without_spaces) for HTML content.
+    Tags are stripped and entities unescaped once for all three counts;
+    results match count_words() and count_characters().
+    """
+    if not html:
+        return 0, 0, 0
+    text = unescape(_TAG_RE.sub(" ", html))
+    words = len(_WORD_RE.findall(text))
+    # str.split() breaks on the same whitespace as \s; the runs joined by
+    # single spaces are the collapsed, stripped text count_characters measures
+    runs = text.split()
+    without_spaces = sum(map(len, runs))
+    with_spaces = without_spaces + len(runs) - 1 if runs else 0
+    return words, with_spaces, without_spaces
+
+
+# ────────────────────────────────────────────────
+# PER-PARAGRAPH COUNTS
+# ────────────────────────────────────────────────
+# A scene is split before every block-level opening tag, and each piece's
+# counts are kept with its hash. A save only tokenizes the pieces whose
+# hash is new; the rest reuse the counts stored with the previous version.
+_BLOCK_START_RE = re.compile(
+    r"<(?:p|h[1-6]|li|ul|ol|blockquote|pre|div|hr|table|tr)(?=[\s/>])", re.IGNORECASE
+)
+
+
+def split_paragraphs(html: str) -> List[str]:
+    """
+    Split HTML before each block-level opening tag. A cut is only made
+    where _TAG_RE itself would match a tag, and a tag strips to a space,
+    so no word, entity or whitespace run spans two pieces and their counts
+    add up to text_counts() of the whole.
+    """
+    html = html or ""
+    pieces, start = [], 0
+    for block in _BLOCK_START_RE.finditer(html):
+        at = block.start()
+        # an earlier "<" with no ">" since would swallow this one into its
+        # own _TAG_RE match; so would a missing ">" after it
+        if at > start and html.rfind("<", 0, at) <= html.rfind(">", 0, at) and html.find(">", at) != -1:
+            pieces.append(html[start:at])
+            start = at
+    pieces.append(html[start:])
+    return pieces
+
+
+def _paragraph_counts(piece: str) -> Tuple[int, int, int]:
+    # (words, chars_without_spaces, whitespace-separated runs)
+    text = unescape(_TAG_RE.sub(" ", piece))
+    runs = text.split()
+    return len(_WORD_RE.findall(text)), sum(map(len, runs)), len(runs)
+
+
+def paragraph_table(html: str, previous: Optional[list] = None) -> List[list]:
+    """
+    [hash, words, chars_without_spaces, runs] for every paragraph of
+    `html`. Rows of `previous` (the table stored with an earlier version)
+    are reused by hash; only paragraphs not in it are tokenized.
+    """
+    known = {row[0]: row for row in previous or ()}
+    table = []
+    for piece in split_paragraphs(html):
+        digest = hashlib.blake2b(piece.encode("utf-8"), digest_size=8).hexdigest()
+        row = known.get(digest)
+        if row is None:
+            row = known[digest] = [digest, *_paragraph_counts(piece)]
+        table.append(row)
+    return table
+
+
+def table_counts(table: list) -> Tuple[int, int, int]:
+    """text_counts() totals from a paragraph_table()."""
+    words = sum(row[1] for row in table)
+    without_spaces = sum(row[2] for row in table)
+    runs = sum(row[3] for row in table)
+    # runs are joined by single spaces, as in text_counts()
+    with_spaces = without_spaces + runs - 1 if runs else 0
+    return words, with_spaces, without_spaces
+
+
 def sum_scene_wordcounts(scenes: list) -> int:
     return sum(scene.get("wordcount", 0) for scene in scenes)
 
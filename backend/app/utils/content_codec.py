@@ -0,0 +1,47 @@
+"""
+Storage codec for scene HTML in the scenes collection.
+
+`content` is either a plain string (short scenes, and everything written
+before compression existed) or BSON binary whose first byte is a format
+marker followed by the compressed UTF-8 HTML. Every read goes through
+decode_content, so both shapes can live side by side; a scene is
+re-encoded the next time it is saved.
+"""
+import zlib
+
+from bson.binary import Binary
+
+FORMAT_ZLIB = 1
+
+# Below this many bytes the zlib header and a BSON binary cost more than
+# they save.
+MIN_COMPRESS_BYTES = 512
+ZLIB_LEVEL = 6
+
+
+def encode_content(html: str):
+    """Value to store in scenes.content for `html`."""
+    html = html or ""
+    raw = html.encode("utf-8")
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return html
+    packed = zlib.compress(raw, ZLIB_LEVEL)
+    if len(packed) + 1 >= len(raw):
+        return html
+    return Binary(bytes([FORMAT_ZLIB]) + packed)
+
+
+def decode_content(value) -> str:
+    """HTML for a stored scenes.content value (string or encoded binary)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+
+    data = bytes(value)
+    if not data:
+        return ""
+    marker, payload = data[0], data[1:]
+    if marker == FORMAT_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    raise ValueError(f"Unknown scene content format: {marker}")
@@ -1,3 +1,7 @@
+import base64
+import json
+from typing import Optional
+
 from bson import ObjectId
 
 def serialize_mongo(data):
@@ -14,3 +18,38 @@ def serialize_mongo(data):
         return serialized
 
     return data
+
+
+def encode_cursor(title: str, item_id) -> str:
+    """Opaque keyset cursor for listings sorted by (title, _id)."""
+    raw = json.dumps({"t": title, "id": str(item_id)}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return data["t"], ObjectId(data["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def version_filter(expected: Optional[int]) -> dict:
+    """Filter clause matching documents at `expected` version; none when no version was sent."""
+    if expected is None:
+        return {}
+    if expected == 0:
+        # documents created before versioning have no field yet
+        return {"version": {"$in": [0, None]}}
+    return {"version": expected}
+
+
+def skeleton_filter(document: dict) -> dict:
+    """
+    Filter clause matching a document only while it is as it was read: same
+    `version`, and same `counts_version`, which write-behind flushes bump
+    instead of `version` (missing until the first flush).
+    """
+    return {**version_filter(document.get("version", 0)), "counts_version": document.get("counts_version")}
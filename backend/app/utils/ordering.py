@@ -0,0 +1,90 @@
+"""
+Fractional order keys ("rank") for chapters and scenes.
+
+A rank is a base-62 string read as a fraction 0.d1d2d3... and compared
+as a plain string; it never ends in "0", so there is always room below
+it. Inserting or moving an item only gives that item a key between its
+new neighbours; siblings keep theirs. The numeric `order` in API
+responses is the position after sorting by rank.
+"""
+from typing import Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# keys grow by about one digit per six inserts at the same spot; past this
+# the document is queued for rebalancing
+MAX_RANK_LENGTH = 10
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    # a < b as fractions; "" is 0 and None is 1
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b) // 2]
+    if b is not None and len(b) > 1:
+        # b[0] alone sorts below b, which has more non-zero digits after it
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """A rank strictly between two neighbours; None means no neighbour on that side."""
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Ranks out of order: {before!r} >= {after!r}")
+    return _midpoint(before or "", after)
+
+
+def spread_keys(count: int) -> list:
+    """`count` increasing ranks of equal length, evenly spaced."""
+    width = 1
+    while BASE ** width < 2 * (count + 1):
+        width += 1
+    step = BASE ** width // (count + 1)
+    keys = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, d = divmod(value, BASE)
+            digits.append(DIGITS[d])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def rank_of(item: dict) -> str:
+    return item.get("rank") or ""
+
+
+def ordered(items: list) -> list:
+    """Siblings in display order (items saved before ranks existed fall back to `order`)."""
+    return sorted(items, key=lambda item: (rank_of(item), item.get("order", 0)))
+
+
+def key_at(siblings: list, index: int) -> str:
+    """Rank for an item inserted at `index` among `siblings` (ordered, without the item)."""
+    index = max(0, min(index, len(siblings)))
+    before = rank_of(siblings[index - 1]) if index > 0 else None
+    after = rank_of(siblings[index]) if index < len(siblings) else None
+    return key_between(before, after)
+
+
+def needs_rebalance(items: list) -> bool:
+    """True when any sibling has no rank yet or its rank got too long."""
+    return any(not item.get("rank") or len(item["rank"]) > MAX_RANK_LENGTH for item in items)
+
+
+def with_order(items: list) -> list:
+    """Ordered copy of siblings with `order` set to their position, for responses."""
+    result = []
+    for index, item in enumerate(ordered(items)):
+        result.append({**item, "order": index})
+    return result
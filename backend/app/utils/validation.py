@@ -9,4 +9,11 @@ def is_valid_email(email: str) -> bool:
         return False
     
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email.strip()))
\ No newline at end of file
+    return bool(re.match(pattern, email.strip()))
+
+def title_key(title: str) -> str:
+    """
+    Normalized form of a document/project title used for uniqueness checks.
+    Stored next to the title and backed by a unique index.
+    """
+    return (title or "").strip().casefold()
@@ -0,0 +1,132 @@
+"""
+Folder listing statistics: Python path vs aggregation pipeline.
+
+Seeds a scratch database with one folder of 100 documents x 50 chapters
+(6 scenes each, skeleton only) and times two ways of producing the
+per-item listing stats:
+
+  python    find() the documents with their chapters and run
+            stats_service.outline_stats() on each one in the app process
+  pipeline  one aggregate() running stats_service.outline_stats_expression()
+            so only the result rows leave mongod
+
+Needs a local mongod (LYRA_TEST_MONGO_URL, default mongodb://localhost:27017).
+
+Usage: python -m benchmarks.bench_folder_listing [--runs N]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+
+import bson
+from bson import ObjectId
+from pymongo import MongoClient
+
+from app.services.stats_service import outline_stats, outline_stats_expression
+
+MONGO_URL = os.getenv("LYRA_TEST_MONGO_URL", "mongodb://localhost:27017")
+
+DOCUMENTS = 100
+CHAPTERS = 50
+SCENES = 6
+
+
+def _seed(collection, project_id):
+    rng = random.Random(42)
+    docs = []
+    for d in range(DOCUMENTS):
+        chapters = []
+        for c in range(CHAPTERS):
+            scenes = [
+                {"id": str(uuid.uuid4()), "title": f"Scene {s + 1}", "order": s, "wordcount": rng.randint(200, 4000)}
+                for s in range(SCENES)
+            ]
+            chapters.append({
+                "id": str(uuid.uuid4()),
+                "title": f"Chapter {c + 1}",
+                "order": c,
+                "wordcount": sum(s["wordcount"] for s in scenes),
+                "scenes": scenes,
+            })
+        docs.append({
+            "project_id": project_id,
+            "parent_id": None,
+            "title": f"Draft {d:03d}",
+            "type": "document",
+            "total_wordcount": sum(c["wordcount"] for c in chapters),
+            "chapters": chapters,
+        })
+    collection.insert_many(docs)
+
+
+def _python_path(collection, query):
+    rows = []
+    for doc in collection.find(query).sort([("title", 1), ("_id", 1)]):
+        stats = outline_stats(doc.get("chapters") or [])
+        rows.append({"_id": doc["_id"], "title": doc["title"], "stats": stats, "_bytes": len(bson.encode(doc))})
+    return rows
+
+
+def _pipeline_path(collection, query):
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"title": 1, "_id": 1}},
+        {"$project": {"title": 1, "stats": outline_stats_expression()}},
+    ]
+    rows = []
+    for row in collection.aggregate(pipeline):
+        row["_bytes"] = len(bson.encode(row))
+        rows.append(row)
+    return rows
+
+
+def _time(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=2000)
+    name = f"lyra_bench_{uuid.uuid4().hex[:8]}"
+    collection = client[name]["documents"]
+    project_id = ObjectId()
+    try:
+        collection.create_index([("project_id", 1), ("parent_id", 1), ("title", 1), ("_id", 1)])
+        _seed(collection, project_id)
+        query = {"project_id": project_id, "parent_id": None}
+
+        py_ms, py_rows = _time(lambda: _python_path(collection, query), args.runs)
+        pl_ms, pl_rows = _time(lambda: _pipeline_path(collection, query), args.runs)
+
+        # same counts, same extreme wordcounts (titles may differ on ties)
+        for a, b in zip(py_rows, pl_rows):
+            for key in ("chapter_count", "scene_count"):
+                assert a["stats"][key] == b["stats"][key], key
+            for key in ("longest_chapter", "shortest_chapter", "longest_scene", "shortest_scene"):
+                assert a["stats"][key]["word_count"] == b["stats"][key]["word_count"], key
+
+        py_kb = sum(r["_bytes"] for r in py_rows) / 1024
+        pl_kb = sum(r["_bytes"] for r in pl_rows) / 1024
+        print(f"{DOCUMENTS} documents x {CHAPTERS} chapters x {SCENES} scenes, median of {args.runs} runs")
+        print(f"  python   {py_ms:8.1f} ms  {py_kb:9.1f} KiB transferred")
+        print(f"  pipeline {pl_ms:8.1f} ms  {pl_kb:9.1f} KiB transferred")
+        print(f"  speedup  {py_ms / pl_ms:8.2f}x")
+    finally:
+        client.drop_database(name)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Scene content codec: stored size and encode/decode latency.
+
+Generates manuscript-like scenes the way the editor saves them (TipTap
+paragraphs with the inline font-family/font-size/text-align styles that
+apply-settings writes) and reports, per scene size:
+
+  ratio    stored BSON size of the scene record, raw string vs encoded
+  encode   content_codec.encode_content per scene
+  decode   content_codec.decode_content per scene
+
+No database needed.
+
+Usage: python -m benchmarks.bench_scene_codec [--runs N]
+"""
+import argparse
+import random
+import statistics
+import time
+
+import bson
+
+from app.utils.content_codec import encode_content, decode_content
+
+WORDS = (
+    "the a of and to in was he she it that his her with had for on as at by "
+    "morning letter window silence harbour lantern whispered remembered "
+    "carriage shadow river promise stranger winter garden corridor quietly"
+).split()
+
+STYLE = 'style="font-family:Georgia, serif;font-size:12pt;text-align:justify;"'
+
+SCENE_WORDS = (250, 1500, 5000)
+
+
+def _paragraph(rng) -> str:
+    sentences = []
+    for _ in range(rng.randint(2, 6)):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 22))]
+        sentence = " ".join(words).capitalize() + rng.choice([".", ".", ".", "?", "!"])
+        if rng.random() < 0.15:
+            sentence = f"<em>{sentence}</em>"
+        sentences.append(sentence)
+    return f"<p {STYLE}>{' '.join(sentences)}</p>"
+
+
+def _scene(rng, target_words: int) -> str:
+    parts = []
+    words = 0
+    while words < target_words:
+        paragraph = _paragraph(rng)
+        parts.append(paragraph)
+        words += paragraph.count(" ")
+    return "".join(parts)
+
+
+def _time(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'words':>6} {'raw KiB':>9} {'stored KiB':>11} {'ratio':>6} {'encode us':>10} {'decode us':>10}")
+    for target in SCENE_WORDS:
+        html = _scene(rng, target)
+        stored = encode_content(html)
+        assert decode_content(stored) == html
+
+        raw_bytes = len(bson.encode({"content": html}))
+        stored_bytes = len(bson.encode({"content": stored}))
+        encode_us = _time(lambda: encode_content(html), args.runs)
+        decode_us = _time(lambda: decode_content(stored), args.runs)
+        print(
+            f"{target:>6} {raw_bytes / 1024:>9.1f} {stored_bytes / 1024:>11.1f} "
+            f"{raw_bytes / stored_bytes:>5.1f}x {encode_us:>10.0f} {decode_us:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Scene word/character counting: per-count functions vs one tokenizer.
+
+Generates scenes the way the editor saves them (styled TipTap paragraphs
+with some inline emphasis and entities) and reports, per scene size:
+
+  separate  count_words() + count_characters(), as scene counts were
+            computed before; each strips tags and unescapes on its own
+  single    text_counts(), one tag strip and unescape for all three counts
+  edit      paragraph_table() after a one-word edit, given the table of
+            the previous version (what an autosave does), plus totals
+
+No database needed.
+
+Usage: python -m benchmarks.bench_wordcount [--runs N]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.wordcount_service import (
+    count_characters,
+    count_words,
+    paragraph_table,
+    table_counts,
+    text_counts,
+)
+
+WORDS = (
+    "the a of and to in was he she it that his her with had for on as at by "
+    "morning letter window silence harbour lantern whispered remembered "
+    "carriage shadow river promise stranger winter garden corridor quietly"
+).split()
+
+STYLE = 'style="font-family:Georgia, serif;font-size:12pt;text-align:justify;"'
+
+SCENE_WORDS = (1_000, 10_000, 100_000)
+
+
+def _paragraph(rng) -> str:
+    sentences = []
+    for _ in range(rng.randint(2, 6)):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 22))]
+        sentence = " ".join(words).capitalize() + rng.choice([".", ".", "&hellip;", "?", "&nbsp;&mdash;"])
+        if rng.random() < 0.15:
+            sentence = f"<em>{sentence}</em>"
+        sentences.append(sentence)
+    return f"<p {STYLE}>{' '.join(sentences)}</p>"
+
+
+def _scene(rng, target_words: int) -> str:
+    parts = []
+    words = 0
+    while words < target_words:
+        paragraph = _paragraph(rng)
+        parts.append(paragraph)
+        words += paragraph.count(" ")
+    return "".join(parts)
+
+
+def _time(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'words':>7} {'separate us':>12} {'single us':>10} {'speedup':>8} {'edit us':>8}")
+    for target in SCENE_WORDS:
+        html = _scene(rng, target)
+        assert text_counts(html) == (count_words(html), *count_characters(html))
+
+        separate_us = _time(lambda: (count_words(html), count_characters(html)), args.runs)
+        single_us = _time(lambda: text_counts(html), args.runs)
+
+        table = paragraph_table(html)
+        middle = html.index(" ", len(html) // 2)
+        edited = html[:middle] + " quietly" + html[middle:]
+        assert table_counts(paragraph_table(edited, table)) == text_counts(edited)
+        edit_us = _time(lambda: table_counts(paragraph_table(edited, table)), args.runs)
+        print(
+            f"{target:>7} {separate_us:>12.0f} {single_us:>10.0f} "
+            f"{separate_us / single_us:>7.1f}x {edit_us:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Tests for utils/content_codec.py
+
+Stored scene content must round-trip exactly, whatever shape it was
+written in.
+"""
+
+import zlib
+
+import pytest
+from bson.binary import Binary
+from app.utils.content_codec import (
+    encode_content,
+    decode_content,
+    FORMAT_ZLIB,
+    MIN_COMPRESS_BYTES,
+)
+
+
+STYLED = '<p style="font-family:Georgia, serif;font-size:12pt;">Once upon a time — «café».</p>'
+
+
+class TestContentCodec:
+    """Test the scene content storage codec."""
+
+    def test_short_content_stays_a_string(self):
+        assert encode_content("<p>Hi</p>") == "<p>Hi</p>"
+        assert encode_content("") == ""
+        assert encode_content(None) == ""
+
+    def test_long_content_is_compressed(self):
+        html = STYLED * 50
+        stored = encode_content(html)
+        assert isinstance(stored, Binary)
+        assert stored[0] == FORMAT_ZLIB
+        assert len(stored) < len(html.encode("utf-8"))
+
+    @pytest.mark.parametrize("repeat", [1, 5, 50, 500])
+    def test_round_trip(self, repeat):
+        html = STYLED * repeat
+        assert decode_content(encode_content(html)) == html
+
+    def test_non_ascii_round_trip(self):
+        html = "".join(chr(0x4E00 + (i * 7919) % 20000) for i in range(MIN_COMPRESS_BYTES))
+        assert decode_content(encode_content(html)) == html
+
+    def test_decodes_legacy_and_bytes(self):
+        assert decode_content("<p>legacy</p>") == "<p>legacy</p>"
+        assert decode_content(None) == ""
+        # pymongo hands subtype-0 binary back as plain bytes
+        raw = bytes([FORMAT_ZLIB]) + zlib.compress(STYLED.encode("utf-8"))
+        assert decode_content(raw) == STYLED
+
+    def test_unknown_format_raises(self):
+        with pytest.raises(ValueError):
+            decode_content(b"\x7fnot a format")
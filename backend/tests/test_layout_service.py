@@ -0,0 +1,104 @@
+"""
+Tests for layout_service.py
+
+The page estimate stands in for exporting the PDF, so it has to wrap and
+paginate the way ReportLab does, and land close to the real page count.
+"""
+
+import re
+
+from app.services.export_service import build_pdf
+from app.services.layout_service import (
+    PAGE_BREAK,
+    document_layout,
+    line_count,
+    page_setup,
+    paginate,
+    scene_layout,
+)
+
+# Courier glyphs are all 0.6 em: 6 pt per character at 10 pt
+MONO = "Courier"
+
+
+class TestLineCount:
+    """Test greedy line wrapping with font metrics."""
+
+    def test_words_fill_a_line_while_they_fit(self):
+        assert line_count("aaaa bbbb", MONO, 10, 60) == 1
+        assert line_count("aaaa bbbb", MONO, 10, 50) == 2
+
+    def test_first_line_indent(self):
+        assert line_count("aaaa bbbb", MONO, 10, 60, first_line_indent=10) == 2
+
+    def test_break_starts_a_new_line(self):
+        assert line_count("aa\x00bb", MONO, 10, 600) == 2
+
+    def test_long_word_is_split(self):
+        assert line_count("a" * 25, MONO, 10, 60) == 3
+
+    def test_no_break_space_keeps_words_together(self):
+        assert line_count("aaaa\xa0bbbb", MONO, 10, 50) == 2
+        assert line_count("aa\xa0bb cc", MONO, 10, 36) == 2
+
+
+class TestSceneLayout:
+    """Test turning scene HTML into line runs."""
+
+    setup = page_setup({"defaultFont": "Courier", "defaultFontSize": 10, "defaultLineHeight": 1})
+
+    def test_paragraphs_share_a_run(self):
+        layout = scene_layout("<p>one</p><p>two</p><p></p>", self.setup)
+        assert layout == [(12.0, (1, 1), 0, 0), (10.0, (1,), 0, 0)]
+
+    def test_headings_have_spacing(self):
+        (heading,) = scene_layout("<h2>Part</h2>", self.setup)
+        assert heading == (22 * 1.3, (1,), 11.0, 22 * 0.3)
+
+    def test_lists_are_not_exported(self):
+        assert scene_layout("<ul><li><p>item</p></li></ul>", self.setup) == []
+
+
+class TestPaginate:
+    """Test stacking lines into pages."""
+
+    def test_paragraph_splits_between_pages(self):
+        assert paginate([(10.0, (15,), 0, 0)], 100) == 1.5
+
+    def test_first_line_alone_moves_on(self):
+        # 9 lines used, room for one more: the next paragraph starts on page 2
+        assert paginate([(10.0, (9, 4), 0, 0)], 100) == 1.4
+
+    def test_page_break_and_space_before(self):
+        items = [(10.0, (5,), 0, 0), PAGE_BREAK, PAGE_BREAK, (10.0, (5,), 50.0, 0)]
+        assert paginate(items, 100) == 1.5
+
+
+class TestAgainstExport:
+    """Test the estimate against the pages build_pdf() produces."""
+
+    def test_within_a_few_percent(self):
+        words = "the harbour lantern whispered quietly across a winter garden corridor".split()
+        paragraphs = [
+            f'<p style="text-align:justify;">{" ".join(words[(i + j) % len(words)] for j in range(40 + i % 90))}</p>'
+            for i in range(400)
+        ]
+        chapters = [
+            {"title": f"Chapter {c}", "scenes": [{"content": "".join(paragraphs[c * 50:(c + 1) * 50])}]}
+            for c in range(8)
+        ]
+        for settings in (
+            {},
+            {"defaultFont": "Georgia, serif", "defaultLineHeight": 1.5, "chapterTitleFormat": "chapter-number"},
+            {"paperFormat": "A5", "defaultFontSize": 11, "marginUnit": "mm", "marginLeft": 15, "marginRight": 15},
+        ):
+            pdf = build_pdf("Novel", chapters, settings)
+            pages = len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+            setup = page_setup(settings)
+            laid_out = [
+                {**chapter, "scenes": [{"layout": scene_layout(s["content"], setup)} for s in chapter["scenes"]]}
+                for chapter in chapters
+            ]
+            estimate = paginate(document_layout("Novel", laid_out, setup), setup.frame_height)
+            assert abs(estimate - pages) / pages < 0.03, (settings, estimate, pages)
@@ -0,0 +1,37 @@
+"""
+Tests for lru_cache.py
+
+The scene counts cache must stay within its bound and evict the entry
+used longest ago, not the one inserted first.
+"""
+
+from app.utils.lru_cache import LRUCache
+
+
+class TestLRUCache:
+    """Test the bounded LRU map."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now the oldest
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_counts_hits_and_misses(self):
+        cache = LRUCache(4)
+        cache.get("a")
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("a")
+        assert cache.stats() == {"size": 1, "maxsize": 4, "hits": 2, "misses": 1}
+
+    def test_zero_size_caches_nothing(self):
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        assert cache.get("a", "missing") == "missing"
+        assert len(cache) == 0
@@ -0,0 +1,75 @@
+"""
+Tests for ordering.py
+
+Ranks must always sort strictly between their neighbours, however many
+inserts land in the same spot, and spread ranks must be valid neighbours
+for later inserts.
+"""
+
+import random
+
+import pytest
+from app.utils.ordering import key_at, key_between, needs_rebalance, ordered, spread_keys, with_order
+
+
+class TestKeyBetween:
+    """Test rank generation."""
+
+    @pytest.mark.parametrize("before,after", [
+        (None, None), ("V", None), (None, "V"), ("1", "2"), ("z", None), (None, "01"), ("Az", "B"), ("A", "A1"),
+    ])
+    def test_strictly_between(self, before, after):
+        key = key_between(before, after)
+        assert before is None or before < key
+        assert after is None or key < after
+        assert not key.endswith("0")
+
+    def test_rejects_out_of_order_neighbours(self):
+        with pytest.raises(ValueError):
+            key_between("B", "A")
+
+    def test_random_inserts_keep_order(self):
+        rng = random.Random(7)
+        keys = []
+        for _ in range(2000):
+            index = rng.randint(0, len(keys))
+            key = key_at([{"rank": k} for k in keys], index)
+            keys.insert(index, key)
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_front_inserts_grow_slowly(self):
+        keys = []
+        for _ in range(60):
+            keys.insert(0, key_at([{"rank": k} for k in keys], 0))
+        assert keys == sorted(keys)
+        assert max(map(len, keys)) <= 12
+
+
+class TestSpreadKeys:
+    """Test evenly spaced rebalancing ranks."""
+
+    @pytest.mark.parametrize("count", [0, 1, 2, 61, 62, 500])
+    def test_increasing_and_insertable(self, count):
+        keys = spread_keys(count)
+        assert len(keys) == count
+        assert keys == sorted(keys)
+        assert len(set(keys)) == count
+        for before, after in zip([None] + keys, keys + [None]):
+            key = key_between(before, after)
+            assert (before is None or before < key) and (after is None or key < after)
+
+
+class TestOrdered:
+    """Test display order of siblings."""
+
+    def test_falls_back_to_order_without_ranks(self):
+        items = [{"id": "b", "order": 1}, {"id": "a", "order": 0}]
+        assert [i["id"] for i in ordered(items)] == ["a", "b"]
+        assert needs_rebalance(items)
+
+    def test_with_order_numbers_by_rank(self):
+        items = [{"id": "b", "rank": "k", "order": 0}, {"id": "a", "rank": "V", "order": 5}]
+        assert [(i["id"], i["order"]) for i in with_order(items)] == [("a", 0), ("b", 1)]
+        assert not needs_rebalance(items)
+        assert needs_rebalance([{"rank": "V" * 11}])
@@ -0,0 +1,112 @@
+"""
+Tests for outline_ops.py
+
+The batch outline endpoint must end in the same skeleton as the matching
+sequence of single-operation calls, and reject a bad batch as a whole.
+"""
+
+import pytest
+from app.services.outline_ops import apply_outline_ops, OutlineOpError
+
+
+def _outline():
+    return [
+        {"id": "c1", "title": "One", "order": 0, "wordcount": 30, "scenes": [
+            {"id": "s1", "title": "A", "order": 0, "wordcount": 10},
+            {"id": "s2", "title": "B", "order": 1, "wordcount": 20},
+        ]},
+        {"id": "c2", "title": "Two", "order": 1, "wordcount": 5, "scenes": [
+            {"id": "s3", "title": "C", "order": 0, "wordcount": 5},
+        ]},
+    ]
+
+
+def _shape(chapters):
+    return [(c["id"], c["order"], c["wordcount"], [(s["id"], s["order"]) for s in c["scenes"]]) for c in chapters]
+
+
+class TestApplyOutlineOps:
+    """Test in-memory structural edits."""
+
+    def test_moves_and_reorders(self):
+        chapters, inserted = apply_outline_ops(_outline(), [
+            {"op": "move_scene", "chapter_id": "c1", "scene_id": "s2", "target_chapter_id": "c2", "target_index": 1},
+            {"op": "reorder_chapters", "ordered_ids": ["c2", "c1"]},
+            {"op": "reorder_scenes", "chapter_id": "c2", "ordered_ids": ["s2", "s3"]},
+        ])
+        assert inserted == {}
+        assert _shape(chapters) == [
+            ("c2", 0, 25, [("s2", 0), ("s3", 1)]),
+            ("c1", 1, 10, [("s1", 0)]),
+        ]
+
+    def test_inserts_can_be_referenced_later_in_the_batch(self):
+        chapters, inserted = apply_outline_ops(_outline(), [
+            {"op": "insert_chapter", "id": "c3", "title": "Three"},
+            {"op": "insert_scene", "chapter_id": "c3", "id": "s4", "content": "<p>two words</p>"},
+            {"op": "move_chapter", "chapter_id": "c3", "target_index": 0},
+            {"op": "rename_scene", "chapter_id": "c3", "scene_id": "s4", "title": "Opening"},
+        ])
+        assert inserted == {"s4": ("<p>two words</p>", {"wordcount": 2})}
+        assert chapters[0]["id"] == "c3"
+        assert chapters[0]["scenes"][0]["title"] == "Opening"
+        assert chapters[0]["wordcount"] == 2
+
+    def test_deleting_an_inserted_scene_drops_it(self):
+        chapters, inserted = apply_outline_ops(_outline(), [
+            {"op": "insert_scene", "chapter_id": "c2", "id": "s4"},
+            {"op": "delete_chapter", "chapter_id": "c2"},
+            {"op": "delete_scene", "chapter_id": "c1", "scene_id": "s1"},
+        ])
+        assert inserted == {}
+        assert _shape(chapters) == [("c1", 0, 20, [("s2", 0)])]
+
+    @pytest.mark.parametrize("op", [
+        {"op": "rename_chapter", "chapter_id": "nope", "title": "X"},
+        {"op": "rename_scene", "chapter_id": "c1", "scene_id": "s1", "title": "  "},
+        {"op": "reorder_chapters", "ordered_ids": ["c1"]},
+        {"op": "insert_scene", "chapter_id": "c1", "id": "s3"},
+        {"op": "explode"},
+    ])
+    def test_invalid_op_names_its_position(self, op):
+        with pytest.raises(OutlineOpError, match="op 1"):
+            apply_outline_ops(_outline(), [{"op": "rename_chapter", "chapter_id": "c1", "title": "Fine"}, op])
+
+    def test_indices_are_clamped(self):
+        chapters, _ = apply_outline_ops(_outline(), [
+            {"op": "move_chapter", "chapter_id": "c1", "target_index": 99},
+            {"op": "insert_scene", "chapter_id": "c1", "id": "s4", "index": -5},
+            {"op": "move_scene", "chapter_id": "c2", "scene_id": "s3", "target_chapter_id": "c1", "target_index": -1},
+        ])
+        assert _shape(chapters) == [
+            ("c2", 0, 0, []),
+            ("c1", 1, 35, [("s3", 0), ("s4", 1), ("s1", 2), ("s2", 3)]),
+        ]
+
+    def test_inserted_scenes_are_counted_once(self):
+        calls = []
+
+        def counts_many(contents):
+            calls.append(contents)
+            return [{"wordcount": len(c.split())} for c in contents]
+
+        chapters, inserted = apply_outline_ops(_outline(), [
+            {"op": "insert_scene", "chapter_id": "c1", "id": "s4", "content": "a b c"},
+            {"op": "insert_scene", "chapter_id": "c1", "id": "s5", "content": "gone"},
+            {"op": "delete_scene", "chapter_id": "c1", "scene_id": "s5"},
+        ], counts_many)
+        assert calls == [["a b c"]]
+        assert inserted == {"s4": ("a b c", {"wordcount": 3})}
+        assert chapters[0]["wordcount"] == 33
+
+    def test_reassigns_ranks_in_final_order(self):
+        outline = _outline()
+        outline[0]["rank"], outline[1]["rank"] = "k", "V"
+        chapters, _ = apply_outline_ops(outline, [
+            {"op": "insert_scene", "chapter_id": "c1", "id": "s4", "index": 0},
+        ])
+        assert [c["id"] for c in chapters] == ["c2", "c1"]
+        assert chapters[0]["rank"] < chapters[1]["rank"]
+        ranks = [s["rank"] for s in chapters[1]["scenes"]]
+        assert [s["id"] for s in chapters[1]["scenes"]] == ["s4", "s1", "s2"]
+        assert ranks == sorted(ranks)
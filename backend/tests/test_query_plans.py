@@ -0,0 +1,178 @@
+"""
+Query-plan checks for the queries issued by app/routes and app/services.
+
+Needs a local mongod (LYRA_TEST_MONGO_URL, default mongodb://localhost:27017)
+and is skipped when none is reachable. The indexes from app.database.INDEXES
+are created on a scratch database and every route query is run through
+explain(); the test fails if any winning plan contains a COLLSCAN.
+
+Update/delete filters are checked through the equivalent find(), which
+goes through the same query planner. Aggregations are explained with
+executionStats on a seeded document, so $lookup sub-pipelines actually
+run and report their collection scans. Shapes that have a shared builder
+(subtree_filter, skeleton_filter, listing_pipeline, manuscript_pipeline)
+are taken from it rather than written out here.
+"""
+
+import os
+import uuid
+
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.database import INDEXES, EMAIL_COLLATION
+from app.services.manuscript_service import manuscript_pipeline
+from app.services.tree_service import listing_pipeline, subtree_filter
+from app.utils.mongo import skeleton_filter
+
+MONGO_URL = os.getenv("LYRA_TEST_MONGO_URL", "mongodb://localhost:27017")
+
+USER = ObjectId()
+PROJECT = ObjectId()
+DOCUMENT = ObjectId()
+FOLDER = ObjectId()
+SCENE_RECORD = ObjectId()
+
+FOLDER_ITEM = {"_id": FOLDER, "project_id": PROJECT, "path": ","}
+KEYSET = {"$or": [{"title": {"$gt": "M"}}, {"title": "M", "_id": {"$gt": DOCUMENT}}]}
+
+# (collection, filter, find options) — one entry per distinct route query shape
+ROUTE_QUERIES = [
+    # auth.py / users.py
+    ("users", {"email": "writer@example.com"}, {"collation": EMAIL_COLLATION}),
+    ("users", {"_id": USER}, {}),
+    ("reset_codes", {"user_id": USER}, {}),
+    ("reset_codes", {"user_id": USER, "used": False, "expires_at": {"$gt": 0}}, {}),
+    ("projects", {"user_id": USER}, {}),
+    ("documents", {"$or": [{"user_id": USER}, {"project_id": {"$in": [PROJECT]}}]}, {}),
+    # projects.py
+    ("projects", {"_id": PROJECT, "user_id": USER}, {}),
+    ("projects", {"_id": PROJECT}, {}),
+    # documents.py
+    ("documents", {"_id": DOCUMENT, "project_id": PROJECT, "user_id": USER}, {}),
+    ("documents", {"_id": DOCUMENT, "project_id": PROJECT, "user_id": {"$exists": False}}, {}),
+    ("documents", {"project_id": PROJECT, "parent_id": None}, {"sort": [("title", 1), ("_id", 1)]}),
+    ("documents", {"project_id": PROJECT, "parent_id": {"$in": [FOLDER, str(FOLDER)]}},
+     {"sort": [("title", 1), ("_id", 1)]}),
+    ("documents", {"project_id": PROJECT, "parent_id": None, **KEYSET},
+     {"sort": [("title", 1), ("_id", 1)]}),
+    ("documents", {"project_id": PROJECT}, {}),
+    ("documents", {"_id": DOCUMENT, "project_id": PROJECT}, {}),
+    ("documents", {"_id": DOCUMENT, **skeleton_filter({"version": 3, "counts_version": 2})}, {}),
+    ("documents", {"_id": DOCUMENT, "chapters.id": "c", **skeleton_filter({"version": 0})}, {}),
+    ("documents", {"_id": {"$in": [DOCUMENT]}}, {}),
+    ("documents", subtree_filter(FOLDER_ITEM), {}),
+    ("documents", {**subtree_filter(FOLDER_ITEM), "type": {"$ne": "folder"}}, {}),
+    ("documents", {"$or": [{"_id": FOLDER, "project_id": PROJECT}, subtree_filter(FOLDER_ITEM)]}, {}),
+    ("documents", {"_id": FOLDER, "project_id": PROJECT, "type": "folder"}, {}),
+    ("documents", {"_id": DOCUMENT, "project_id": PROJECT, "type": {"$ne": "folder"},
+                   "chapters": {"$elemMatch": {"id": "c", "scenes.id": "s"}}}, {}),
+    ("scenes", {"document_id": DOCUMENT}, {}),
+    ("scenes", {"document_id": DOCUMENT, "chapter_id": "c", "scene_id": "s"}, {}),
+    ("scenes", {"document_id": DOCUMENT, "chapter_id": "c", "scene_id": "s", "content_hash": {"$in": ["h", None]}}, {}),
+    ("scenes", {"document_id": DOCUMENT, "chapter_id": "c"}, {}),
+    ("scenes", {"document_id": DOCUMENT, "scene_id": "s"}, {}),
+    ("scenes", {"document_id": DOCUMENT, "scene_id": {"$in": ["s", "t"]}}, {}),
+    ("scenes", {"document_id": {"$in": [DOCUMENT]}}, {}),
+    ("scenes", {"$or": [{"document_id": DOCUMENT, "scene_id": "s"}, {"document_id": FOLDER, "scene_id": "t"}]}, {}),
+    ("scenes", {"_id": SCENE_RECORD, "content_hash": "h"}, {}),
+]
+
+# (collection, pipeline) — every aggregation the routes and services run
+ROUTE_PIPELINES = [
+    ("documents", listing_pipeline({"project_id": PROJECT, "parent_id": None}, 100)),
+    ("documents", listing_pipeline({"project_id": PROJECT, "parent_id": {"$in": [FOLDER, str(FOLDER)]}, **KEYSET}, 100)),
+    ("documents", manuscript_pipeline(DOCUMENT)),
+    # copy_documents_content, up to its $merge (explain does not run writes)
+    ("scenes", [{"$match": {"document_id": {"$in": [DOCUMENT]}}}, {"$unset": "_id"}]),
+]
+
+
+def _collection_scans(explain):
+    """Yield every COLLSCAN stage or non-zero collectionScans count in an aggregate explain, at any depth."""
+    if isinstance(explain, list):
+        for value in explain:
+            yield from _collection_scans(value)
+    elif isinstance(explain, dict):
+        if explain.get("stage") == "COLLSCAN":
+            yield "COLLSCAN"
+        if explain.get("collectionScans"):
+            yield f"collectionScans={explain['collectionScans']}"
+        for key, value in explain.items():
+            if key != "rejectedPlans":
+                yield from _collection_scans(value)
+
+
+def _stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if "queryPlan" in plan:  # slot-based engine wraps the classic plan
+        plan = plan["queryPlan"]
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from _stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+@pytest.fixture(scope="module")
+def scratch_db():
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"No mongod reachable at {MONGO_URL}")
+
+    name = f"lyra_plans_{uuid.uuid4().hex[:8]}"
+    db = client[name]
+    for collection_name, indexes in INDEXES.items():
+        db[collection_name].create_indexes(indexes)
+    yield db
+    client.drop_database(name)
+    client.close()
+
+
+@pytest.mark.parametrize(
+    "collection,query,options",
+    ROUTE_QUERIES,
+    ids=[f"{c}:{sorted(q)}" for c, q, _ in ROUTE_QUERIES],
+)
+def test_route_query_uses_index(scratch_db, collection, query, options):
+    options = dict(options)
+    sort = options.pop("sort", None)
+    cursor = scratch_db[collection].find(query, **options)
+    if sort:
+        cursor = cursor.sort(sort)
+
+    plan = cursor.explain()["queryPlanner"]["winningPlan"]
+    stages = list(_stages(plan))
+    assert "COLLSCAN" not in stages, f"{collection} {query} does a COLLSCAN: {stages}"
+
+
+@pytest.fixture(scope="module")
+def seeded_db(scratch_db):
+    """One document with a scene record, so pipelines have rows to look up."""
+    scratch_db["documents"].insert_one({
+        "_id": DOCUMENT, "project_id": PROJECT, "user_id": USER, "parent_id": None, "path": ",",
+        "type": "document", "title": "Draft",
+        "chapters": [{"id": "c", "title": "One", "rank": "V", "wordcount": 2,
+                      "scenes": [{"id": "s", "title": "A", "rank": "V", "wordcount": 2}]}],
+    })
+    scratch_db["scenes"].insert_one({
+        "_id": SCENE_RECORD, "document_id": DOCUMENT, "chapter_id": "c", "scene_id": "s", "content": "two words",
+    })
+    return scratch_db
+
+
+@pytest.mark.parametrize(
+    "collection,pipeline",
+    ROUTE_PIPELINES,
+    ids=[f"{c}:{[next(iter(stage)) for stage in p]}" for c, p in ROUTE_PIPELINES],
+)
+def test_route_pipeline_uses_index(seeded_db, collection, pipeline):
+    explain = seeded_db.command(
+        "explain", {"aggregate": collection, "pipeline": pipeline, "cursor": {}}, verbosity="executionStats"
+    )
+    scans = list(_collection_scans(explain))
+    assert not scans, f"{collection} {pipeline} scans a collection: {scans}"
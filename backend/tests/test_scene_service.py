@@ -0,0 +1,151 @@
+"""
+Tests for scene_service.py
+
+The pure helpers need nothing; write_scene_batch runs against a local
+mongod (LYRA_TEST_MONGO_URL) and is skipped when none is reachable.
+
+Delta autosave offsets are JavaScript string indices (UTF-16 code units),
+so splices have to line up with what the editor computes.
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+
+import pytest
+from bson import ObjectId
+
+from app.services import scene_service
+from app.services.scene_service import (
+    apply_splices,
+    content_hash,
+    save_scene_content,
+    scene_counts,
+    scene_counts_cache,
+    scene_counts_many,
+    stored_content_hash,
+    write_scene_batch,
+)
+from app.services.wordcount_service import text_counts
+
+MONGO_URL = os.getenv("LYRA_TEST_MONGO_URL", "mongodb://localhost:27017")
+
+
+class TestApplySplices:
+    """Test server-side patch application."""
+
+    def test_insert_delete_replace(self):
+        assert apply_splices("<p>Hello</p>", [(8, 0, " world")]) == "<p>Hello world</p>"
+        assert apply_splices("<p>Hello world</p>", [(8, 6, "")]) == "<p>Hello</p>"
+        assert apply_splices("<p>Hello</p>", [(3, 5, "Howdy")]) == "<p>Howdy</p>"
+
+    def test_ops_apply_in_sequence(self):
+        assert apply_splices("abc", [(0, 1, "X"), (3, 0, "!")]) == "Xbc!"
+
+    def test_offsets_are_utf16_units(self):
+        # "😀" is two UTF-16 code units, as in "😀".length === 2
+        assert apply_splices("a😀b", [(3, 1, "c")]) == "a😀c"
+        assert apply_splices("a😀b", [(1, 2, "")]) == "ab"
+
+    @pytest.mark.parametrize("op", [(-1, 0, ""), (0, -1, ""), (3, 1, ""), (4, 0, "x")])
+    def test_out_of_range(self, op):
+        with pytest.raises(ValueError):
+            apply_splices("abc", [op])
+
+    def test_split_surrogate_pair(self):
+        with pytest.raises(ValueError):
+            apply_splices("a😀", [(2, 0, "x")])
+
+    def test_content_hash(self):
+        assert content_hash("<p>é</p>") == hashlib.sha256("<p>é</p>".encode("utf-8")).hexdigest()
+        assert stored_content_hash({"content": "<p>x</p>"}) == content_hash("<p>x</p>")
+        assert stored_content_hash({"content": "<p>x</p>", "content_hash": "abc"}) == "abc"
+
+
+class TestSceneCounts:
+    """Test counts memoized by content hash."""
+
+    def setup_method(self):
+        scene_counts_cache.clear()
+
+    def test_repeat_content_is_a_cache_hit(self):
+        html = "<p>The harbour lantern, quietly.</p>"
+        first = scene_counts(html)
+        assert scene_counts(html, content_hash(html)) == first
+        assert (scene_counts_cache.hits, scene_counts_cache.misses) == (1, 1)
+        assert tuple(first.values()) == text_counts(html)
+
+    def test_results_are_copies(self):
+        scene_counts("<p>one two</p>")["wordcount"] = 99
+        assert scene_counts("<p>one two</p>")["wordcount"] == 2
+
+    def test_batch_only_counts_misses(self):
+        scene_counts("<p>seen</p>")
+        counts = scene_counts_many(["<p>seen</p>", "<p>new words</p>"])
+        assert [c["wordcount"] for c in counts] == [1, 2]
+        assert scene_counts_cache.hits == 1
+        assert len(scene_counts_cache) == 2
+
+
+@pytest.fixture(scope="module")
+def scratch_db_name():
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"No mongod reachable at {MONGO_URL}")
+    name = f"lyra_scenes_{uuid.uuid4().hex[:8]}"
+    yield name
+    client.drop_database(name)
+    client.close()
+
+
+class TestWriteSceneBatch:
+    """Test the bulk scene write against a real collection (needs a mongod)."""
+
+    def _run(self, scratch_db_name, monkeypatch, body):
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        async def run():
+            client = AsyncIOMotorClient(MONGO_URL)
+            collection = client[scratch_db_name][f"scenes_{uuid.uuid4().hex[:8]}"]
+            monkeypatch.setattr(scene_service, "scenes_collection", collection)
+            try:
+                return await body(collection)
+            finally:
+                client.close()
+        return asyncio.run(run())
+
+    def test_scene_without_record_is_created(self, scratch_db_name, monkeypatch):
+        document_id = ObjectId()
+
+        async def body(collection):
+            await save_scene_content(document_id, "c1", "s1", "<p>old words</p>")
+            written = await write_scene_batch([
+                (document_id, "c1", "s1", "<p>three new words</p>"),
+                (document_id, "c2", "s2", "<p>never saved before</p>"),
+            ])
+            rows = {row["scene_id"]: row async for row in collection.find({"document_id": document_id})}
+            return written, rows
+
+        written, rows = self._run(scratch_db_name, monkeypatch, body)
+        assert [(chapter_id, scene_id) for _, chapter_id, scene_id, _, _ in written] == [("c1", "s1"), ("c2", "s2")]
+        assert written[0][3]["wordcount"] == 2
+        assert written[1][3] == {}
+        assert written[1][4]["wordcount"] == 3
+        assert rows["s2"]["chapter_id"] == "c2"
+        assert rows["s2"]["content_hash"] == content_hash("<p>never saved before</p>")
+        assert rows["s1"]["wordcount"] == 3
+
+    def test_unknown_chapter_skips_missing_record(self, scratch_db_name, monkeypatch):
+        document_id = ObjectId()
+
+        async def body(collection):
+            written = await write_scene_batch([(document_id, None, "gone", "<p>deleted meanwhile</p>")])
+            return written, await collection.count_documents({"document_id": document_id})
+
+        assert self._run(scratch_db_name, monkeypatch, body) == ([], 0)
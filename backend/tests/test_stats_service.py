@@ -0,0 +1,204 @@
+"""
+Tests for stats_service.py
+
+The outline part of the maintained `stats` must match what the routes used
+to compute per request by sorting chapters and scenes by wordcount.
+"""
+
+import os
+import random
+import uuid
+
+import pytest
+from app.services.stats_service import (
+    EXTREME_KEYS,
+    outline_stats,
+    outline_stats_expression,
+    extremes_affected,
+    character_delta_update,
+    scene_counts_update,
+)
+
+MONGO_URL = os.getenv("LYRA_TEST_MONGO_URL", "mongodb://localhost:27017")
+
+
+def _sorted_extremes(chapters):
+    """The per-request computation get_documents/get_document_stats used to run."""
+    result = {}
+    all_scenes = [
+        (sc.get("title", ""), sc.get("wordcount", 0), ch.get("title", ""))
+        for ch in chapters
+        for sc in ch.get("scenes", [])
+    ]
+    if chapters:
+        sorted_ch = sorted(chapters, key=lambda c: c.get("wordcount", 0))
+        result["shortest_chapter"] = (sorted_ch[0]["title"], sorted_ch[0]["wordcount"])
+        result["longest_chapter"] = (sorted_ch[-1]["title"], sorted_ch[-1]["wordcount"])
+    if all_scenes:
+        sorted_sc = sorted(all_scenes, key=lambda s: s[1])
+        result["shortest_scene"] = sorted_sc[0]
+        result["longest_scene"] = sorted_sc[-1]
+    return result
+
+
+def _random_outline(rng, chapters, max_scenes):
+    outline = []
+    for c in range(chapters):
+        scenes = [
+            {"id": f"s{c}-{i}", "title": f"Scene {c}.{i}", "wordcount": rng.randint(0, 5)}
+            for i in range(rng.randint(0, max_scenes))
+        ]
+        outline.append({
+            "id": f"c{c}",
+            "title": f"Chapter {c}",
+            "wordcount": sum(s["wordcount"] for s in scenes),
+            "scenes": scenes,
+        })
+    return outline
+
+
+class TestOutlineStats:
+    """Test the incremental stats helpers."""
+
+    def test_empty_outline(self):
+        stats = outline_stats([])
+        assert stats["chapter_count"] == 0
+        assert stats["scene_count"] == 0
+        assert stats["longest_chapter"] is None
+        assert stats["shortest_scene"] is None
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_sorted_extremes(self, seed):
+        """Ties (small random wordcounts) must resolve like sorted()[0] / sorted()[-1]."""
+        rng = random.Random(seed)
+        chapters = _random_outline(rng, rng.randint(1, 6), 4)
+        stats = outline_stats(chapters)
+        expected = _sorted_extremes(chapters)
+
+        assert stats["chapter_count"] == len(chapters)
+        assert stats["scene_count"] == sum(len(c["scenes"]) for c in chapters)
+        for key in ("shortest_chapter", "longest_chapter"):
+            assert (stats[key]["title"], stats[key]["word_count"]) == expected[key]
+        for key in ("shortest_scene", "longest_scene"):
+            if key in expected:
+                entry = stats[key]
+                assert (entry["title"], entry["word_count"], entry["chapter_title"]) == expected[key]
+            else:
+                assert stats[key] is None
+
+    def test_character_delta_update(self):
+        before = {"char_count_with_spaces": 10, "char_count_without_spaces": 8}
+        after = {"char_count_with_spaces": 14, "char_count_without_spaces": 11}
+        assert character_delta_update(before, after) == {
+            "stats.character_count_with_spaces": 4,
+            "stats.character_count_without_spaces": 3,
+        }
+        assert character_delta_update(after, None) == {
+            "stats.character_count_with_spaces": -14,
+            "stats.character_count_without_spaces": -11,
+        }
+
+
+class TestExtremesAffected:
+    """Skipping the recompute must never leave a stale longest/shortest entry."""
+
+    @staticmethod
+    def _extremes(chapters):
+        stats = outline_stats(chapters)
+        return {key: stats[key] for key in EXTREME_KEYS}
+
+    @pytest.mark.parametrize("seed", range(200))
+    def test_unaffected_edit_keeps_extremes(self, seed):
+        rng = random.Random(seed)
+        chapters = _random_outline(rng, rng.randint(1, 5), 4)
+        with_scenes = [c for c in chapters if c["scenes"]]
+        if not with_scenes:
+            return
+        stats = outline_stats(chapters)
+
+        chapter = rng.choice(with_scenes)
+        scene = rng.choice(chapter["scenes"])
+        scene["wordcount"] = rng.randint(0, 6)
+        chapter["wordcount"] = sum(s["wordcount"] for s in chapter["scenes"])
+
+        if not extremes_affected(stats, [(chapter["id"], chapter["wordcount"])], [(scene["id"], scene["wordcount"])]):
+            assert self._extremes(chapters) == {key: stats[key] for key in EXTREME_KEYS}
+
+    @pytest.mark.parametrize("seed", range(200))
+    def test_unaffected_removal_keeps_extremes(self, seed):
+        rng = random.Random(seed)
+        chapters = _random_outline(rng, rng.randint(1, 5), 4)
+        with_scenes = [c for c in chapters if c["scenes"]]
+        if not with_scenes:
+            return
+        stats = outline_stats(chapters)
+
+        chapter = rng.choice(with_scenes)
+        scene = rng.choice(chapter["scenes"])
+        chapter["scenes"].remove(scene)
+        chapter["wordcount"] -= scene["wordcount"]
+
+        changed = [(chapter["id"], chapter["wordcount"])] if scene["wordcount"] else []
+        if not extremes_affected(stats, changed, removed=[scene["id"]]):
+            assert self._extremes(chapters) == {key: stats[key] for key in EXTREME_KEYS}
+
+    def test_missing_stats_are_affected(self):
+        assert extremes_affected(None)
+        assert extremes_affected({"chapter_count": 1})
+
+
+@pytest.fixture(scope="module")
+def scratch_collection():
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"No mongod reachable at {MONGO_URL}")
+    name = f"lyra_stats_{uuid.uuid4().hex[:8]}"
+    yield client[name]["documents"]
+    client.drop_database(name)
+    client.close()
+
+
+class TestOutlineStatsExpression:
+    """The server-side expression must agree with outline_stats(), ties included (needs a mongod)."""
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_matches_outline_stats(self, scratch_collection, seed):
+        rng = random.Random(seed)
+        chapters = _random_outline(rng, rng.randint(0, 6), 4)
+        document_id = scratch_collection.insert_one({"chapters": chapters}).inserted_id
+        result = scratch_collection.aggregate([
+            {"$match": {"_id": document_id}},
+            {"$project": {"_id": 0, "stats": outline_stats_expression()}},
+        ]).next()
+        assert result["stats"] == outline_stats(chapters)
+
+
+class TestSceneCountsUpdate:
+    """Test the counter update for several rewritten scenes of one document."""
+
+    def test_one_filter_per_chapter(self):
+        counts = lambda wc, chars: {"wordcount": wc, "char_count_with_spaces": chars, "char_count_without_spaces": chars}
+        update, array_filters = scene_counts_update([
+            ("c1", "s1", counts(10, 50), counts(12, 60)),
+            ("c1", "s2", counts(5, 20), counts(4, 18)),
+            ("c2", "s3", counts(0, 0), counts(7, 30)),
+        ])
+        assert array_filters == [
+            {"c0.id": "c1"}, {"s0.id": "s1"}, {"s1.id": "s2"}, {"c1.id": "c2"}, {"s2.id": "s3"},
+        ]
+        assert update["$set"] == {
+            "chapters.$[c0].scenes.$[s0].wordcount": 12,
+            "chapters.$[c0].scenes.$[s1].wordcount": 4,
+            "chapters.$[c1].scenes.$[s2].wordcount": 7,
+        }
+        assert update["$inc"]["chapters.$[c0].wordcount"] == 1
+        assert update["$inc"]["chapters.$[c1].wordcount"] == 7
+        assert update["$inc"]["total_wordcount"] == 8
+        assert update["$inc"]["stats.character_count_with_spaces"] == 38
+        # the caller decides which version field the write bumps
+        assert "version" not in update["$inc"]
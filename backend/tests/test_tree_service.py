@@ -0,0 +1,56 @@
+"""
+Tests for tree_service.py
+
+Subtree filters must match exactly the items below a folder, and the
+nested tree must keep every item, even ones whose parent is gone.
+"""
+
+import re
+
+from bson import ObjectId
+
+from app.services.tree_service import ROOT_PATH, build_tree, child_path, subtree_filter
+
+
+class TestPaths:
+    """Test materialized path helpers."""
+
+    def test_subtree_filter_is_an_anchored_prefix(self):
+        project, outer, inner = ObjectId(), ObjectId(), ObjectId()
+        folder = {"_id": outer, "project_id": project, "path": ROOT_PATH}
+        pattern = re.compile(subtree_filter(folder)["path"]["$regex"])
+
+        assert child_path(folder) == f",{outer},"
+        assert pattern.match(f",{outer},")
+        assert pattern.match(f",{outer},{inner},")
+        assert not pattern.match(ROOT_PATH)
+        assert not pattern.match(f",{inner},{outer},")
+
+    def test_subtree_filter_accepts_serialized_items(self):
+        project = ObjectId()
+        folder = {"_id": str(ObjectId()), "project_id": str(project), "path": ROOT_PATH}
+        assert subtree_filter(folder)["project_id"] == project
+
+    def test_legacy_item_without_path_counts_as_root(self):
+        folder = {"_id": "f1", "project_id": "p"}
+        assert child_path(folder) == ",f1,"
+
+
+class TestBuildTree:
+    """Test nesting a flat item list."""
+
+    def test_nests_and_sorts_like_the_listing(self):
+        items = [
+            {"_id": "d2", "title": "Beta", "type": "document", "parent_id": "f1"},
+            {"_id": "f1", "title": "Drafts", "type": "folder", "parent_id": None},
+            {"_id": "d1", "title": "Alpha", "type": "document", "parent_id": "f1"},
+            {"_id": "d3", "title": "Notes", "type": "document", "parent_id": None},
+        ]
+        tree = build_tree(items)
+        assert [n["_id"] for n in tree] == ["f1", "d3"]
+        assert [n["_id"] for n in tree[0]["children"]] == ["d1", "d2"]
+        assert tree[1]["children"] is None
+
+    def test_orphans_surface_at_the_root(self):
+        tree = build_tree([{"_id": "d1", "title": "Lost", "type": "document", "parent_id": "gone"}])
+        assert [n["_id"] for n in tree] == ["d1"]
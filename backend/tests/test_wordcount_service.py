@@ -0,0 +1,103 @@
+"""
+Tests for wordcount_service.py
+
+text_counts() replaces a count_words() + count_characters() pair on every
+save, so it must return exactly what they return, for any HTML. The same
+goes for totals built incrementally from per-paragraph counts.
+"""
+
+import random
+
+import pytest
+from app.services.wordcount_service import (
+    count_characters,
+    count_words,
+    paragraph_table,
+    split_paragraphs,
+    table_counts,
+    text_counts,
+)
+
+
+def _expected(html):
+    return (count_words(html), *count_characters(html))
+
+
+SAMPLES = [
+    "",
+    "<p></p>",
+    "<p>Hello world</p>",
+    "<p>  leading and trailing  </p>  ",
+    "<p>one</p><p>two</p>",
+    "<p>caf&eacute; &amp; cr&egrave;me&nbsp;br&ucirc;l&eacute;e</p>",
+    "<p>&lt;p&gt; is not a tag</p>",
+    "<p>a < b and c > d</p>",
+    "<p>don't stop-me now_ok</p>",
+    "<p>Ελληνικά 日本語 русский</p>",
+    "<p>tabs\tand\nnewlines\r\nand nbsp　ideographic</p>",
+    "<p>zero​width</p>",
+    '<p style="font-family:Georgia, serif;">styled <em>text</em></p>',
+    "&amp",
+    "<",
+]
+
+
+class TestTextCounts:
+    """Test the single tag-strip tokenizer against the per-count functions."""
+
+    @pytest.mark.parametrize("html", SAMPLES)
+    def test_matches_per_count_functions(self, html):
+        assert text_counts(html) == _expected(html)
+
+    def test_random_html_parity(self):
+        rng = random.Random(11)
+        pieces = [
+            "word", "Wörd", "日本", "42", " ", "  ", "\t", "\n", " ", "\x1c", " ", "-", "'", ".",
+            "<p>", "</p>", "<br>", "<em>", "</em>", '<span style="x">', "<", ">", "&amp;", "&nbsp;",
+            "&#8212;", "&#x41;", "&bogus;", "&", "&lt", "_",
+        ]
+        for _ in range(500):
+            html = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+            assert text_counts(html) == _expected(html), html
+
+
+class TestParagraphCounts:
+    """Test incremental counting from per-paragraph hashes."""
+
+    PIECES = [
+        "word", "Wörd", "日本", " ", "\n", "-", "'", "<p>", "</p>", "<P class='x'>", "<h2>", "</h2>",
+        "<li>", "<div>", "<hr>", "<br>", "<em>", "</em>", "<", ">", "a < b", "&amp;", "&amp", "&nbsp;",
+        "&#8212;", "&",
+    ]
+
+    def _html(self, rng):
+        return "".join(rng.choice(self.PIECES) for _ in range(rng.randint(0, 60)))
+
+    @pytest.mark.parametrize("html", SAMPLES)
+    def test_totals_match_full_count(self, html):
+        assert table_counts(paragraph_table(html)) == _expected(html)
+        assert "".join(split_paragraphs(html)) == html
+
+    def test_splits_before_block_tags_only(self):
+        html = "<p>one <em>two</em></p><h2>Three</h2><p>four</p>"
+        assert split_paragraphs(html) == ["<p>one <em>two</em></p>", "<h2>Three</h2>", "<p>four</p>"]
+
+    def test_unchanged_paragraphs_are_reused(self):
+        before = paragraph_table("<p>one</p><p>two three</p>")
+        after = paragraph_table("<p>one</p><p>two three four</p>", before)
+        assert after[0] is before[0]
+        assert after[1] is not before[1]
+
+    def test_random_edits_keep_totals_exact(self):
+        rng = random.Random(23)
+        for _ in range(300):
+            html = self._html(rng)
+            table = paragraph_table(html)
+            for _ in range(5):
+                start = rng.randint(0, len(html))
+                end = rng.randint(start, min(len(html), start + 20))
+                html = html[:start] + self._html(rng)[:rng.randint(0, 15)] + html[end:]
+                table = paragraph_table(html, table)
+                totals = table_counts(table)
+                assert totals[0] == count_words(html), html
+                assert totals == _expected(html), html
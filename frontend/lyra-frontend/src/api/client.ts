@@ -2,8 +2,10 @@ import axios from "axios";
 
 const BACKEND_URL = import.meta.env.VITE_BACKEND_URL || "https://lyra-backend-production-98b7.up.railway.app";
 
+export const API_BASE_URL = `${BACKEND_URL}/api`;
+
 const api = axios.create({
-  baseURL: `${BACKEND_URL}/api`,
+  baseURL: API_BASE_URL,
 });
 
 api.interceptors.request.use((config) => {
@@ -12,7 +12,7 @@ import DeleteConfirmationModal from "../../common_components/DeleteConfirmationM
 import MoveConflictModal from "../../common_components/MoveConflictModal";
 import { ChevronLeft, Menu, FileText } from "lucide-react";
 import CreateButton from "../../common_components/CreateButton";
-import { Project, Item } from "../../types/document";
+import { Project, Item, ItemPage } from "../../types/document";
 import Breadcrumb from "./components/Breadcrumb";
 import DocumentDetailsModal from "./components/DocumentDetailsModal";
 
@@ -20,6 +20,30 @@ import DocumentDetailsModal from "./components/DocumentDetailsModal";
 // TYPES & INTERFACES (already defined elsewhere, just referenced)
 // ────────────────────────────────────────────────
 
+// Walks the keyset-paginated folder listing; onPage lets callers render
+// the first page before the rest has arrived.
+async function fetchFolderItems(
+  projectId: string,
+  folderId: string | null,
+  options: { signal?: AbortSignal; onPage?: (itemsSoFar: Item[]) => void } = {}
+): Promise<Item[]> {
+  const all: Item[] = [];
+  let after: string | null = null;
+  do {
+    const params: Record<string, string> = {};
+    if (folderId) params.parent_id = folderId;
+    if (after) params.after = after;
+    const res = await api.get<ItemPage>(`/projects/${projectId}/documents`, {
+      params,
+      signal: options.signal,
+    });
+    all.push(...(res.data?.items || []));
+    options.onPage?.([...all]);
+    after = res.data?.next_cursor || null;
+  } while (after);
+  return all;
+}
+
 export default function Documents() {
   const { projectId } = useParams<{ projectId: string }>();
   const navigate = useNavigate();
@@ -149,15 +173,12 @@ const fetchData = useCallback(async () => {
     });
     setProject(projectRes.data);
 
-    // 2. Fetch documents/items - clean relative path only
-    const params = currentFolderId ? `?parent_id=${currentFolderId}` : "";
-    const itemsRes = await api.get(`/projects/${projectId}/documents${params}`, { 
-      signal: controller.signal 
+    // 2. Fetch documents/items page by page
+    await fetchFolderItems(projectId, currentFolderId, {
+      signal: controller.signal,
+      onPage: setItems,
     });
 
-    const allItems = itemsRes.data || [];
-    setItems(allItems);
-
   } catch (err: any) {
     if (err.name === "AbortError") return;
 
@@ -212,6 +233,17 @@ const fetchData = useCallback(async () => {
     return candidate;
   }, []);
 
+  // Copy and move run on the server; the document content never passes through the browser
+  const pasteClip = (
+    clip: { id: string; action: "copy" | "cut" },
+    targetFolderId: string | null,
+    title: string
+  ) =>
+    api.post(`/projects/${projectId}/documents/${clip.id}/${clip.action === "cut" ? "move" : "copy"}`, {
+      target_parent_id: targetFolderId,
+      title,
+    });
+
   const handlePaste = async (targetFolderId: string | null) => {
   if (clipboard.length === 0) return;
 
@@ -234,9 +266,7 @@ const fetchData = useCallback(async () => {
 
     let existing: Item[] = [];
     try {
-      const params = targetFolderId ? `?parent_id=${targetFolderId}` : "";
-      const res = await api.get(`/projects/${projectId}/documents${params}`);
-      existing = res.data || [];
+      existing = await fetchFolderItems(projectId!, targetFolderId);
     } catch (e) {
       console.error("[PASTE FETCH ERROR]", e);
       setError("Could not check for conflicts");
@@ -261,22 +291,8 @@ const fetchData = useCallback(async () => {
     }
 
     // No conflict → paste immediately
-    let origData: any = null;
     try {
-      const r = await api.get(`/projects/${projectId}/documents/${clip.id}`);
-      origData = r.data;
-    } catch (err) {
-      console.error(err);
-    }
-
-    const payload: any = { title: finalName, type: clip.type, parent_id: targetFolderId };
-    if (origData?.chapters) payload.chapters = origData.chapters;
-
-    try {
-      await api.post(`/projects/${projectId}/documents`, payload);
-      if (clip.action === "cut") {
-        await api.delete(`/projects/${projectId}/documents/${clip.id}`);
-      }
+      await pasteClip(clip, targetFolderId, finalName);
       pastedCount++;
       processNext(); // continue to next item
     } catch (err) {
@@ -726,29 +742,10 @@ const fetchData = useCallback(async () => {
           onOverwrite={async () => {
             try {
               await api.delete(`/projects/${projectId}/documents/${pasteConflict.existingItem._id}`);
-            
+
               const clip = pasteConflict.clipboardItem;
-              const payload: any = {
-                title: clip.title,
-                type: clip.type,
-                parent_id: pasteConflict.targetFolderId,
-              };
-            
-              let origData: any = null;
-              try {
-                const r = await api.get(`/projects/${projectId}/documents/${clip.id}`);
-                origData = r.data;
-                if (origData?.chapters) payload.chapters = origData.chapters;
-              } catch (err) {
-                console.error("Could not fetch original data:", err);
-              }
-            
-              await api.post(`/projects/${projectId}/documents`, payload);
-            
-              if (clip.action === "cut") {
-                await api.delete(`/projects/${projectId}/documents/${clip.id}`);
-              }
-            
+              await pasteClip(clip, pasteConflict.targetFolderId, clip.title);
+
               showToast("Pasted with overwrite");
             } catch (err) {
               console.error("[PASTE OVERWRITE ERROR]", err);
@@ -761,28 +758,8 @@ const fetchData = useCallback(async () => {
           onRename={async () => {
             try {
               const clip = pasteConflict.clipboardItem;
-              const finalName = pasteConflict.suggestedName;
-              const payload: any = {
-                title: finalName,
-                type: clip.type,
-                parent_id: pasteConflict.targetFolderId,
-              };
-            
-              let origData: any = null;
-              try {
-                const r = await api.get(`/projects/${projectId}/documents/${clip.id}`);
-                origData = r.data;
-                if (origData?.chapters) payload.chapters = origData.chapters;
-              } catch (err) {
-                console.error("Could not fetch original data:", err);
-              }
-            
-              await api.post(`/projects/${projectId}/documents`, payload);
-            
-              if (clip.action === "cut") {
-                await api.delete(`/projects/${projectId}/documents/${clip.id}`);
-              }
-            
+              await pasteClip(clip, pasteConflict.targetFolderId, pasteConflict.suggestedName);
+
               showToast("Pasted with new name");
             } catch (err) {
               console.error("[PASTE RENAME ERROR]", err);
@@ -394,11 +394,11 @@ useEffect(() => {
     }
 
     if (editorMode === "chapter" && activeChapter) {
-      return <ChapterEditorView chapter={activeChapter} scale={scale} />;
+      return <ChapterEditorView projectId={projectId} documentId={documentId} chapter={activeChapter} scale={scale} />;
     }
 
     if (editorMode === "document") {
-      return <DocumentEditorView outline={outline} scale={scale} />;
+      return <DocumentEditorView projectId={projectId} documentId={documentId} outline={outline} scale={scale} />;
     }
 
     return (
@@ -4,8 +4,11 @@ import { PaginatedPageView } from "./PaginatedPageView";
 import { compileChapter } from "../utils/Chaptercompiler";
 import type { Chapter } from "../../../types/document";
 import { useState, useEffect } from "react";
+import { useChapterContent } from "../hooks/useSceneContents";
 
 interface ChapterEditorViewProps {
+  projectId: string;
+  documentId: string;
   chapter: Chapter;
   scale?: number;
 }
@@ -14,11 +17,13 @@ interface ChapterEditorViewProps {
  * ChapterEditorView
  *
  * Read-only paginated view of a single chapter.
- * Uses compileChapter to convert the chapter into pre-paginated HTML strings,
- * then passes them to PaginatedPageView for rendering.
+ * Scene content is fetched on demand (the outline carries none), then
+ * compileChapter converts the chapter into pre-paginated HTML strings for
+ * PaginatedPageView.
  */
-export function ChapterEditorView({ chapter, scale = 1 }: ChapterEditorViewProps) {
+export function ChapterEditorView({ projectId, documentId, chapter: outlineChapter, scale = 1 }: ChapterEditorViewProps) {
   const { settings } = useDocumentSettings();
+  const chapter = useChapterContent(projectId, documentId, outlineChapter);
 
   const [pages, setPages] = useState<string[]>(() => compileChapter(chapter, settings));
 
@@ -4,8 +4,11 @@ import { PaginatedPageView } from "./PaginatedPageView";
 import { compileDocument } from "../utils/Documentcompiler.ts";
 import type { DocumentOutline } from "../../../types/document";
 import { useState, useEffect } from "react";
+import { useDocumentContent } from "../hooks/useSceneContents";
 
 interface DocumentEditorViewProps {
+  projectId: string;
+  documentId: string;
   outline: DocumentOutline;
   scale?: number;
 }
@@ -14,11 +17,13 @@ interface DocumentEditorViewProps {
  * DocumentEditorView
  *
  * Read-only paginated view of the entire document.
- * Uses compileDocument to convert all chapters into pre-paginated HTML strings,
- * then passes them to PaginatedPageView for rendering.
+ * Scene content is fetched on demand (the sidebar outline carries none), then
+ * compileDocument converts all chapters into pre-paginated HTML strings for
+ * PaginatedPageView.
  */
-export function DocumentEditorView({ outline, scale = 1 }: DocumentEditorViewProps) {
+export function DocumentEditorView({ projectId, documentId, outline: outlineSkeleton, scale = 1 }: DocumentEditorViewProps) {
   const { settings } = useDocumentSettings();
+  const outline = useDocumentContent(projectId, documentId, outlineSkeleton);
 
   const [pages, setPages] = useState<string[]>(() => compileDocument(outline, settings));
 
@@ -119,9 +119,13 @@ export default function Sidebar({
         const insertIdx = position === "after" ? scIdx + 1 : scIdx;
         // Use /insert endpoint for precise position
         const endpoint = `/projects/${projectId}/documents/${documentId}/chapters/${chId}/scenes/insert`;
+        // the sidebar outline carries no content; fetch the copied scene's on demand
+        const content = clipboard.scene.content ?? (await api.get(
+          `/projects/${projectId}/documents/${documentId}/chapters/${clipboard.chapterId}/scenes/${clipboard.scene.id}`
+        )).data.content;
         const payload = {
           title: clipboard.scene.title + (clipboard.action === "copy" ? " (copy)" : ""),
-          content: clipboard.scene.content || "",
+          content: content || "",
           index: insertIdx
         };
         const res = await api.post(endpoint, payload);
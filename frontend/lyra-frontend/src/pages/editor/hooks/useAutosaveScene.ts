@@ -1,6 +1,30 @@
-import { useEffect } from "react";
+import { useEffect, useRef } from "react";
 import api from "../../../api/client";
 
+interface SavedBase {
+  sceneKey: string;
+  content: string;
+  hash: string;
+}
+
+// Single splice turning `base` into `next`: common prefix/suffix trimmed.
+// Offsets are JS string indices (UTF-16 units), which the server expects.
+function diffSplice(base: string, next: string) {
+  let start = 0;
+  const max = Math.min(base.length, next.length);
+  while (start < max && base[start] === next[start]) start++;
+  let tail = 0;
+  while (
+    tail < max - start &&
+    base[base.length - 1 - tail] === next[next.length - 1 - tail]
+  ) tail++;
+  return {
+    start,
+    delete: base.length - tail - start,
+    insert: next.slice(start, next.length - tail),
+  };
+}
+
 interface AutosaveProps {
   projectId?: string;
   documentId?: string;
@@ -24,6 +48,10 @@ export function useAutosaveScene({
   onSaved,
   onStatusChange,
 }: AutosaveProps) {
+  // Last content the server confirmed, with its hash, so the next save can
+  // send only the edit. Any mismatch (412) falls back to the full PUT.
+  const savedBase = useRef<SavedBase | null>(null);
+
   useEffect(() => {
     if (!shouldSave || !projectId || !documentId || !activeChapterId || !activeSceneId) {
       onStatusChange?.("idle");
@@ -33,11 +61,25 @@ export function useAutosaveScene({
     onStatusChange?.("saving", "Saving...");
 
     const timer = setTimeout(async () => {
+      const sceneUrl = `/projects/${projectId}/documents/${documentId}/chapters/${activeChapterId}/scenes/${activeSceneId}`;
+      const sceneKey = `${documentId}/${activeSceneId}`;
       try {
-        await api.put(
-          `/projects/${projectId}/documents/${documentId}/chapters/${activeChapterId}/scenes/${activeSceneId}`,
-          { content }
-        );
+        const base = savedBase.current;
+        let res;
+        if (base && base.sceneKey === sceneKey) {
+          try {
+            res = await api.put(`${sceneUrl}/delta`, {
+              base_hash: base.hash,
+              ops: [diffSplice(base.content, content)],
+            });
+          } catch (err: any) {
+            if (err.response?.status !== 412) throw err;
+          }
+        }
+        if (!res) {
+          res = await api.put(sceneUrl, { content });
+        }
+        savedBase.current = { sceneKey, content, hash: res.data.content_hash };
         onSaved?.(content);
         onStatusChange?.("saved", "Saved");
         setTimeout(() => onStatusChange?.("idle"), 3000);
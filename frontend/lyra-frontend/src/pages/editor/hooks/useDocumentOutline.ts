@@ -25,8 +25,11 @@ export function useDocumentOutline(
 
     try {
       console.log(`Fetching outline: /projects/${projectId}/documents/${documentId}/outline`);
+      // the sidebar only needs ids, titles, order and word counts; views that
+      // render content fetch it on demand
       const res = await api.get<DocumentOutline>(
-        `/projects/${projectId}/documents/${documentId}/outline`
+        `/projects/${projectId}/documents/${documentId}/outline`,
+        { params: { content: false } }
       );
       console.log("Outline fetched:", res.data);
       setOutline(res.data);
@@ -0,0 +1,89 @@
+import { useState, useEffect, useMemo } from "react";
+import api, { API_BASE_URL } from "../../../api/client";
+import type { Chapter, DocumentOutline } from "../../../types/document";
+
+// The sidebar outline is loaded without scene content. The read-only chapter
+// and document views fetch it on demand; content edited in this session
+// (already on the outline's scenes) wins over what was fetched.
+function withContents(chapter: Chapter, contents: Record<string, string>): Chapter {
+  return {
+    ...chapter,
+    scenes: chapter.scenes.map((scene) => ({
+      ...scene,
+      content: scene.content ?? contents[scene.id] ?? "",
+    })),
+  };
+}
+
+export function useChapterContent(
+  projectId: string,
+  documentId: string,
+  chapter: Chapter
+): Chapter {
+  const [contents, setContents] = useState<Record<string, string>>({});
+
+  useEffect(() => {
+    let cancelled = false;
+    api
+      .get<{ scenes: Array<{ id: string; content?: string }> }>(
+        `/projects/${projectId}/documents/${documentId}/chapters/${chapter.id}/content`
+      )
+      .then((res) => {
+        if (!cancelled) setContents(Object.fromEntries(res.data.scenes.map((s) => [s.id, s.content ?? ""])));
+      })
+      .catch((err) => console.error("Chapter content fetch failed:", err));
+    return () => {
+      cancelled = true;
+    };
+    // refetch when the chapter or its scene list changes, not on every edit
+  }, [projectId, documentId, chapter.id, chapter.scenes.map((s) => s.id).join(",")]);
+
+  return useMemo(() => withContents(chapter, contents), [chapter, contents]);
+}
+
+export function useDocumentContent(
+  projectId: string,
+  documentId: string,
+  outline: DocumentOutline
+): DocumentOutline {
+  const [contents, setContents] = useState<Record<string, string>>({});
+
+  // The manuscript streams as NDJSON, one line per chapter and scene; scenes
+  // are shown as they arrive instead of after the whole document is loaded.
+  useEffect(() => {
+    const controller = new AbortController();
+    const load = async () => {
+      const token = localStorage.getItem("token");
+      const res = await fetch(`${API_BASE_URL}/projects/${projectId}/documents/${documentId}/manuscript`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+        signal: controller.signal,
+      });
+      if (!res.ok || !res.body) throw new Error(`Manuscript fetch failed: ${res.status}`);
+
+      const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+      let pending = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        const lines = (pending + value).split("\n");
+        pending = lines.pop() ?? "";
+        const arrived: Record<string, string> = {};
+        for (const line of lines) {
+          if (!line) continue;
+          const record = JSON.parse(line);
+          if (record.type === "scene") arrived[record.id] = record.content ?? "";
+        }
+        if (Object.keys(arrived).length > 0) setContents((prev) => ({ ...prev, ...arrived }));
+      }
+    };
+    load().catch((err) => {
+      if (err.name !== "AbortError") console.error("Document content fetch failed:", err);
+    });
+    return () => controller.abort();
+  }, [projectId, documentId]);
+
+  return useMemo(
+    () => ({ ...outline, chapters: outline.chapters.map((chapter) => withContents(chapter, contents)) }),
+    [outline, contents]
+  );
+}
@@ -18,6 +18,7 @@ export interface DocumentOutline {
   document_id: string;
   title: string;
   total_wordcount: number;
+  version: number;
   chapters: Chapter[];
 }
 
@@ -54,6 +55,11 @@ export interface Item {
   shortest_scene?: SceneStat;
 }
 
+export interface ItemPage {
+  items: Item[];
+  next_cursor: string | null;
+}
+
 export interface DocumentStats {
   document_id: string;
   chapter_count: number;